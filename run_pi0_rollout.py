@@ -1,71 +1,103 @@
-import genesis as gs
-
-from src.robots.droid import DroidManager
 from src.inference.pi0_inference import Pi0Inference
-from src.sims.replicad_plus_objs_scenes import get_sim_settings
+from src.robots.droid_const import OBS_CAM_RES
+from src.sims.registry import check_sim_config, build_sim_settings
+from src.utils import profiler
+from src.utils.startup import Startup
 from src.utils.run_sim_helper import user_input_should_reset, user_input_update_prompt, sim_arg_parser
 
 
 if __name__ == "__main__":
+    startup = Startup()
     args = sim_arg_parser()
     task_prompt, sim_setting = args["task_prompt"], args["sim_run"]
+    if args["profile"]:
+        profiler.enable(trace_file=args["trace"])
+
+    # e.g. --preset fast, see configs/. Fails fast, before the model client and Genesis
+    sim_config = check_sim_config(sim_setting, **args["sim_config"])
 
-    # Model inference
-    pi0 = Pi0Inference()
-    # Setup sim
-    ss = get_sim_settings(sim_name=sim_setting)
-    gs.init(backend=gs.gpu, logging_level="info")
+    def build_sim():
+        # Genesis is only imported here, while the model client connects and warms up, see src/utils/startup.py
+        import genesis as gs
+        from src.robots.droid import DroidManager
+        from src.sims.snapshot import SceneSnapshot
+        from src.sims.sim_scene import create_sim_scene
+        from src.sims.adaptive_timestep import AdaptiveTimestep
+        from src.environment.scene_cache import use_persistent_kernel_cache
 
-    """
-    # NOTE: For fast sim set:
-        dt = 0.01
-        steps_per_action = 7
-    in src/sims/replicad_plus_objs_scenes.py and use
-    assets/panda_wt_robotiq_2f85-fast/panda_wt_2f85-fast.xml in src/robots/droid.py
+        ss = build_sim_settings(sim_config)
+        adaptive_timestep = None
+        if args["adaptive_dt"]:
+            adaptive_timestep = AdaptiveTimestep()
+            # Build at the fine dt, exactly fine_steps per 15 Hz action
+            ss.dt, ss.steps_per_action = AdaptiveTimestep.scene_dt(), adaptive_timestep.fine_steps
+        use_persistent_kernel_cache()
+        gs.init(backend=gs.gpu, logging_level="info")
+        scene = create_sim_scene(ss)
+        ss.setup_scene(scene)
+        franka_droid = DroidManager(
+            scene, ss.franka_pos, ss.franka_quat, rest_pose=ss.rest_pose,
+            obs_cam_res=ss.obs_cam_res, record_cam_res=ss.record_cam_res, mjcf_file=ss.mjcf_file,
+            action_interpolation=ss.action_interpolation,
+        )
+        # Build sim and reset franka arm
+        scene.build()
+        franka_droid.setup()
+        if adaptive_timestep:
+            franka_droid.set_adaptive_timestep(adaptive_timestep)
+        # Settled start state, restored on every reset (no per-object resets or stabilization steps)
+        start_snapshot = SceneSnapshot(scene)
+        start_snapshot.capture(franka_droid.hold_start_pos)
+        return ss, franka_droid, start_snapshot, adaptive_timestep
 
-    Plus use this simpler scene setup!
-    """
-    # scene = gs.Scene(
-    #     show_viewer=False,
-    #     show_FPS=False,
-    #     sim_options=gs.options.SimOptions(dt=ss.dt, requires_grad=False),
-    #     renderer=gs.renderers.Rasterizer(),
-    # )
-    scene = gs.Scene(
-        show_viewer=False,  # Disable GUI
-        show_FPS=False,
-        rigid_options=gs.options.RigidOptions(
-            integrator=gs.integrator.implicitfast,
-            constraint_solver=gs.constraint_solver.Newton,
-            iterations=200,
-            ls_iterations=50,
-            tolerance=1e-6,
-            contact_resolve_time=0.02
-        ),
-        sim_options=gs.options.SimOptions(
-            dt=ss.dt,  # 0.002,
-            substeps=20,
-            requires_grad=False,
-        ),
-        renderer=gs.renderers.Rasterizer()
+    # Model inference (connect + warm-up) and sim build run concurrently
+    pi0, (ss, franka_droid, start_snapshot, adaptive_timestep) = startup.run(
+        connect_policy=lambda: Pi0Inference(**args["policy_client"]),
+        build_sim=build_sim,
+        warmup=lambda pi0: pi0.warmup(cam_res=OBS_CAM_RES[sim_config.cameras.obs_res], prompt=task_prompt),
     )
-    ss.setup_scene(scene)
-    franka_droid = DroidManager(scene, ss.franka_pos, ss.franka_quat, ss.render_all_steps, rest_pose=ss.rest_pose)
-    # Build sim and reset franka arm
-    scene.build()
-    franka_droid.setup()
+    from src.inference.pipelined_rollout import PipelinedRollout
+    from src.inference.chunked_rollout import ChunkedRollout
+
+    # Overlap next inference call with physics stepping, see src/inference/pipelined_rollout.py
+    pipelined = None
+    if args["prefetch_at"] is not None:
+        pipelined = PipelinedRollout(
+            franka_droid, pi0, ss.steps_per_action, actions_per_chunk=8,
+            prefetch_at=args["prefetch_at"], blend_steps=args["blend_steps"],
+        )
+    # Or keep action chunks cached and re-plan less often, see src/inference/chunked_rollout.py
+    chunked = None
+    if args["chunking"] is not None:
+        chunked = ChunkedRollout(franka_droid, pi0, ss.steps_per_action, **args["chunking"])
 
     # Run sim loop
     loop = 0
     while True:
         if user_input_should_reset(loop=loop, restart_loop_mod=40):
+            profiler.print_episode_report()
+            print(pi0.client_summary())
+            print(franka_droid.tracking_error.summary())
+            franka_droid.tracking_error.reset()
+            if adaptive_timestep:
+                print(adaptive_timestep.summary())
             task_prompt = user_input_update_prompt(task_prompt)
             print(f"task_prompt: {task_prompt}")
-            scene.reset()
-            ss.scene_reset()
-            franka_droid.goto_start_pos()
+            start_snapshot.restore()
+            if pipelined:
+                pipelined.reset()
+            if chunked:
+                print(chunked.summary())
+                chunked.reset()
 
-        scene_obv = franka_droid.get_scene_observation()
-        actions = pi0.forward(droid_observation=scene_obv, prompt=task_prompt, actions=8)
-        franka_droid.apply_abs_joint_actions(actions=actions, steps_per_action=ss.steps_per_action)
+        with profiler.timer("loop/iteration"):
+            if pipelined:
+                pipelined.step(prompt=task_prompt)
+            elif chunked:
+                chunked.step(prompt=task_prompt)
+            else:
+                scene_obv = franka_droid.get_scene_observation()
+                actions = pi0.forward(droid_observation=scene_obv, prompt=task_prompt, actions=8)
+                franka_droid.apply_abs_joint_actions(actions=actions, steps_per_action=ss.steps_per_action)
+        startup.first_action()
         loop += 1
@@ -0,0 +1,56 @@
+import time
+import argparse
+
+import numpy as np
+
+from src.inference.pi0_inference import Pi0Inference
+from src.utils.run_sim_helper import add_policy_client_args, policy_client_kwargs
+
+
+"""
+Benchmark per-env vs batched inference requests with synthetic DROID observations, no sim needed.
+Start a policy server first, e.g. the stand-in one:
+    python -m src.inference.stub_policy_server --port 8000 --batched
+    python sim_runs/bench_inference_client.py --n_envs 8 --iters 20
+Per-env requests against several (non-batched) servers are spread over all of them:
+    python sim_runs/bench_inference_client.py --n_envs 8 --endpoints localhost:8000 localhost:8001
+"""
+
+
+def _synthetic_observations(n_envs: int, rng: np.random.Generator) -> dict:
+    return {
+        "joint_positions": rng.uniform(-1, 1, size=(n_envs, 7)).astype(np.float32),
+        "gripper_position": rng.uniform(0, np.pi/4, size=(n_envs, 2)).astype(np.float32),
+        "wrist_cam_img": rng.integers(0, 255, size=(n_envs, 720, 1280, 3), dtype=np.uint8),
+        "ext_camera_img": rng.integers(0, 255, size=(n_envs, 720, 1280, 3), dtype=np.uint8),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Pi0Inference.forward vs forward_batch")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--n_envs", type=int, default=8)
+    parser.add_argument("--iters", type=int, default=20)
+    add_policy_client_args(parser)
+    args = parser.parse_args()
+
+    pi0 = Pi0Inference(host=args.host, port=args.port, **policy_client_kwargs(args))
+    obs = _synthetic_observations(args.n_envs, np.random.default_rng(0))
+    prompt = "Place the plastic bottle into the bowl."
+
+    start = time.perf_counter()
+    for _ in range(args.iters):
+        for i in range(args.n_envs):
+            pi0.forward({k: v[i] for k, v in obs.items()}, prompt=prompt, actions=8)
+    per_env_s = (time.perf_counter() - start) / args.iters
+
+    start = time.perf_counter()
+    for _ in range(args.iters):
+        pi0.forward_batch(obs, prompts=prompt, actions=8)
+    batched_s = (time.perf_counter() - start) / args.iters
+
+    print(f"{args.n_envs} envs, {args.iters} iters")
+    print(f"  per-env forward: {1000 * per_env_s:.1f} ms/iter")
+    print(f"  forward_batch:   {1000 * batched_s:.1f} ms/iter ({per_env_s / batched_s:.2f}x)")
+    print(pi0.client_summary())
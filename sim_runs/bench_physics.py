@@ -0,0 +1,225 @@
+import json
+import time
+import argparse
+import resource
+import subprocess
+import multiprocessing as mp
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+"""
+Open-loop physics benchmark of DroidManager in every scene, no model server needed:
+    python sim_runs/bench_physics.py
+    python sim_runs/bench_physics.py --scenes replicad_apt0_partnet_objs --preset fast \
+        --compare temp_data/bench/physics_<timestamp>.json
+
+Each scene is built in its own process (clean peak memory numbers) and driven through scripted joint trajectories
+with apply_abs_joint_actions(..):
+    - "hold":  stay at rest pose, gripper open (anything moving here is solver drift)
+    - "sweep": sinusoidal sweep of the shoulder/elbow joints, opening and closing the gripper
+Reported per scene: build time, sim steps/s, obs render ms/frame, peak CPU RSS and GPU memory, and stability
+metrics: max/mean contact penetration depth, drift of free objects (incl. MJCF objects, see get_free_entities(..))
+while the arm holds still, and the gripper closing error (how far the fingers stay from fully closed while commanded
+closed). The sweep closes the gripper on nothing, so that is the finger tracking error of the gripper model, not slip
+of a grasped object.
+Results go to temp_data/bench/physics_<timestamp>.json, with git commit and Genesis version, to compare runs across
+commits, Genesis versions and sim settings (presets and --set overrides, see src/sims/sim_config.py).
+"""
+
+ACTIONS_PER_CHUNK = 8
+GRIPPER_SETTLE_ACTIONS = 3  # Closing takes a few actions, the error is only measured once the gripper had time to close
+
+
+def scripted_trajectory(rest_pose: list, kind: str, n_chunks: int) -> np.ndarray:
+    """
+    (n_chunks, ACTIONS_PER_CHUNK, 8) absolute joint targets + gripper command (0: open, 1: closed), at 15 Hz.
+    """
+    n = n_chunks * ACTIONS_PER_CHUNK
+    actions = np.tile(np.append(np.asarray(rest_pose[:7], dtype=np.float64), 0.0), (n, 1))
+    if kind == "sweep":
+        t = np.arange(n) / 15.0
+        actions[:, 1] += 0.3 * np.sin(2 * np.pi * t / 4.0)
+        actions[:, 3] += 0.3 * np.sin(2 * np.pi * t / 3.0)
+        actions[:, 0] += 0.4 * np.sin(2 * np.pi * t / 6.0)
+        actions[:, 7] = (np.sin(2 * np.pi * t / 2.0) > 0).astype(np.float64)
+    return actions.reshape(n_chunks, ACTIONS_PER_CHUNK, 8)
+
+
+def bench_scene(
+    sim_run: str, n_chunks: int, render_frames: int, sim_config: dict, adaptive_dt: bool,
+) -> dict:
+    """
+    Runs in a fresh process, see module docstring.
+    """
+    import torch
+    import genesis as gs
+    from src.robots.droid import DroidManager
+    from src.sims.sim_scene import create_sim_scene
+    from src.sims.registry import get_sim_settings
+    from src.environment.scene_cache import use_persistent_kernel_cache
+    from src.environment.rigid_objs import get_free_entities, get_entity_pos, get_contacts
+    from src.sims.adaptive_timestep import AdaptiveTimestep
+
+    use_persistent_kernel_cache()
+    gs.init(backend=gs.gpu, logging_level="warning")
+    ss = get_sim_settings(sim_name=sim_run, **sim_config)
+    adaptive_timestep = None
+    if adaptive_dt:
+        adaptive_timestep = AdaptiveTimestep()
+        ss.dt, ss.steps_per_action = AdaptiveTimestep.scene_dt(), adaptive_timestep.fine_steps
+
+    start = time.perf_counter()
+    scene = create_sim_scene(ss)
+    ss.setup_scene(scene)
+    droid = DroidManager(
+        scene, ss.franka_pos, ss.franka_quat, rest_pose=ss.rest_pose,
+        mjcf_file=ss.mjcf_file,
+        action_interpolation=ss.action_interpolation,
+    )
+    scene.build()
+    droid.setup()
+    if adaptive_timestep:
+        droid.set_adaptive_timestep(adaptive_timestep)
+    build_s = time.perf_counter() - start
+
+    result = {
+        "sim_run": sim_run, "preset": ss.config.preset, "dt": ss.dt, "steps_per_action": ss.steps_per_action,
+        "build_s": build_s, "sim_config": ss.config.to_dict(),
+    }
+    objects = get_free_entities(scene, exclude=(droid.franka,))
+    penetrations = []
+    for kind in ("hold", "sweep"):
+        trajectory = scripted_trajectory(ss.rest_pose, kind, n_chunks)
+        start_pos = [get_entity_pos(entity) for entity in objects]
+        gripper_closed_error = 0.0
+        closed_for = 0
+        n_steps = 0
+        adaptive_start = dict(adaptive_timestep.stats) if adaptive_timestep else None
+        droid.tracking_error.reset()
+        start = time.perf_counter()
+        for chunk in trajectory:
+            for action in chunk:
+                droid.apply_abs_joint_actions(actions=action[None], steps_per_action=ss.steps_per_action)
+                n_steps += ss.steps_per_action
+                penetrations.append(get_contacts(scene)["penetration"])
+                closed_for = closed_for + 1 if action[7] > 0.2 else 0  # Commanded closed, see apply_abs_joint_actions(..)
+                if closed_for > GRIPPER_SETTLE_ACTIONS:
+                    fingers = droid.get_dofs_position()[7:]
+                    gripper_closed_error = max(gripper_closed_error, float(np.max(np.pi/4 - fingers)))
+        sim_s = time.perf_counter() - start
+        sim_time_s = n_steps * ss.dt
+        if adaptive_timestep:
+            n_steps = adaptive_timestep.stats["sim_steps"] - adaptive_start["sim_steps"]
+            sim_time_s = adaptive_timestep.stats["sim_time_s"] - adaptive_start["sim_time_s"]
+        result[kind] = {
+            "sim_steps": n_steps,
+            "steps_per_s": n_steps / sim_s,
+            "realtime_factor": sim_time_s / sim_s,
+            "object_drift_m": max(
+                (float(np.linalg.norm(get_entity_pos(entity) - pos)) for entity, pos in zip(objects, start_pos)),
+                default=0.0,
+            ),
+            # q_desired - q_actual at the end of every action, arm joints, see src/robots/joint_actions.py
+            "tracking_rms_rad": float(np.sqrt(np.mean(droid.tracking_error.result()["rms"][:7] ** 2))),
+        }
+        if kind == "sweep":
+            result[kind]["gripper_closed_error_rad"] = gripper_closed_error
+
+    start = time.perf_counter()
+    for _ in range(render_frames):
+        droid.get_scene_observation()  # Renders the 2 observation cams
+    result["render_ms_per_frame"] = 1000 * (time.perf_counter() - start) / (2 * render_frames)
+
+    penetrations = np.concatenate(penetrations) if penetrations else np.zeros(0)
+    result["penetration_max_m"] = float(penetrations.max()) if penetrations.size else 0.0
+    result["penetration_mean_m"] = float(penetrations.mean()) if penetrations.size else 0.0
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    if torch.cuda.is_available():
+        free, total = torch.cuda.mem_get_info()  # Device-wide, Genesis doesn't allocate through torch
+        result["gpu_mem_used_mb"] = (total - free) / 2**20
+    return result
+
+
+def _environment_info() -> dict:
+    import torch
+    import genesis as gs
+
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "genesis": gs.__version__,
+        "torch": torch.__version__,
+        "gpu": torch.cuda.get_device_name() if torch.cuda.is_available() else None,
+    }
+
+
+def _print_results(results: list[dict], baseline: dict | None):
+    baseline = {r["sim_run"]: r for r in baseline["results"]} if baseline else {}
+
+    def _fmt(value: float, sim_run: str, *keys: str) -> str:
+        old = baseline.get(sim_run)
+        for key in keys:
+            old = old.get(key) if isinstance(old, dict) else None
+        delta = f" ({value / old:.2f}x)" if old else ""
+        return f"{value:.3g}{delta}"
+
+    for r in results:
+        s = r["sim_run"]
+        print(f"{s} ({r['preset']}, dt={r['dt']}, steps_per_action={r['steps_per_action']})")
+        print(f"  build:       {_fmt(r['build_s'], s, 'build_s')} s")
+        print(f"  steps/s:     hold {_fmt(r['hold']['steps_per_s'], s, 'hold', 'steps_per_s')}, "
+              f"sweep {_fmt(r['sweep']['steps_per_s'], s, 'sweep', 'steps_per_s')}")
+        print(f"  render:      {_fmt(r['render_ms_per_frame'], s, 'render_ms_per_frame')} ms/frame")
+        print(f"  memory:      {_fmt(r['peak_rss_mb'], s, 'peak_rss_mb')} MB RSS, "
+              f"{_fmt(r.get('gpu_mem_used_mb', 0.0), s, 'gpu_mem_used_mb')} MB GPU")
+        print(f"  penetration: max {_fmt(r['penetration_max_m'], s, 'penetration_max_m')} m, "
+              f"mean {_fmt(r['penetration_mean_m'], s, 'penetration_mean_m')} m")
+        print(f"  drift:       {_fmt(r['hold']['object_drift_m'], s, 'hold', 'object_drift_m')} m (hold), "
+              f"gripper closing error "
+              f"{_fmt(r['sweep']['gripper_closed_error_rad'], s, 'sweep', 'gripper_closed_error_rad')} rad")
+
+
+if __name__ == "__main__":
+    from src.utils.root import get_temp_data_abs_path
+    from src.sims.sim_config import list_scenes
+    from src.utils.run_sim_helper import add_sim_config_args, sim_config_kwargs
+
+    parser = argparse.ArgumentParser(description="Open-loop physics benchmark, no model server needed")
+    parser.add_argument("--scenes", nargs="+", default=list_scenes())
+    parser.add_argument("--chunks", type=int, default=10, help="Action chunks per scripted trajectory")
+    parser.add_argument("--render_frames", type=int, default=20)
+    add_sim_config_args(parser)
+    parser.add_argument("--adaptive_dt", action="store_true", help="See src/sims/adaptive_timestep.py")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    results = []
+    # One fresh process per scene: Genesis state and peak memory don't carry over between scenes
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"), max_tasks_per_child=1) as pool:
+        for sim_run in args.scenes:
+            print(f"Benchmarking {sim_run}...")
+            results.append(pool.submit(
+                bench_scene, sim_run, args.chunks, args.render_frames, sim_config_kwargs(args), args.adaptive_dt,
+            ).result())
+        environment = pool.submit(_environment_info).result()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    _print_results(results, baseline)
+
+    out = Path(args.out or get_temp_data_abs_path() / "bench" / f"physics_{datetime.now().strftime('%m-%d-%y_%H-%M')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"environment": environment, "args": vars(args), "results": results}, f, indent=2)
+    print(f"Results written to {out}")
@@ -0,0 +1,78 @@
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import genesis as gs
+
+from src.sims.sim_config import list_scenes
+from src.sims.registry import get_sim_settings
+from src.environment.asset_cache import (
+    DEFAULT_FACE_NUM, process_asset, load_manifest, save_manifest, set_processed_assets_enabled
+)
+
+
+"""
+Offline preprocessing of the collision geometry of every mesh asset used by the sim settings in
+configs/scenes/, see src/environment/asset_cache.py. Run once (per asset change), all later
+sim runs and workers load the cached results.
+
+python sim_runs/preprocess_assets.py --workers 8
+python sim_runs/preprocess_assets.py --sim_run replicad_apt4_FAIR_DTC_objs --decompose
+"""
+
+
+class _AssetRecorder:
+    """
+    Stands in for gs.Scene while a sim setting adds its entities, only records their morphs.
+    """
+
+    def __init__(self):
+        self.morphs = []
+
+    def add_entity(self, morph=None, material=None, surface=None, **kwargs):
+        self.morphs.append(morph)
+
+
+def discover_collision_mesh_assets(sim_names: list[str]) -> list[str]:
+    """
+    Source files of all mesh (GLB/OBJ) entities with collision in the given sim settings.
+    """
+    set_processed_assets_enabled(False)  # Record the original meshes, not previously cached URDFs
+    assets = set()
+    for sim_name in sim_names:
+        recorder = _AssetRecorder()
+        get_sim_settings(sim_name).setup_scene(recorder)
+        for morph in recorder.morphs:
+            if isinstance(morph, gs.morphs.Mesh) and morph.collision:
+                assets.add(str(morph.file))
+        print(f"{sim_name}: {len(recorder.morphs)} entities")
+    set_processed_assets_enabled(True)
+    return sorted(assets)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocess and cache collision geometry of scene assets")
+    parser.add_argument("--sim_run", action="append", default=None, help="Sim setting(s), default: all")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size, default: CPU count")
+    parser.add_argument("--face_num", type=int, default=DEFAULT_FACE_NUM, help="Target faces of collision meshes")
+    parser.add_argument("--decompose", action="store_true", help="Convex-decompose collision meshes (needs coacd)")
+    args = parser.parse_args()
+
+    gs.init(backend=gs.cpu, logging_level="warning")  # Only needed to construct morphs
+    assets = discover_collision_mesh_assets(args.sim_run or list_scenes())
+    print(f"Preprocessing {len(assets)} collision mesh assets...")
+
+    manifest = load_manifest()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(process_asset, asset, args.face_num, args.decompose): asset for asset in assets}
+        for i, future in enumerate(as_completed(futures)):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[{i+1}/{len(assets)}] FAILED {futures[future]}: {e}")
+                continue
+            manifest["assets"][result["sha256"]] = result
+            print(f"[{i+1}/{len(assets)}] {result['source']}: {result['faces_in']} -> {result['faces_out']} faces")
+    save_manifest(manifest)
+    print(f"Done in {time.perf_counter() - start:.1f}s, manifest: {len(manifest['assets'])} assets")
@@ -1,67 +1,84 @@
-import genesis as gs
+from datetime import datetime
 
-from src.robots.droid import DroidManager
 from src.inference.pi0_inference import Pi0Inference
-from src.sims.replicad_plus_objs_scenes import get_sim_settings
+from src.robots.droid_const import OBS_CAM_RES
+from src.sims.registry import check_sim_config, build_sim_settings
+from src.utils import profiler
+from src.utils.startup import Startup
 from src.utils.run_sim_helper import user_input_should_reset, user_input_update_prompt, sim_arg_parser, auto_reset
 
 
-# NOTE: see src/robots/droid.py -- I disabled a few cam recording because if the recording is long it can eat up a lot of
-# CPU mem. Keep recordings short (or stream them) -- enable all cams in src/robots/droid.py if you need them.
+# NOTE: all cams (wrist, scene, scene_2) are streamed to disk while rendering (see src/utils/video_recorder.py), so
+# memory stays flat however long the run is. Every episode (reset) gets its own set of video files.
 
 if __name__ == "__main__":
+    startup = Startup()
     args = sim_arg_parser()
     task_prompt, sim_setting = args["task_prompt"], args["sim_run"]
+    if args["profile"]:
+        profiler.enable(trace_file=args["trace"])
 
-    # Model inference
-    pi0 = Pi0Inference()
-    # Setup sim
-    ss = get_sim_settings(sim_name=sim_setting)
-    gs.init(backend=gs.gpu, logging_level="info")
-    scene = gs.Scene(
-        show_viewer=False,  # Disable GUI
-        show_FPS=False,
-        rigid_options=gs.options.RigidOptions(
-            integrator=gs.integrator.implicitfast,
-            constraint_solver=gs.constraint_solver.Newton,
-            iterations=200,
-            ls_iterations=50,
-            tolerance=1e-6,
-            contact_resolve_time=0.02
-        ),
-        sim_options=gs.options.SimOptions(
-            dt=ss.dt,  # 0.002,
-            substeps=20,
-            requires_grad=False,
-        ),
-        renderer=gs.renderers.Rasterizer()
-    )
+    sim_config = check_sim_config(sim_setting, **args["sim_config"])  # Fail fast, before the model client and Genesis
+
+    def build_sim():
+        # Genesis is only imported here, while the model client connects and warms up, see src/utils/startup.py
+        import genesis as gs
+        from src.robots.droid import DroidManager
+        from src.sims.snapshot import SceneSnapshot
+        from src.sims.sim_scene import create_sim_scene
+        from src.environment.scene_cache import use_persistent_kernel_cache
 
-    ss.setup_scene(scene)
-    ss.render_all_steps = True  # Render cams every step so that all frames are recorded
-    franka_droid = DroidManager(scene, ss.franka_pos, ss.franka_quat, ss.render_all_steps, enable_left_2_cam=True, rest_pose=ss.rest_pose)
-    # Build sim and reset franka arm
-    scene.build()
-    franka_droid.setup()
+        ss = build_sim_settings(sim_config)
+        use_persistent_kernel_cache()
+        gs.init(backend=gs.gpu, logging_level="info")
+        scene = create_sim_scene(ss)
+        ss.setup_scene(scene)
+        # Observation cams can render at low res, recording cam (ext cam 2) stays at full res
+        franka_droid = DroidManager(
+            scene, ss.franka_pos, ss.franka_quat, enable_left_2_cam=True, rest_pose=ss.rest_pose,
+            obs_cam_res=ss.obs_cam_res, record_cam_res=ss.record_cam_res, mjcf_file=ss.mjcf_file,
+            action_interpolation=ss.action_interpolation,
+        )
+        # Build sim and reset franka arm
+        scene.build()
+        franka_droid.setup()
+        # Settled start state, restored on every reset (no per-object resets or stabilization steps)
+        start_snapshot = SceneSnapshot(scene)
+        start_snapshot.capture(franka_droid.hold_start_pos)
+        return ss, franka_droid, start_snapshot
+
+    # Model inference (connect + warm-up) and sim build run concurrently
+    pi0, (ss, franka_droid, start_snapshot) = startup.run(
+        connect_policy=lambda: Pi0Inference(**args["policy_client"]),
+        build_sim=build_sim,
+        warmup=lambda pi0: pi0.warmup(cam_res=OBS_CAM_RES[sim_config.cameras.obs_res], prompt=task_prompt),
+    )
 
     # Run sim loop
     loop = 0
     restart_loop_mod = 40
 
-    franka_droid.cams_start_recording()
+    run_stamp = datetime.now().strftime("%m-%d-%y_%H-%M")
+    episode = 0
+    franka_droid.cams_start_recording(segment_name=f"{run_stamp}_ep{episode}")
 
     while True:
         if loop > restart_loop_mod*5: break;
 
         if auto_reset(loop=loop, restart_loop_mod=restart_loop_mod):
             print("Resetting scene!")
-            scene.reset()
-            ss.scene_reset()
-            franka_droid.goto_start_pos()
+            profiler.print_episode_report(f"Episode {episode}")
+            start_snapshot.restore()
+            episode += 1
+            franka_droid.cams_end_recording(close=False)
+            franka_droid.cams_start_recording(segment_name=f"{run_stamp}_ep{episode}")
 
-        scene_obv = franka_droid.get_scene_observation()
-        actions = pi0.forward(droid_observation=scene_obv, prompt=task_prompt, actions=8)
-        franka_droid.apply_abs_joint_actions(actions=actions, steps_per_action=ss.steps_per_action)
+        with profiler.timer("loop/iteration"):
+            scene_obv = franka_droid.get_scene_observation()
+            actions = pi0.forward(droid_observation=scene_obv, prompt=task_prompt, actions=8)
+            franka_droid.apply_abs_joint_actions(actions=actions, steps_per_action=ss.steps_per_action)
+        startup.first_action()
         loop += 1
 
-    franka_droid.cams_end_recording(path="/workspace/RoboSandbox/temp_data/")
+    franka_droid.cams_end_recording()
+    profiler.print_episode_report(f"Episode {episode}")
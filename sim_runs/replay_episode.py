@@ -0,0 +1,90 @@
+import argparse
+
+import numpy as np
+import genesis as gs
+
+from src.robots.droid import DroidManager
+from src.sims.snapshot import SceneSnapshot
+from src.sims.sim_scene import create_sim_scene
+from src.sims.sim_config import SimConfig
+from src.sims.registry import build_sim_settings, get_sim_settings
+from src.dataset.episode_reader import EpisodeReader, list_episodes
+from src.dataset.replay import replay_episode
+from src.evaluation.runner import seed_everything
+from src.evaluation.randomization import EpisodeRandomization, episode_rng
+from src.environment.rigid_objs import get_free_entities
+from src.environment.scene_cache import use_persistent_kernel_cache
+
+
+"""
+Open-loop replay of recorded episodes (see src/dataset/replay.py), no model server needed:
+    python sim_runs/replay_episode.py --dataset_dir temp_data/datasets/<name>
+    python sim_runs/replay_episode.py --episode_dir temp_data/datasets/<name>/<episode> --record
+
+Scenes are built with the sim config the episode was recorded with (preset, overrides, ...), if it has one.
+Prints, per episode, how far the replayed joint positions drift from the recorded ones (0 if sim/physics behave the
+same as when recording). --record re-renders the replay to video (all cams, see DroidManager.cams_start_recording).
+"""
+
+
+def replay_arg_parser():
+    parser = argparse.ArgumentParser(description="Replay recorded episodes open-loop")
+    parser.add_argument("--episode_dir", default=None, help="A single recorded episode")
+    parser.add_argument("--dataset_dir", default=None, help="Replay every episode of a dataset")
+    parser.add_argument("--record", action="store_true", help="Re-render the replay to video")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="Max joint drift (radians) to count as reproduced")
+    args = parser.parse_args()
+    if (args.episode_dir is None) == (args.dataset_dir is None):
+        parser.error("Pass either --episode_dir or --dataset_dir")
+    return args
+
+
+if __name__ == "__main__":
+    args = replay_arg_parser()
+    episode_dirs = [args.episode_dir] if args.episode_dir else list_episodes(args.dataset_dir)
+    readers = sorted((EpisodeReader(d) for d in episode_dirs), key=lambda r: r.sim_run)
+
+    use_persistent_kernel_cache()
+    gs.init(backend=gs.gpu, logging_level="warning")
+
+    sims = {}  # sim_run -> (ss, droid, start_snapshot), each scene is built once
+    for reader in readers:
+        if reader.sim_run not in sims:
+            if "sim_config" in reader.meta:
+                ss = build_sim_settings(SimConfig.from_dict(reader.meta["sim_config"]))
+            else:
+                ss = get_sim_settings(sim_name=reader.sim_run)
+            scene = create_sim_scene(ss)
+            ss.setup_scene(scene)
+            droid = DroidManager(
+                scene, ss.franka_pos, ss.franka_quat, enable_left_2_cam=args.record,
+                rest_pose=ss.rest_pose, obs_cam_res=tuple(reader.meta["obs_cam_res"]), mjcf_file=ss.mjcf_file,
+                action_interpolation=ss.action_interpolation,
+            )
+            scene.build()
+            droid.setup()
+            start_snapshot = SceneSnapshot(scene)
+            start_snapshot.capture(droid.hold_start_pos)
+            sims[reader.sim_run] = (ss, droid, start_snapshot, get_free_entities(scene, exclude=(droid.franka,)))
+
+        ss, droid, start_snapshot, objects = sims[reader.sim_run]
+        # Same as EvalRunner.run_episode(..), episodes recorded before randomization existed had none
+        seed_everything(reader.meta["seed"] * 100_003 + reader.meta["episode"])
+        start_snapshot.restore()
+        randomization = EpisodeRandomization(**reader.meta.get("randomization", {"enabled": False}))
+        randomization.apply(droid, objects, episode_rng(reader.meta["seed"], reader.meta["episode"]))
+        if args.record:
+            droid.cams_start_recording(segment_name=f"replay_{reader.dir.name}")
+        joint_errors = replay_episode(droid, reader, ss.steps_per_action)
+        if args.record:
+            droid.cams_end_recording(close=False)
+
+        max_error = max(joint_errors, default=0.0)
+        status = "reproduced" if max_error <= args.tolerance else "DIVERGED"
+        print(
+            f"{reader.dir.name}: {len(joint_errors)} chunks, max joint drift {max_error:.2e} rad "
+            f"(mean {np.mean(joint_errors) if joint_errors else 0.0:.2e}) -> {status}"
+        )
+
+    for _, droid, _, _ in sims.values():
+        droid.cams_end_recording()
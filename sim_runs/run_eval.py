@@ -0,0 +1,133 @@
+import os
+import json
+import argparse
+from datetime import datetime
+
+from src.utils.startup import Startup
+from src.robots.droid_const import OBS_CAM_RES
+from src.sims.registry import check_sim_config
+from src.evaluation.results import EvalJob, write_results_csv, print_results_summary
+from src.evaluation.scheduler import EpisodeScheduler
+from src.utils import profiler
+from src.utils.root import get_temp_data_abs_path
+from src.utils.run_sim_helper import (
+    add_sim_config_args, sim_config_kwargs, add_policy_client_args, policy_client_kwargs, add_chunking_args,
+    chunking_kwargs,
+)
+
+
+"""
+Unattended evaluation, no `input()` prompts. Either a single job from the CLI:
+    python sim_runs/run_eval.py --sim_run replicad_apt0_partnet_objs --prompt "Place the plastic bottle into the bowl." \
+        --seeds 0 1 2 --episodes 5
+or a matrix of jobs from a JSON file:
+    python sim_runs/run_eval.py --matrix eval_matrix.json
+    [
+        {"sim_run": "replicad_apt0_partnet_objs", "prompt": "Place the plastic bottle into the bowl.", "seeds": [0, 1], "episodes": 5},
+        {"sim_run": "replicad_apt5_kitchen", "prompt": "Open the fridge door on the left.", "seeds": [0], "episodes": 10}
+    ]
+Results go to temp_data/eval/results_<timestamp>.csv (or --out).
+
+With `--workers N` episodes are spread over N worker processes (each with its own Genesis instance, see
+src/evaluation/scheduler.py), all sharing the inference endpoint at --host/--port, or load balanced over the
+policy servers given with --endpoints (see src/inference/client_pool.py).
+"""
+
+
+def eval_arg_parser():
+    parser = argparse.ArgumentParser(description="Headless batch evaluation of a VLA over sim settings")
+    parser.add_argument("--matrix", default=None, help="JSON file with a list of jobs (sim_run, prompt, seeds, episodes)")
+    parser.add_argument("--sim_run", default=None, help="Sim setting, see configs/scenes/")
+    parser.add_argument("--prompt", default="", help="VLA prompt")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--episodes", type=int, default=1, help="Episodes per seed")
+    parser.add_argument(
+        "--no_randomization", action="store_true",
+        help="Same object poses and cam for every seed/episode, see src/evaluation/randomization.py",
+    )
+    parser.add_argument("--max_steps", type=int, default=40, help="Step budget per episode, in action chunks")
+    parser.add_argument("--max_time_s", type=float, default=600.0, help="Wall-clock budget per episode")
+    add_sim_config_args(parser)
+    parser.add_argument("--obs_res", default=None, choices=list(OBS_CAM_RES.keys()), help="Shorthand for cameras.obs_res")
+    parser.add_argument("--prefetch_at", type=int, default=None, help="Pipelined inference, see run_pi0_rollout.py")
+    add_chunking_args(parser)
+    parser.add_argument("--out", default=None, help="Results CSV path")
+    parser.add_argument(
+        "--dataset_dir", default=None, help="Also record every episode as training data, see src/dataset/episode_writer.py",
+    )
+    parser.add_argument("--profile", action="store_true", help="Per-episode phase timing, see src/utils/profiler.py")
+    parser.add_argument("--workers", type=int, default=1, help="Sim worker processes")
+    parser.add_argument("--backend", default="gpu", choices=["gpu", "cpu"], help="Genesis backend of the workers")
+    parser.add_argument("--max_retries", type=int, default=2, help="Retries of a failed/crashed episode")
+    parser.add_argument("--host", default="localhost", help="Inference endpoint host")
+    parser.add_argument("--port", type=int, default=8000, help="Inference endpoint port")
+    add_policy_client_args(parser)  # --endpoints replaces --host/--port
+    args = parser.parse_args()
+    if (args.matrix is None) == (args.sim_run is None):
+        parser.error("Pass either --matrix or --sim_run")
+    if args.prefetch_at is not None and chunking_kwargs(args) is not None:
+        parser.error("--prefetch_at (pipelined) and --chunked/--replan_every (chunked) roll-outs are exclusive")
+    return args
+
+
+if __name__ == "__main__":
+    startup = Startup()
+    args = eval_arg_parser()
+    if args.matrix:
+        with open(args.matrix, "r") as f:
+            jobs = [EvalJob(**job) for job in json.load(f)]
+    else:
+        jobs = [EvalJob(sim_run=args.sim_run, prompt=args.prompt, seeds=args.seeds, episodes=args.episodes)]
+
+    runner_kwargs = dict(
+        max_steps=args.max_steps, max_time_s=args.max_time_s,
+        sim_config=sim_config_kwargs(args, [f"cameras.obs_res={args.obs_res}"] if args.obs_res else []),
+        prefetch_at=args.prefetch_at, chunking=chunking_kwargs(args), dataset_dir=args.dataset_dir,
+        randomization={"enabled": False} if args.no_randomization else None,
+    )
+    pi0_kwargs = dict(host=args.host, port=args.port, **policy_client_kwargs(args))
+    sim_runs = sorted({job.sim_run for job in jobs})
+    # Before spawning workers or loading Genesis
+    sim_configs = [check_sim_config(sim_run, **runner_kwargs["sim_config"]) for sim_run in sim_runs]
+    warmup_kwargs = dict(cam_res=OBS_CAM_RES[sim_configs[0].cameras.obs_res], prompt=jobs[0].prompt)
+    if args.profile:
+        os.environ["ROBOSANDBOX_PROFILE"] = "1"  # Also picked up by (spawned) scheduler workers
+        profiler.enable()
+    if args.workers > 1:
+        scheduler = EpisodeScheduler(
+            args.workers, backend=args.backend, runner_kwargs=runner_kwargs, pi0_kwargs=pi0_kwargs,
+            max_retries=args.max_retries, warmup_kwargs=warmup_kwargs,
+        )
+        results, failures = scheduler.run(jobs)
+        scheduler.print_worker_stats()
+        for failure in failures:
+            print(f"FAILED after retries: {failure['sim_run']} seed={failure['seed']} ep={failure['episode']}")
+    else:
+        from src.inference.pi0_inference import Pi0Inference
+
+        def build_sims():
+            import genesis as gs
+            from src.evaluation.runner import EvalRunner
+            from src.environment.scene_cache import use_persistent_kernel_cache
+
+            use_persistent_kernel_cache()
+            gs.init(backend=gs.gpu if args.backend == "gpu" else gs.cpu, logging_level="warning")
+            runner = EvalRunner(None, **runner_kwargs)
+            runner.build_sims(sim_runs)
+            return runner
+
+        # Policy connect + warm-up while Genesis initializes and builds all scenes, see src/utils/startup.py
+        pi0, runner = startup.run(
+            connect_policy=lambda: Pi0Inference(**pi0_kwargs),
+            build_sim=build_sims,
+            warmup=lambda pi0: pi0.warmup(**warmup_kwargs),
+        )
+        runner.set_policy(pi0)
+        print(startup.summary())
+        results = runner.run(jobs)
+        print(pi0.client_summary())
+
+    out = args.out or get_temp_data_abs_path() / "eval" / f"results_{datetime.now().strftime('%m-%d-%y_%H-%M')}.csv"
+    write_results_csv(results, out)
+    print_results_summary(results)
+    print(f"Results written to {out}")
@@ -0,0 +1,81 @@
+from src.inference.pi0_inference import Pi0Inference
+from src.robots.droid_const import OBS_CAM_RES
+from src.sims.registry import check_sim_config, build_sim_settings
+from src.utils import profiler
+from src.utils.startup import Startup
+from src.utils.run_sim_helper import sim_arg_parser, auto_reset
+
+
+"""
+Run the same prompt over N parallel envs of one scene, built once with `scene.build(n_envs=N)`.
+
+python sim_runs/run_pi0_rollout_batched.py --sim_run replicad_apt0_partnet_objs --n_envs 4 \
+    --prompt "Place the plastic bottle into the bowl."
+"""
+
+ENV_SPACING = (30.0, 30.0)  # Keep neighbouring apartments out of camera view
+
+if __name__ == "__main__":
+    startup = Startup()
+    args = sim_arg_parser()
+    task_prompt, sim_setting, n_envs = args["task_prompt"], args["sim_run"], args["n_envs"]
+    if args["profile"]:
+        profiler.enable(trace_file=args["trace"])
+
+    sim_config = check_sim_config(sim_setting, **args["sim_config"])  # Fail fast, before the model client and Genesis
+
+    def build_sim():
+        # Genesis is only imported here, while the model client connects and warms up, see src/utils/startup.py
+        import genesis as gs
+        from src.robots.droid_batched import BatchedDroidManager
+        from src.sims.snapshot import SceneSnapshot
+        from src.sims.sim_scene import create_sim_scene
+        from src.environment.scene_cache import use_persistent_kernel_cache
+
+        ss = build_sim_settings(sim_config)
+        use_persistent_kernel_cache()
+        gs.init(backend=gs.gpu, logging_level="info")
+        scene = create_sim_scene(ss)
+        ss.setup_scene(scene)
+        franka_droid = BatchedDroidManager(
+            scene, n_envs, ss.franka_pos, ss.franka_quat, rest_pose=ss.rest_pose, obs_cam_res=ss.obs_cam_res,
+            mjcf_file=ss.mjcf_file,
+            action_interpolation=ss.action_interpolation,
+        )
+        # Build sim once for all envs and reset franka arms
+        scene.build(n_envs=n_envs, env_spacing=ENV_SPACING)
+        franka_droid.setup()
+        # Settled start state of all envs, any subset of envs can be restored from it independently
+        start_snapshot = SceneSnapshot(scene)
+        start_snapshot.capture(franka_droid.hold_start_pos)
+        return ss, franka_droid, start_snapshot
+
+    # Model inference (connect + warm-up at the batch size) and sim build run concurrently
+    pi0, (ss, franka_droid, start_snapshot) = startup.run(
+        connect_policy=lambda: Pi0Inference(**args["policy_client"]),
+        build_sim=build_sim,
+        warmup=lambda pi0: pi0.warmup(
+            cam_res=OBS_CAM_RES[sim_config.cameras.obs_res], prompt=task_prompt, n_envs=n_envs,
+        ),
+    )
+
+    # Run sim loop
+    loop = 0
+    restart_loop_mod = 40
+    while True:
+        if auto_reset(loop=loop, restart_loop_mod=restart_loop_mod, max_loops=restart_loop_mod*5):
+            print("Resetting all envs!")
+            profiler.print_episode_report()
+            print(pi0.client_summary())
+            print(franka_droid.tracking_error.summary())
+            franka_droid.tracking_error.reset()
+            envs_idx = list(range(n_envs))
+            start_snapshot.restore(envs_idx=envs_idx)
+
+        with profiler.timer("loop/iteration"):
+            scene_obv = franka_droid.get_scene_observation()
+            # One request for all envs (if the server supports batches)
+            actions = pi0.forward_batch(observations=scene_obv, prompts=task_prompt, actions=8)
+            franka_droid.apply_abs_joint_actions(actions=actions, steps_per_action=ss.steps_per_action)
+        startup.first_action()
+        loop += 1
@@ -1,9 +1,5 @@
-import genesis as gs
-
-from src.robots.droid import DroidManager
-from src.utils.cam_pose_debug import CamPoseDebug
 from src.inference.pi0_inference import Pi0Inference
-from src.sims.replicad_plus_objs_scenes import get_sim_settings
+from src.sims.registry import check_sim_config, get_sim_settings
 from src.utils.debug import enter_interactive, inspect_structure
 from src.utils.run_sim_helper import user_input_should_reset, user_input_update_prompt, sim_arg_parser
 
@@ -15,33 +11,27 @@ if __name__ == "__main__":
     args = sim_arg_parser()
     task_prompt, sim_setting = args["task_prompt"], args["sim_run"]
 
+    check_sim_config(sim_setting, **args["sim_config"])  # Fail fast, before the model client and Genesis
     if RUN_VLA:
         # Model inference
-        pi0 = Pi0Inference()
-    # Setup sim
-    ss = get_sim_settings(sim_name=sim_setting)
+        pi0 = Pi0Inference(**args["policy_client"])
+    # Setup sim, Genesis is only imported now
+    import genesis as gs
+    from src.robots.droid import DroidManager
+    from src.utils.cam_pose_debug import CamPoseDebug
+    from src.sims.sim_scene import create_sim_scene
+    from src.environment.scene_cache import use_persistent_kernel_cache
+
+    ss = get_sim_settings(sim_name=sim_setting, **args["sim_config"])
+    use_persistent_kernel_cache()
     gs.init(backend=gs.gpu, logging_level="info")
-    scene = gs.Scene(
-        show_viewer=True,  # Show viewer to help debug
-        show_FPS=False,
-        rigid_options=gs.options.RigidOptions(
-            integrator=gs.integrator.implicitfast,
-            constraint_solver=gs.constraint_solver.Newton,
-            iterations=200,
-            ls_iterations=50,
-            tolerance=1e-6,
-            contact_resolve_time=0.02
-        ),
-        sim_options=gs.options.SimOptions(
-            dt=ss.dt,  # 0.002,
-            substeps=20,
-            requires_grad=False,
-        ),
-        renderer=gs.renderers.Rasterizer()
-    )
+    scene = create_sim_scene(ss, show_viewer=True)  # Show viewer to help debug
     ss.setup_scene(scene)
-    ss.render_all_steps = True  # Render cams every step to help debug
-    franka_droid = DroidManager(scene, ss.franka_pos, ss.franka_quat, ss.render_all_steps, rest_pose=ss.rest_pose, enable_left_2_cam=True)
+    franka_droid = DroidManager(
+        scene, ss.franka_pos, ss.franka_quat, rest_pose=ss.rest_pose, enable_left_2_cam=True,
+        obs_cam_res=ss.obs_cam_res, record_cam_res=ss.record_cam_res, mjcf_file=ss.mjcf_file,
+        action_interpolation=ss.action_interpolation,
+    )
     # Build sim and reset franka arm
     scene.build()
     franka_droid.setup()
@@ -51,11 +41,11 @@ if __name__ == "__main__":
     """
     Make sure setup is correct. Type `exit` to continue.
     E.g. get pos/rot of an object:
-        ss._pn_bottle.get_pos()
-        ss._pn_bottle.get_quat()
+        ss.objects["pn_bottle"].get_pos()
+        ss.objects["pn_bottle"].get_quat()
     Or set it:
-        ss._pn_bottle.set_pos([0.8, -2.45, 0.97])
-        ss._pn_bottle.set_quat([1/sqrt(2), 0, 0, -1/sqrt(2)])  # rotate -90 degrees about z-axis
+        ss.objects["pn_bottle"].set_pos([0.8, -2.45, 0.97])
+        ss.objects["pn_bottle"].set_quat([1/sqrt(2), 0, 0, -1/sqrt(2)])  # rotate -90 degrees about z-axis
     move the scene a few steps to see how objects resolve:
         franka_droid.steps()  # it will also call scene.step() under the hood
     """
@@ -0,0 +1,57 @@
+import sys
+import json
+import argparse
+
+from src.sims.sim_config import list_scenes, list_presets, load_sim_config
+from src.sims.registry import validate_sim_config
+from src.utils.run_sim_helper import add_sim_config_args, sim_config_kwargs
+
+
+"""
+Fast scene/config CLI, never imports Genesis, torch or the ReplicaCAD scene modules:
+    python sim_runs/sim_configs.py list
+    python sim_runs/sim_configs.py validate                       # every scene with every preset
+    python sim_runs/sim_configs.py validate --scenes replicad_apt5_kitchen --preset fast --set sim.dt=0.005
+    python sim_runs/sim_configs.py show --scenes replicad_apt0_partnet_objs --config sweep.toml
+validate exits with 1 if any config is invalid, e.g. as a check before launching eval workers.
+"""
+
+
+def _configs(args):
+    for sim_run in args.scenes or list_scenes():
+        yield load_sim_config(sim_run, **sim_config_kwargs(args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List, validate and show sim configs (configs/)")
+    parser.add_argument("command", choices=["list", "validate", "show"])
+    parser.add_argument("--scenes", nargs="+", default=None, help="Default: all")
+    parser.add_argument("--no_files", action="store_true", help="validate: skip checking asset/dataset files")
+    add_sim_config_args(parser)
+    parser.set_defaults(preset=None)  # validate: all presets unless one is given
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print(f"Presets: {', '.join(list_presets())}")
+        for config in _configs(args):
+            task = config.task.type or "no success predicate"
+            print(f"  {config.name:<32} {config.scene.builder}/{config.scene.replicad}, {len(config.objects)} objects, {task}")
+            if config.task.prompt:
+                print(f"  {'':<32} \"{config.task.prompt}\"")
+    elif args.command == "show":
+        for config in _configs(args):
+            print(json.dumps(config.to_dict(), indent=2))
+    else:
+        n_invalid = 0
+        for sim_run in args.scenes or list_scenes():
+            for preset in (list_presets() if args.preset is None else [args.preset]):
+                try:
+                    config = load_sim_config(sim_run, **{**sim_config_kwargs(args), "preset": preset})
+                    problems = validate_sim_config(config, check_files=not args.no_files)
+                except ValueError as e:
+                    problems = [str(e)]
+                n_invalid += bool(problems)
+                print(f"{sim_run} ({preset}): {'OK' if not problems else 'INVALID'}")
+                for problem in problems:
+                    print(f"  - {problem}")
+        sys.exit(1 if n_invalid else 0)
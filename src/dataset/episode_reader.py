@@ -0,0 +1,136 @@
+import json
+from pathlib import Path
+from collections import OrderedDict
+
+import numpy as np
+
+from src.dataset.episode_writer import IMAGE_KEYS, FORMAT_VERSION, image_chunk_file
+
+
+"""
+Reader for episodes recorded with EpisodeWriter (see episode_writer.py for the on-disk layout).
+
+Low-dim columns (joint/gripper positions, actions, ...) are memory-mapped, so opening a dataset is cheap whatever
+its size and random access only touches the pages read. Image columns are stored in compressed chunks, a chunk is
+decompressed on first access and kept in a small LRU cache, so streaming through an episode in order decompresses
+every chunk once.
+"""
+
+
+def list_episodes(root: str | Path) -> list[Path]:
+    """
+    Complete episode dirs under root (meta.json is written last, unfinished/discarded episodes have none).
+    """
+    return sorted(meta_file.parent for meta_file in Path(root).glob("*/meta.json"))
+
+
+class EpisodeReader:
+
+    def __init__(self, episode_dir: str | Path, cached_chunks: int = 2):
+        """
+        cached_chunks: decompressed image chunks kept in memory, per image key
+        """
+        self._dir = Path(episode_dir)
+        with open(self._dir / "meta.json", "r") as f:
+            self.meta = json.load(f)
+        if self.meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported episode format {self.meta['format_version']} in {self._dir}")
+        self._low_dim = {
+            key: np.load(self._dir / f"{key}.npy", mmap_mode="r")
+            for key, spec in self.meta["keys"].items() if spec["storage"] == "npy"
+        }
+        self._cached_chunks = cached_chunks
+        self._chunks = {key: OrderedDict() for key in IMAGE_KEYS}  # key -> chunk_idx -> (chunk_size, H, W, 3)
+
+    @property
+    def dir(self) -> Path:
+        return self._dir
+
+    @property
+    def sim_run(self) -> str:
+        return self.meta["sim_run"]
+
+    def __len__(self) -> int:
+        return self.meta["n_steps"]
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        Whole low-dim column, memory-mapped (T, ...), e.g. "action_chunk" or "observation/joint_position".
+        """
+        return self._low_dim[key]
+
+    def prompt(self, step: int) -> str:
+        return self.meta["prompts"][int(self._low_dim["language_instruction"][step])]
+
+    def image(self, key: str, step: int) -> np.ndarray:
+        chunk_idx, offset = divmod(step, self.meta["chunk_size"])
+        chunks = self._chunks[key]
+        if chunk_idx in chunks:
+            chunks.move_to_end(chunk_idx)
+        else:
+            with np.load(image_chunk_file(self._dir, key, chunk_idx)) as data:
+                chunks[chunk_idx] = data["images"]
+            if len(chunks) > self._cached_chunks:
+                chunks.popitem(last=False)
+        return chunks[chunk_idx][offset]
+
+    def __getitem__(self, step: int) -> dict:
+        """
+        One step, with the same keys as the recorded dataset plus "prompt".
+        """
+        if step < 0:
+            step += len(self)
+        if not 0 <= step < len(self):
+            raise IndexError(f"Step {step} out of range for episode of {len(self)} steps")
+        sample = {key: np.asarray(column[step]) for key, column in self._low_dim.items() if key != "language_instruction"}
+        for key in IMAGE_KEYS:
+            sample[key] = self.image(key, step)
+        sample["prompt"] = self.prompt(step)
+        return sample
+
+    def __iter__(self):
+        for step in range(len(self)):
+            yield self[step]
+
+    def droid_observation(self, step: int) -> dict:
+        """
+        Recorded step in the format of DroidManager.get_scene_observation(..), so it can go through
+        Pi0Inference.forward(..) again. The gripper is mapped back to finger angles (radians, both fingers), the model
+        input normalizes it again to exactly the recorded [0, 1] state.
+        """
+        gripper = float(self._low_dim["observation/gripper_position"][step][0]) * (np.pi/4)
+        return {
+            "joint_positions": np.asarray(self._low_dim["observation/joint_position"][step]),
+            "gripper_position": np.array([gripper, gripper]),
+            **{obs_key: self.image(key, step) for key, obs_key in IMAGE_KEYS.items()},
+        }
+
+
+class DatasetReader:
+    """
+    All episodes of a dataset dir, with random access over the steps of all episodes.
+    """
+
+    def __init__(self, root: str | Path, cached_chunks: int = 2):
+        self.episodes = [EpisodeReader(episode_dir, cached_chunks) for episode_dir in list_episodes(root)]
+        self._step_offsets = np.cumsum([0] + [len(episode) for episode in self.episodes])
+
+    def __len__(self) -> int:
+        return int(self._step_offsets[-1])
+
+    def locate(self, idx: int) -> tuple[int, int]:
+        """
+        Global step index -> (episode index, step in episode).
+        """
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Step {idx} out of range for dataset of {len(self)} steps")
+        episode_idx = int(np.searchsorted(self._step_offsets, idx, side="right")) - 1
+        return episode_idx, idx - int(self._step_offsets[episode_idx])
+
+    def __getitem__(self, idx: int) -> dict:
+        episode_idx, step = self.locate(idx)
+        return self.episodes[episode_idx][step]
+
+    def __iter__(self):
+        for episode in self.episodes:
+            yield from episode
@@ -0,0 +1,233 @@
+import os
+import json
+import queue
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from src.inference.gripper import normalize_gripper
+
+
+"""
+Episode dataset writer, for generating fine-tuning data from sim roll-outs.
+
+One step is one inference call: the observation sent to the model, the prompt and the action chunk it returned.
+Keys follow the DROID dataset (see the observation spec in src/inference/pi0_inference.py):
+
+    <root>/<episode_name>/
+        meta.json                                   sim_run, n_steps, chunk_size, per-key dtype/shape, prompts, ...
+        observation/joint_position.npy              (T, 7) float64, radians
+        observation/gripper_position.npy            (T, 1) float64, [0, 1] (0: open, 1: closed), as sent to Pi0
+        observation/exterior_image_1_left/          (T, H, W, 3) uint8, in compressed chunks of `chunk_size` steps:
+            chunk_000000.npz ...
+        observation/wrist_image_left/               same as above
+        action.npy                                  (T, 8) first action of each chunk (7 joint pos + gripper)
+        action_chunk.npy                            (T, A, 8) full action chunk returned by the model
+        language_instruction.npy                    (T,) int32, index into meta["prompts"]
+
+Low-dim columns are tiny and kept in memory until the episode ends, then written as plain .npy (so they can be
+memory-mapped, see episode_reader.py). Image columns are compressed and written chunk by chunk while the episode
+runs. All disk work happens on a background thread behind a bounded queue, add_step(..) only copies the arrays.
+An episode dir is complete once its meta.json exists (written last).
+"""
+
+FORMAT_VERSION = 1
+IMAGE_KEYS = {
+    "observation/exterior_image_1_left": "ext_camera_img",
+    "observation/wrist_image_left": "wrist_cam_img",
+}
+
+
+def image_chunk_file(episode_dir: Path, key: str, chunk_idx: int) -> Path:
+    return episode_dir / key / f"chunk_{chunk_idx:06d}.npz"
+
+
+def _write_npy(file: Path, array: np.ndarray):
+    file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = file.with_suffix(".tmp.npy")  # Write + rename so readers never see a partial file
+    np.save(tmp_file, array)
+    os.replace(tmp_file, file)
+
+
+class _Episode:
+
+    def __init__(self, episode_dir: Path, sim_run: str, chunk_size: int, metadata: dict):
+        self.dir = episode_dir
+        self.sim_run = sim_run
+        self.chunk_size = chunk_size
+        self.metadata = metadata
+        self.n_steps = 0
+        self.low_dim = {"observation/joint_position": [], "observation/gripper_position": [], "action": [],
+                        "action_chunk": [], "language_instruction": []}
+        self.images = {key: [] for key in IMAGE_KEYS}  # Current (not yet written) chunk
+        self.image_shapes = {key: [] for key in IMAGE_KEYS}
+        self.n_chunks = 0
+        self.prompts = []
+
+
+class EpisodeWriter:
+
+    def __init__(self, root: str | Path, chunk_size: int = 16, max_queued_steps: int = 64):
+        """
+        root: dataset dir, one sub-dir per episode
+        chunk_size: steps per compressed image chunk
+        max_queued_steps: steps waiting to be written before add_step(..) blocks (bounds memory if the disk is slow)
+        """
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._chunk_size = chunk_size
+        self._episode = None
+        self._queue = queue.Queue(maxsize=max_queued_steps)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="episode_writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def start_episode(self, episode_name: str, sim_run: str, **metadata) -> Path:
+        """
+        metadata: anything JSON serializable to keep in meta.json (seed, obs res, ...)
+        """
+        if self._episode is not None:
+            raise RuntimeError(f"Episode {self._episode.dir.name} still open, call end_episode(..) first")
+        episode_dir = self._root / episode_name
+        if (episode_dir / "meta.json").exists():
+            raise FileExistsError(f"Episode already recorded: {episode_dir}")
+        self._episode = _Episode(episode_dir, sim_run, self._chunk_size, metadata)
+        return episode_dir
+
+    def add_step(self, observation: dict, prompt: str, action_chunk: np.ndarray):
+        """
+        observation: as returned by DroidManager.get_scene_observation(..)
+        action_chunk: (A, 8) as returned by Pi0Inference.forward(..)
+        Arrays are copied here, observation buffers are reused by the next observations.
+        """
+        if self._episode is None:
+            raise RuntimeError("No episode started, call start_episode(..) first")
+        gripper_norm = normalize_gripper(np.asarray(observation["gripper_position"]))  # As sent to Pi0
+        step = {
+            "observation/joint_position": np.array(observation["joint_positions"], dtype=np.float64),
+            "observation/gripper_position": gripper_norm.astype(np.float64),
+            "action_chunk": np.array(action_chunk, dtype=np.float64),
+            "prompt": prompt,
+        }
+        for key, obs_key in IMAGE_KEYS.items():
+            step[key] = np.array(observation[obs_key], dtype=np.uint8)
+        self._put(("step", self._episode, step))
+
+    def end_episode(self, **metadata):
+        """
+        Queue the episode for finalizing (last image chunk, low-dim columns, meta.json), doesn't block.
+        metadata: extra meta.json entries known only at the end (success, termination, ...)
+        """
+        if self._episode is None:
+            return
+        self._episode.metadata.update(metadata)
+        self._put(("end", self._episode, None))
+        self._episode = None
+
+    def discard_episode(self):
+        """
+        Drop the current episode without finalizing it, doesn't block. Its dir (image chunks already written) is
+        removed once its queued steps are written.
+        """
+        if self._episode is None:
+            return
+        self._put(("discard", self._episode, None))
+        self._episode = None
+
+    def flush(self):
+        """
+        Block until everything queued so far is on disk.
+        """
+        self._queue.join()
+        if self._error is not None:
+            raise RuntimeError("Episode writer failed") from self._error
+
+    def close(self):
+        self.end_episode()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("Episode writer failed") from self._error
+
+    def _put(self, item):
+        if self._error is not None:
+            raise RuntimeError("Episode writer failed") from self._error
+        self._queue.put(item)  # Blocks when the writer is behind
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                kind, episode, step = item
+                if self._error is None:
+                    if kind == "step":
+                        self._write_step(episode, step)
+                    elif kind == "discard":
+                        shutil.rmtree(episode.dir, ignore_errors=True)
+                    else:
+                        self._finalize(episode)
+            except Exception as e:  # Keep draining the queue so producers never block on a dead writer
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write_step(self, episode: _Episode, step: dict):
+        if step["prompt"] not in episode.prompts:
+            episode.prompts.append(step["prompt"])
+        episode.low_dim["observation/joint_position"].append(step["observation/joint_position"])
+        episode.low_dim["observation/gripper_position"].append(step["observation/gripper_position"])
+        episode.low_dim["action"].append(step["action_chunk"][0])
+        episode.low_dim["action_chunk"].append(step["action_chunk"])
+        episode.low_dim["language_instruction"].append(episode.prompts.index(step["prompt"]))
+        for key in IMAGE_KEYS:
+            episode.images[key].append(step[key])
+            episode.image_shapes[key] = list(step[key].shape)
+        episode.n_steps += 1
+        if len(episode.images[next(iter(IMAGE_KEYS))]) == episode.chunk_size:
+            self._write_image_chunk(episode)
+
+    def _write_image_chunk(self, episode: _Episode):
+        for key in IMAGE_KEYS:
+            file = image_chunk_file(episode.dir, key, episode.n_chunks)
+            file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = file.with_suffix(".tmp.npz")
+            np.savez_compressed(tmp_file, images=np.stack(episode.images[key]))
+            os.replace(tmp_file, file)
+            episode.images[key] = []
+        episode.n_chunks += 1
+
+    def _finalize(self, episode: _Episode):
+        if episode.images[next(iter(IMAGE_KEYS))]:
+            self._write_image_chunk(episode)
+        keys = {}
+        for key, values in episode.low_dim.items():
+            dtype = np.int32 if key == "language_instruction" else np.float64
+            array = np.asarray(values, dtype=dtype)
+            _write_npy(episode.dir / f"{key}.npy", array)
+            keys[key] = {"dtype": array.dtype.str, "shape": list(array.shape[1:]), "storage": "npy"}
+        for key in IMAGE_KEYS:
+            keys[key] = {"dtype": np.dtype(np.uint8).str, "shape": episode.image_shapes[key], "storage": "chunks"}
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "sim_run": episode.sim_run,
+            "n_steps": episode.n_steps,
+            "chunk_size": episode.chunk_size,
+            "n_chunks": episode.n_chunks,
+            "prompts": episode.prompts,
+            "keys": keys,
+            **episode.metadata,
+        }
+        tmp_file = episode.dir / "meta.json.tmp"
+        episode.dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_file, episode.dir / "meta.json")
@@ -0,0 +1,83 @@
+from typing import TYPE_CHECKING
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.dataset.episode_reader import EpisodeReader
+from src.inference.pipelined_rollout import PipelinedRollout
+from src.inference.chunked_rollout import ChunkedRollout
+
+if TYPE_CHECKING:  # Replays also run without Genesis, e.g. in tests
+    from src.robots.droid import DroidManager
+
+
+"""
+Open-loop replay of a recorded episode, no model server needed.
+
+The recorded action chunks are fed back, in order, through the same roll-out code that recorded them (serial loop,
+PipelinedRollout incl. its chunk blending, or ChunkedRollout incl. its temporal ensembling), so the exact joint targets of the original run are applied through
+DroidManager.apply_abs_joint_actions(..). From the same start snapshot this reproduces the trajectory, and the
+drift between replayed and recorded joint positions is a regression check for sim/physics changes.
+"""
+
+
+class RecordedPolicy:
+    """
+    Drop-in for Pi0Inference that returns the recorded action chunks, and tracks how far the replayed observations
+    drift from the recorded ones.
+    """
+
+    def __init__(self, reader: EpisodeReader):
+        self._reader = reader
+        self._chunks = reader.column("action_chunk")
+        self._recorded_joints = reader.column("observation/joint_position")
+        self._step = 0
+        self.joint_errors = []  # Per inference call, max abs joint position error (radians)
+
+    @property
+    def remaining(self) -> int:
+        return len(self._reader) - self._step
+
+    def forward(self, droid_observation: dict, prompt: str = None, actions: int | None = None) -> np.ndarray:
+        if self._step >= len(self._reader):
+            raise IndexError(f"Replay asked for chunk {self._step}, episode only has {len(self._reader)}")
+        joints = np.asarray(droid_observation["joint_positions"], dtype=np.float64)
+        self.joint_errors.append(float(np.max(np.abs(joints - self._recorded_joints[self._step]))))
+        chunk = np.array(self._chunks[self._step])
+        self._step += 1
+        return chunk[:actions]
+
+    def forward_async(self, droid_observation: dict, prompt: str = None, actions: int | None = None) -> Future:
+        future = Future()
+        future.set_result(self.forward(droid_observation, prompt, actions))
+        return future
+
+    def close(self):
+        pass
+
+
+def replay_episode(droid: "DroidManager", reader: EpisodeReader, steps_per_action: int) -> list[float]:
+    """
+    Replay the episode open-loop from the current sim state (restore the start snapshot first).
+    Returns the max abs joint position error at every inference step of the original run.
+    """
+    meta = reader.meta
+    policy = RecordedPolicy(reader)
+    prompt = reader.prompt(0) if len(reader) else ""
+    if meta.get("prefetch_at") is not None:
+        pipelined = PipelinedRollout(
+            droid, policy, steps_per_action, actions_per_chunk=meta["actions_per_chunk"],
+            prefetch_at=meta["prefetch_at"],
+        )
+        for _ in range(meta["steps"]):
+            pipelined.step(prompt=prompt)
+    elif meta.get("chunking") is not None:
+        chunked = ChunkedRollout(droid, policy, steps_per_action, **meta["chunking"])
+        for _ in range(meta["steps"]):
+            chunked.step(prompt=prompt)
+    else:
+        for _ in range(meta["steps"]):
+            scene_obv = droid.get_scene_observation()
+            actions = policy.forward(droid_observation=scene_obv, prompt=prompt)
+            droid.apply_abs_joint_actions(actions=actions, steps_per_action=steps_per_action)
+    return policy.joint_errors
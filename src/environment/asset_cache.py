@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+import trimesh
+
+from src.environment.scene_cache import get_cache_dir, file_sha256
+
+
+"""
+Cache of preprocessed collision geometry for mesh assets (GLB/OBJ) loaded with collision.
+
+Genesis decimates (and optionally convex-decomposes) collision meshes every time an asset is loaded. Instead,
+`sim_runs/preprocess_assets.py` does that once for every asset the scenes use (in a process pool), and writes for
+each asset a small URDF that uses the original file as visual mesh and the processed mesh(es) as collision geometry.
+Loaders go through collision_mesh_morph(..), which picks up the URDF if the asset was preprocessed, otherwise falls
+back to letting Genesis process the mesh. ReplicaCAD objects with collision are processed on their first load instead
+(process_missing), so their geometry is cached without running the script.
+
+Everything lives in temp_data/cache/assets (one dir per source file hash + processing params), indexed by a manifest
+keyed by source file hash, so an edited asset is never matched to stale geometry.
+URDF/MJCF assets (PartNet, Google Scanned Objects) already ship decomposed collision geometry and are not touched.
+"""
+
+DEFAULT_FACE_NUM = 500  # Same as Genesis' default `decimate_face_num`
+_processed_assets_enabled = True
+_manifest_cache = (None, None)  # (manifest file mtime, manifest), reloaded when the file changes
+_sha256_cache = {}  # (resolved source path, mtime, size) -> sha256, hashing a large GLB costs more than loading it
+
+
+def set_processed_assets_enabled(enabled: bool):
+    """
+    Globally enable/disable loading preprocessed assets (e.g. disabled while discovering the source assets).
+    """
+    global _processed_assets_enabled
+    _processed_assets_enabled = enabled
+
+
+def _manifest_file() -> Path:
+    return get_cache_dir("assets") / "manifest.json"
+
+
+def load_manifest() -> dict:
+    """
+    {"assets": {source_sha256: {"source": str, "urdf": str, "face_num": int, "decompose": bool, ...}}}
+    """
+    if not _manifest_file().exists():
+        return {"assets": {}}
+    with open(_manifest_file(), "r") as f:
+        return json.load(f)
+
+
+def _cached_manifest() -> dict:
+    global _manifest_cache
+    try:
+        mtime = _manifest_file().stat().st_mtime_ns
+    except FileNotFoundError:
+        return {"assets": {}}
+    if _manifest_cache[0] != mtime:
+        _manifest_cache = (mtime, load_manifest())
+    return _manifest_cache[1]
+
+
+def _source_sha256(source: str | Path) -> str:
+    stat = os.stat(source)
+    key = (str(Path(source).resolve()), stat.st_mtime_ns, stat.st_size)
+    if key not in _sha256_cache:
+        _sha256_cache[key] = file_sha256(source)
+    return _sha256_cache[key]
+
+
+def save_manifest(manifest: dict):
+    tmp_file = _manifest_file().with_suffix(".tmp")  # Write + rename so concurrent runs never read a partial file
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, _manifest_file())
+
+
+def asset_key(sha256: str, face_num: int, decompose: bool) -> str:
+    return hashlib.sha256(f"{sha256}-{face_num}-{decompose}".encode()).hexdigest()[:32]
+
+
+def _decimate(mesh: trimesh.Trimesh, face_num: int) -> trimesh.Trimesh:
+    import fast_simplification  # Genesis dependency, used for its own decimation
+
+    if len(mesh.faces) <= face_num:
+        return mesh
+    verts, faces = fast_simplification.simplify(
+        mesh.vertices, mesh.faces, target_reduction=1.0 - face_num / len(mesh.faces)
+    )
+    return trimesh.Trimesh(verts, faces, process=True)
+
+
+def _convex_decompose(mesh: trimesh.Trimesh) -> list[trimesh.Trimesh]:
+    import coacd  # Optional, only needed with --decompose
+
+    parts = coacd.run_coacd(coacd.Mesh(mesh.vertices, mesh.faces))
+    return [trimesh.Trimesh(verts, faces) for verts, faces in parts]
+
+
+def _write_urdf(urdf_file: Path, visual_file: str, collision_files: list[Path]):
+    collisions = "\n".join(
+        f'    <collision><geometry><mesh filename="{f.name}"/></geometry></collision>' for f in collision_files
+    )
+    urdf_file.write_text(
+        f'<?xml version="1.0"?>\n'
+        f'<robot name="{urdf_file.stem}">\n'
+        f'  <link name="base">\n'
+        f'    <visual><geometry><mesh filename="{visual_file}"/></geometry></visual>\n'
+        f'{collisions}\n'
+        f'  </link>\n'
+        f'</robot>\n'
+    )
+
+
+def process_asset(source: str, face_num: int = DEFAULT_FACE_NUM, decompose: bool = False) -> dict:
+    """
+    Decimate (and optionally convex-decompose) the collision geometry of one mesh asset and write its URDF.
+    Runs in a pool worker, so only returns plain data, the main process updates the manifest.
+    """
+    sha256 = file_sha256(source)
+    key = asset_key(sha256, face_num, decompose)
+    out_dir = get_cache_dir("assets", key)
+
+    mesh = trimesh.load(source, force="mesh")  # All sub-meshes in one, in the asset frame
+    collision = _decimate(mesh, face_num)
+    parts = _convex_decompose(collision) if decompose else [collision]
+    collision_files = []
+    for i, part in enumerate(parts):
+        part_file = out_dir / f"collision_{i}.obj"
+        part.export(str(part_file))
+        collision_files.append(part_file)
+
+    urdf_file = out_dir / f"{Path(source).stem}.urdf"
+    _write_urdf(urdf_file, str(Path(source).resolve()), collision_files)
+    return {
+        "key": key,
+        "source": str(source),
+        "sha256": sha256,
+        "urdf": str(urdf_file),
+        "face_num": face_num,
+        "decompose": decompose,
+        "faces_in": int(len(mesh.faces)),
+        "faces_out": int(sum(len(p.faces) for p in parts)),
+    }
+
+
+def lookup_processed_asset(source: str | Path, manifest: dict = None) -> Path | None:
+    """
+    URDF of the preprocessed asset, or None if this exact file content wasn't preprocessed.
+    The manifest is read once (again only after it changed) and source hashes are cached by path and mtime.
+    """
+    if not _processed_assets_enabled:
+        return None
+    manifest = manifest or _cached_manifest()
+    if not manifest["assets"]:
+        return None
+    asset = manifest["assets"].get(_source_sha256(source))
+    if asset is None or not Path(asset["urdf"]).exists():
+        return None
+    return Path(asset["urdf"])
+
+
+def _process_missing_asset(source: str | Path) -> Path | None:
+    """
+    Process an asset that isn't in the manifest yet and add it, None if processing failed.
+    Concurrent runs can overwrite each other's manifest update, the asset is then processed again on a later load.
+    """
+    print(f"Processing collision geometry of {source}, cached for later runs...")
+    try:
+        asset = process_asset(str(source))
+    except Exception as e:
+        print(f"Processing {source} failed, Genesis processes it at load time ({type(e).__name__}: {e})")
+        return None
+    manifest = load_manifest()
+    manifest["assets"][asset["sha256"]] = asset
+    save_manifest(manifest)
+    return Path(asset["urdf"])
+
+
+def collision_mesh_morph(file: str | Path, pos, quat, fixed: bool, scale: float = 1, process_missing: bool = False):
+    """
+    Morph for a mesh asset with collision: the preprocessed URDF if there is one, otherwise the plain mesh, with
+    Genesis decimating the collision geometry at load time.
+    process_missing: process (and cache) the asset now if it wasn't preprocessed yet
+    """
+    import genesis as gs  # Not at module level, keeps preprocessing pool workers light
+
+    urdf = lookup_processed_asset(file)
+    if urdf is None and process_missing and _processed_assets_enabled:
+        urdf = _process_missing_asset(file)
+    if urdf is not None:
+        return gs.morphs.URDF(
+            file=str(urdf), pos=pos, quat=quat, scale=scale, fixed=fixed,
+            visualization=True, collision=True, convexify=False,
+        )
+    return gs.morphs.Mesh(
+        file=str(file),
+        pos=pos,
+        quat=quat,
+        scale=scale,
+        visualization=True,
+        collision=True,
+        fixed=fixed,
+        convexify=False,  # Don't convert to convex-hull, try to keep original shape as much as possible (and most objects in scene have some concavity)
+        decimate=True,    # Simplify mesh for collision
+        decompose_nonconvex=False,
+    )
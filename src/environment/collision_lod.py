@@ -0,0 +1,143 @@
+import os
+import json
+
+import numpy as np
+import trimesh
+
+from src.environment.scene_cache import get_cache_dir
+
+
+"""
+Automatic collision level-of-detail for the furniture of a ReplicaCAD scene plan.
+
+Instead of a hand-maintained `keep_as_rigid` set, collision is enabled only for objects whose bounding box reaches
+into the Franka's workspace (a sphere of its max reach around the shoulder, plus a margin), and the collision
+geometry is picked by how likely detailed contact is:
+    - "mesh": object close to the shoulder (within `detail_radius`), decimated mesh (same as `keep_as_rigid`)
+    - "hull": object further away, convex hull
+    - "box":  box-like object (convex hull fills most of its bounding box, e.g. tables, cabinets), or anything only
+              grazing the edge of the workspace: invisible, fixed box proxy, same as the hand-placed `_table_plane`
+              in ReplicadApt4_GoogleScanObjs
+Everything else is visual only. Fewer and cheaper collision geoms make every Newton solver step cheaper.
+"""
+
+FRANKA_REACH = 0.855           # m, Panda max reach from the shoulder (joint 2)
+FRANKA_SHOULDER_OFFSET = 0.333  # m, shoulder height above the base
+
+
+def _mesh_stats_file():
+    return get_cache_dir() / "mesh_stats.json"
+
+
+def _file_id(file: str) -> str:
+    stat = os.stat(file)
+    return f"{file}:{stat.st_size}:{stat.st_mtime}"
+
+
+def load_mesh_stats(files: list[str]) -> dict:
+    """
+    Local AABB and convex-hull fill ratio of each mesh file, cached on disk (keyed by path, size and mtime) since
+    loading every furniture mesh takes a while.
+    """
+    stats = {}
+    if _mesh_stats_file().exists():
+        with open(_mesh_stats_file(), "r") as f:
+            stats = json.load(f)
+
+    updated = False
+    for file in files:
+        file_id = _file_id(file)
+        if file_id in stats:
+            continue
+        mesh = trimesh.load(file, force="mesh")
+        lo, hi = mesh.bounds
+        aabb_volume = float(np.prod(np.maximum(hi - lo, 1e-6)))
+        stats[file_id] = {
+            "bounds": [lo.tolist(), hi.tolist()],
+            "hull_fill": float(mesh.convex_hull.volume / aabb_volume),
+        }
+        updated = True
+
+    if updated:
+        tmp_file = _mesh_stats_file().with_suffix(".tmp")  # Write + rename so concurrent runs never read a partial file
+        with open(tmp_file, "w") as f:
+            json.dump(stats, f)
+        os.replace(tmp_file, _mesh_stats_file())
+    return {file: stats[_file_id(file)] for file in files}
+
+
+def franka_workspace(franka_pos: list, franka_quat: list, margin: float) -> tuple[np.ndarray, float]:
+    """
+    Workspace sphere (center, radius) of the Franka mounted at franka_pos/franka_quat.
+    """
+    base_R = trimesh.transformations.quaternion_matrix(franka_quat)[:3, :3]  # (w, x, y, z)
+    shoulder = np.asarray(franka_pos, dtype=float) + base_R @ np.array([0, 0, FRANKA_SHOULDER_OFFSET])
+    return shoulder, FRANKA_REACH + margin
+
+
+def world_aabb(local_bounds: list, pos: list, quat: list, scale: float = 1) -> tuple[np.ndarray, np.ndarray]:
+    lo, hi = np.asarray(local_bounds, dtype=float) * scale
+    corners = np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+    R = trimesh.transformations.quaternion_matrix(quat)[:3, :3]
+    corners = corners @ R.T + np.asarray(pos, dtype=float)
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def point_aabb_distance(point: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> float:
+    return float(np.linalg.norm(np.maximum(0, np.maximum(lo - point, point - hi))))
+
+
+def assign_collision_lod(
+    plan: list[dict],
+    franka_pos: list,
+    franka_quat: list,
+    keep_as_rigid: set[str] = {},
+    margin: float = 0.15,
+    detail_radius: float = 0.6,
+    box_fill_ratio: float = 0.85,
+) -> list[dict]:
+    """
+    Re-decide collision of every "object" entity of a scene plan from the Franka workspace, see module docstring.
+    Objects in keep_as_rigid always keep their detailed mesh collision. Box proxies are added as separate "box"
+    entities, the object itself becomes visual only (so it can still be merged, see mesh_merge.py).
+    """
+    center, radius = franka_workspace(franka_pos, franka_quat, margin)
+    objects = [spec for spec in plan if spec["kind"] == "object"]
+    stats = load_mesh_stats(sorted({spec["file"] for spec in objects}))
+
+    new_plan = []
+    for spec in plan:
+        if spec["kind"] != "object":
+            new_plan.append(spec)
+            continue
+        spec = dict(spec)
+        if spec["name"] in keep_as_rigid:
+            spec.update(collision=True, collision_lod="mesh")
+            new_plan.append(spec)
+            continue
+
+        lo, hi = world_aabb(stats[spec["file"]]["bounds"], spec["pos"], spec["quat"], spec["scale"])
+        distance = point_aabb_distance(center, lo, hi)
+        if distance > radius:
+            spec.update(collision=False)
+            new_plan.append(spec)
+            continue
+
+        if stats[spec["file"]]["hull_fill"] >= box_fill_ratio or distance > radius - margin:
+            spec.update(collision=False)
+            new_plan.append(spec)
+            new_plan.append({
+                "name": f"{spec['name']}_box_proxy", "kind": "box", "file": "",
+                "pos": ((lo + hi) / 2).tolist(), "quat": [1, 0, 0, 0], "size": (hi - lo).tolist(),
+                "collision": True, "fixed": True, "scale": 1,
+            })
+        elif distance > detail_radius:
+            spec.update(collision=True, collision_lod="hull")
+            new_plan.append(spec)
+        else:
+            spec.update(collision=True, collision_lod="mesh")
+            new_plan.append(spec)
+
+    lods = [s.get("collision_lod", "box" if s["kind"] == "box" else None) for s in new_plan if s["collision"]]
+    print(f"Auto collision LOD: {lods.count('mesh')} mesh, {lods.count('hull')} hull, {lods.count('box')} box proxies")
+    return new_plan
@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import trimesh
+
+from src.environment.scene_cache import get_cache_dir
+
+
+"""
+Bake the static, visual-only part of a ReplicaCAD scene plan (stage + every object instance without collision) into
+a single mesh, loaded as one fixed Genesis entity instead of dozens. Those entities contribute nothing to physics,
+only draw calls, per-entity bookkeeping and build time.
+
+The merged mesh is written to temp_data/cache/merged_meshes, keyed by the files/poses that went into it.
+Articulated objects (URDFs) are not merged, they keep their own entities.
+"""
+
+MERGEABLE_KINDS = ("stage", "object")
+
+
+def is_mergeable(spec: dict) -> bool:
+    return spec["kind"] in MERGEABLE_KINDS and not spec["collision"]
+
+
+def _spec_transform(spec: dict) -> np.ndarray:
+    T = trimesh.transformations.quaternion_matrix(spec["quat"])  # (w, x, y, z), same convention as Genesis
+    T[:3, :3] *= spec["scale"]
+    T[:3, 3] = spec["pos"]
+    return T
+
+
+def _merged_mesh_key(specs: list[dict], decimate_ratio: float | None) -> str:
+    key_data = {
+        "entities": [[s["file"], s["pos"], s["quat"], s["scale"]] for s in specs],
+        "decimate_ratio": decimate_ratio,
+        "trimesh": trimesh.__version__,
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def _decimate(geom: trimesh.Trimesh, ratio: float) -> trimesh.Trimesh:
+    """
+    NOTE: decimated geometry loses its texture (UVs don't survive simplification), keep ratio None for
+    camera-facing quality.
+    """
+    face_count = max(4, int(len(geom.faces) * ratio))
+    if face_count >= len(geom.faces):
+        return geom
+    return geom.simplify_quadric_decimation(face_count=face_count)
+
+
+def merge_visual_meshes(specs: list[dict], decimate_ratio: float | None = None) -> Path:
+    """
+    Merge the meshes of specs (posed in world frame) into one GLB file, return its (cached) path.
+    """
+    merged_file = get_cache_dir("merged_meshes") / f"{_merged_mesh_key(specs, decimate_ratio)}.glb"
+    if merged_file.exists():
+        print(f"Using cached merged visual mesh: {merged_file.name}")
+        return merged_file
+
+    print(f"Merging {len(specs)} visual-only meshes into one, this is only done once...")
+    merged = trimesh.Scene()
+    for i, spec in enumerate(specs):
+        loaded = trimesh.load(spec["file"], force="scene")
+        spec_T = _spec_transform(spec)
+        for node_name in loaded.graph.nodes_geometry:
+            node_T, geom_name = loaded.graph[node_name]
+            geom = loaded.geometry[geom_name]
+            if not isinstance(geom, trimesh.Trimesh):
+                continue  # Skip points/paths
+            geom = geom.copy()
+            geom.apply_transform(spec_T @ node_T)
+            if decimate_ratio is not None:
+                geom = _decimate(geom, decimate_ratio)
+            merged.add_geometry(geom, geom_name=f"{i}_{spec['name']}_{geom_name}")
+
+    tmp_file = merged_file.with_suffix(".tmp")  # Write + rename so concurrent runs never read a partial file
+    merged.export(str(tmp_file), file_type="glb")
+    os.replace(tmp_file, merged_file)
+    return merged_file
+
+
+def merge_static_visuals(plan: list[dict], decimate_ratio: float | None = None) -> list[dict]:
+    """
+    Replace all visual-only stage/object entities of a scene plan with a single "merged_visual" entity.
+    """
+    mergeable = [spec for spec in plan if is_mergeable(spec)]
+    if len(mergeable) < 2:
+        return plan
+    merged_file = merge_visual_meshes(mergeable, decimate_ratio)
+    merged_spec = {
+        "name": "merged_static_visuals", "kind": "merged_visual", "file": str(merged_file),
+        "pos": [0, 0, 0], "quat": [1, 0, 0, 0], "collision": False, "fixed": True, "scale": 1,
+    }
+    return [merged_spec] + [spec for spec in plan if not is_mergeable(spec)]
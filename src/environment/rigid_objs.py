@@ -1,26 +1,52 @@
+import numpy as np
 import genesis as gs
 
-from src.environment.scene import REPLICACAD_DIR
+from src.environment.scene import get_replicacad_dir
+from src.environment.asset_cache import collision_mesh_morph
 
 
 def add_replicacad_obj(scene: gs.Scene, name: str, pos: list, quat: list, scale: int = 1):
     return scene.add_entity(
-        gs.morphs.Mesh(
-            file=str(REPLICACAD_DIR / "objects" / f"{name}.glb"),
-            pos=pos,
-            quat=quat,
-            scale=scale,
-            visualization=True,
-            collision=True,
-            fixed=False,
-            convexify=False,
-            decimate=True,
-            decompose_nonconvex=False,
+        # Preprocessed collision geometry, processed on first load, see src/environment/asset_cache.py
+        collision_mesh_morph(
+            get_replicacad_dir() / "objects" / f"{name}.glb", pos=pos, quat=quat, fixed=False, scale=scale,
+            process_missing=True,
         ),
         surface=gs.surfaces.Default(vis_mode="visual"),
     )
 
 
+def get_entity_pos(entity) -> np.ndarray:
+    """
+    Entity base position as numpy, (3,) or (n_envs, 3) in batched scenes.
+    """
+    return entity.get_pos().cpu().numpy()
+
+
+def is_inside_container(obj_pos: np.ndarray, container_pos: np.ndarray, radius: float, height: float) -> bool:
+    """
+    Rough "object is in container" check: object center within `radius` (horizontally) of the container center,
+    and between slightly below the container base and `height` above it.
+    """
+    horizontal_dist = np.linalg.norm(obj_pos[:2] - container_pos[:2])
+    dz = obj_pos[2] - container_pos[2]
+    return bool(horizontal_dist < radius and -0.05 < dz < height)
+
+
+def set_entity_pose(entity, pos: list, quat: list, envs_idx=None):
+    """
+    Set pos/quat of an entity in all parallel envs (or only in envs_idx).
+    Genesis expects one row per env when the scene was built with n_envs > 0.
+    """
+    n_envs = entity.scene.n_envs
+    if n_envs > 0:
+        n = n_envs if envs_idx is None else len(envs_idx)
+        pos = np.tile(np.asarray(pos, dtype=np.float32), (n, 1))
+        quat = np.tile(np.asarray(quat, dtype=np.float32), (n, 1))
+    entity.set_pos(pos, envs_idx=envs_idx)
+    entity.set_quat(quat, envs_idx=envs_idx)
+
+
 
 # import enum
 # from typing import List
@@ -57,4 +83,28 @@ def add_replicacad_obj(scene: gs.Scene, name: str, pos: list, quat: list, scale:
 # def add_part_net_object(scene: gs.Scene, path: str):
 #     """
 #     Add as rigid object
-#     """
\ No newline at end of file
+#     """
+
+
+def get_free_entities(scene: gs.Scene, exclude: tuple = ()) -> list:
+    """
+    Rigid entities that are not fixed in place (i.e. objects that can be pushed around), except `exclude`.
+    Decided by the base joint, not morph.fixed: MJCF objects are free through their <freejoint>, their morph has no
+    `fixed` flag.
+    """
+    return [
+        entity for entity in scene.entities
+        if entity not in exclude and hasattr(entity, "base_joint") and entity.base_joint.type == gs.JOINT_TYPE.FREE
+    ]
+
+
+def get_contacts(scene: gs.Scene) -> dict:
+    """
+    Current rigid contacts as numpy arrays (one entry per contact): "link_a", "link_b" (global link idx) and
+    "penetration" (m).
+    """
+    contacts = scene.sim.rigid_solver.collider.get_contacts()
+    return {
+        key: (contacts[key].cpu().numpy() if hasattr(contacts[key], "cpu") else np.asarray(contacts[key])).ravel()
+        for key in ("link_a", "link_b", "penetration")
+    }
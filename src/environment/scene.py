@@ -1,13 +1,24 @@
 import os, json
+from math import sqrt
 from pathlib import Path
+from functools import cache
 
 import genesis as gs
 
 from src.utils.root import get_temp_data_abs_path
 from src.utils.geom import habitat_to_genesis_transform
+from src.environment.scene_cache import scene_cache_key, load_cached_plan, save_cached_plan
+from src.environment.mesh_merge import merge_static_visuals
+from src.environment.asset_cache import collision_mesh_morph
+from src.environment.collision_lod import assign_collision_lod
 
 
-REPLICACAD_DIR: Path = get_temp_data_abs_path("haosulab-ReplicaCAD")
+@cache
+def get_replicacad_dir() -> Path:
+    """
+    Resolved on first use (not at import), so modules importing this one don't need the dataset downloaded.
+    """
+    return get_temp_data_abs_path("haosulab-ReplicaCAD")
 
 
 def open_read_json(file: str) -> dict:
@@ -15,54 +26,49 @@ def open_read_json(file: str) -> dict:
         return json.load(f)
 
 def get_replicacad_scene_config(scene_name: str) -> Path:
-    scene_config_path = REPLICACAD_DIR / "configs" / "scenes" / f"{scene_name}.scene_instance.json"
+    scene_config_path = get_replicacad_dir() / "configs" / "scenes" / f"{scene_name}.scene_instance.json"
     return get_temp_data_abs_path(scene_config_path)
 
 def determine_urdf_path(name: str) -> Path:
     """Determine URDF file path for articulated object by its template name."""
-    urdf_base = REPLICACAD_DIR / "urdf"
+    urdf_base = get_replicacad_dir() / "urdf"
     return urdf_base / name / f"{name}.urdf"
 
-def add_replicad_scene(
-    scene: gs.Scene,
+def _entity_spec(name: str, kind: str, file, pos, quat, collision: bool, fixed=True, scale: float = 1) -> dict:
+    """
+    One entity of a ReplicaCAD scene plan, plain dict so the plan can be cached as JSON (see scene_cache.py).
+    kind: "stage", "object" or "articulated"
+    """
+    return {
+        "name": name, "kind": kind, "file": str(file), "pos": list(pos), "quat": list(quat),
+        "collision": collision, "fixed": fixed, "scale": scale,
+    }
+
+
+def build_replicad_scene_plan(
     scene_config_file: str,
     keep_as_rigid: set[str],
     skip_loading: set[str],
     load_articulated: bool = False,
     keep_articulated: set[str] = {},
-):
+) -> list[dict]:
     """
-    keep_as_rigid: object names from ReplicaCAD scene to keep as rigid objects. Everything has no collision physics, is just for visual input
+    Resolve a ReplicaCAD scene config (and its stage/object configs) into the list of entities to add to a scene.
     """
 
     with open(scene_config_file, 'r') as f:
         scene_data = json.load(f)
-
-    ###############################################################
-    # Load static stage as visual mesh only (walls, floor mainly) #
-    ###############################################################
+    plan = []
 
     # e.g. "stages/frl_apartment_stage" -> "frl_apartment_stage"
     stage_name = Path(scene_data["stage_instance"]["template_name"]).name
-    stage_cfg = open_read_json(REPLICACAD_DIR / "configs" / "stages" / f"{stage_name}.stage_config.json")
-    # Add stage visual (Y-up -> Z-up: apply 90° X rotation)
-    scene.add_entity(
-        gs.morphs.Mesh(
-            file=str(REPLICACAD_DIR / "stages" / Path(stage_cfg["render_asset"]).name),
-            pos=(0,0,0),
-            euler=(90,0,0),
-            visualization=True,
-            collision=False,
-            fixed=True,
-            decimate=False,
-            convexify=False,
-        ),
-        surface=gs.surfaces.Default(vis_mode="visual"),
-    )
-
-    ###########################################
-    # Load object instances (furniture, etc.) #
-    ###########################################
+    replicad_dir = get_replicacad_dir()
+    stage_cfg = open_read_json(replicad_dir / "configs" / "stages" / f"{stage_name}.stage_config.json")
+    # Y-up -> Z-up: apply 90° X rotation
+    plan.append(_entity_spec(
+        name=stage_name, kind="stage", file=replicad_dir / "stages" / Path(stage_cfg["render_asset"]).name,
+        pos=(0, 0, 0), quat=(sqrt(2)/2, sqrt(2)/2, 0, 0), collision=False,
+    ))
 
     object_instances = scene_data.get("object_instances")
     objs_len = len(object_instances)
@@ -75,71 +81,174 @@ def add_replicad_scene(
             print(f"Skip loading object: {obj_name}.")
             continue
 
-        obj_cfg = open_read_json(REPLICACAD_DIR / "configs" / "objects" / f"{obj_name}.object_config.json")
+        obj_cfg = open_read_json(replicad_dir / "configs" / "objects" / f"{obj_name}.object_config.json")
 
         # Note: Not using "collision_asset" since those are already decomposed meshes and Genesis
         # will load them as individual meshes and then decompose each. Best to load the entire "render_asset"
         # mesh and have Genesis decompose that.
-        vis_asset = REPLICACAD_DIR / "objects" / Path(obj_cfg["render_asset"]).name
+        vis_asset = replicad_dir / "objects" / Path(obj_cfg["render_asset"]).name
         pos_gen, quat_gen = habitat_to_genesis_transform(obj.get("translation"), obj.get("rotation"))
+        plan.append(_entity_spec(
+            name=obj_name, kind="object", file=vis_asset, pos=pos_gen, quat=quat_gen,
+            collision=obj_name in keep_as_rigid,
+        ))
+
+    if load_articulated == False:
+        return plan
+
+    for art in scene_data.get("articulated_object_instances", []):
+        name = art["template_name"]  # e.g. "fridge", "door2", "kitchenCupboard_01", ...
+        pos_gen, quat_gen = habitat_to_genesis_transform(art.get("translation"), art.get("rotation"))
+        scale = 1
+
+        # Need to hardcode scale for some URDFs that ReplicaCAD didn't give the scale to:
+        if name == "kitchenCupboard_01":
+            scale = 0.4
+
+        collision = name in keep_articulated
+        plan.append(_entity_spec(
+            name=name, kind="articulated", file=determine_urdf_path(name), pos=pos_gen, quat=quat_gen,
+            collision=collision, fixed=True if collision else art.get("fixed_base"), scale=scale,
+        ))
+
+    return plan
+
+
+def add_replicad_scene(
+    scene: gs.Scene,
+    scene_config_file: str,
+    keep_as_rigid: set[str],
+    skip_loading: set[str],
+    load_articulated: bool = False,
+    keep_articulated: set[str] = {},
+    use_cache: bool = True,
+    merge_visuals: bool = False,
+    merged_decimate_ratio: float | None = None,
+    auto_collision_lod: bool = False,
+    franka_pos: list = None,
+    franka_quat: list = None,
+):
+    """
+    keep_as_rigid: object names from ReplicaCAD scene to keep as rigid objects. Everything has no collision physics, is just for visual input
+    Returns added entities by name, e.g. to read joint state of articulated objects.
+    use_cache: reuse the resolved scene plan from temp_data/cache (content-hashed, see scene_cache.py)
+    merge_visuals: bake stage + all visual-only objects into a single mesh entity (see mesh_merge.py)
+    merged_decimate_ratio: optionally decimate the merged mesh to this fraction of faces (drops textures)
+    auto_collision_lod: enable collision (mesh/hull/box proxy) only for objects in reach of the Franka at
+        franka_pos/franka_quat, on top of keep_as_rigid (see collision_lod.py)
+    """
+    settings = dict(
+        keep_as_rigid=keep_as_rigid,
+        skip_loading=skip_loading,
+        load_articulated=load_articulated,
+        keep_articulated=keep_articulated,
+    )
+    plan = None
+    if use_cache:
+        cache_key = scene_cache_key(scene_config_file, **settings)
+        plan = load_cached_plan(cache_key)
+        if plan is not None:
+            print(f"Using cached scene plan {cache_key} ({len(plan)} entities).")
+    if plan is None:
+        plan = build_replicad_scene_plan(scene_config_file, **settings)
+        if use_cache:
+            save_cached_plan(cache_key, plan)
 
-        if obj_name in keep_as_rigid:
-            print(f"Adding object: {obj_name} with collision.")
-            scene.add_entity(
+    if auto_collision_lod:
+        plan = assign_collision_lod(plan, franka_pos, franka_quat, keep_as_rigid=keep_as_rigid)
+    if merge_visuals:
+        plan = merge_static_visuals(plan, decimate_ratio=merged_decimate_ratio)
+
+    # Entities by name (for duplicated names, e.g. repeated furniture, the last one wins)
+    return {spec["name"]: add_replicad_entity(scene, spec) for spec in plan}
+
+
+def add_replicad_entity(scene: gs.Scene, spec: dict):
+    """
+    Add one entity of a scene plan (see build_replicad_scene_plan(..)) to a Genesis scene.
+    """
+    if spec["kind"] in ("stage", "merged_visual"):
+        ###############################################################
+        # Load static stage as visual mesh only (walls, floor mainly) #
+        ###############################################################
+        # Merged visuals are the stage + visual-only objects already posed in world frame
+        return scene.add_entity(
+            gs.morphs.Mesh(
+                file=spec["file"],
+                pos=spec["pos"],
+                quat=spec["quat"],
+                visualization=True,
+                collision=False,
+                fixed=True,
+                decimate=False,
+                convexify=False,
+            ),
+            surface=gs.surfaces.Default(vis_mode="visual"),
+        )
+
+    if spec["kind"] == "object":
+        ###########################################
+        # Load object instances (furniture, etc.) #
+        ###########################################
+        if spec["collision"] and spec.get("collision_lod") == "hull":
+            print(f"Adding object: {spec['name']} with convex hull collision.")
+            return scene.add_entity(
                 gs.morphs.Mesh(
-                    file=str(vis_asset),
-                    pos=pos_gen,
-                    quat=quat_gen,
+                    file=spec["file"],
+                    pos=spec["pos"],
+                    quat=spec["quat"],
                     visualization=True,
                     collision=True,
                     fixed=True,
-                    convexify=False,  # Don't convert to convex-hull, try to keep original shape as much as possible (and most objects in scene have some concavity)
-                    decimate=True,    # Simplify mesh for collision
+                    convexify=True,
+                    decimate=True,
                     decompose_nonconvex=False,
                 ),
-                surface=gs.surfaces.Default(vis_mode="visual"),  # debug with `vis_mode="collision"`
+                surface=gs.surfaces.Default(vis_mode="visual"),
             )
-        else:
-            scene.add_entity(
-                gs.morphs.Mesh(
-                    file=str(vis_asset),
-                    pos=pos_gen,
-                    quat=quat_gen,
-                    visualization=True,
-                    collision=False,
-                    fixed=True,
-                    decimate=False,
-                    convexify=False
+        if spec["collision"]:
+            print(f"Adding object: {spec['name']} with collision.")
+            return scene.add_entity(
+                # Preprocessed collision geometry, processed on first load, see asset_cache.py
+                collision_mesh_morph(
+                    spec["file"], pos=spec["pos"], quat=spec["quat"], fixed=True, process_missing=True,
                 ),
-                surface=gs.surfaces.Default(vis_mode="visual"),
+                surface=gs.surfaces.Default(vis_mode="visual"),  # debug with `vis_mode="collision"`
             )
+        return scene.add_entity(
+            gs.morphs.Mesh(
+                file=spec["file"],
+                pos=spec["pos"],
+                quat=spec["quat"],
+                visualization=True,
+                collision=False,
+                fixed=True,
+                decimate=False,
+                convexify=False
+            ),
+            surface=gs.surfaces.Default(vis_mode="visual"),
+        )
 
-    if load_articulated == False:
-        return
-
-    #########################################################
-    # Load articulated objects (doors, cabinets with URDFs) #
-    #########################################################
+    if spec["kind"] == "box":
+        # Invisible collision proxy, see collision_lod.py
+        return scene.add_entity(
+            morph=gs.morphs.Box(
+                pos=spec["pos"], size=spec["size"],
+                fixed=True, collision=True, visualization=False,
+            ),
+        )
 
-    for art in scene_data.get("articulated_object_instances", []):
-        name = art["template_name"]  # e.g. "fridge", "door2", "kitchenCupboard_01", ...
-        urdf_path = determine_urdf_path(name)
-        pos_hab = art.get("translation")
-        rot_hab = art.get("rotation")
-        pos_gen, quat_gen = habitat_to_genesis_transform(pos_hab, rot_hab)
-        scale = 1
-
-        # Need to hardcode scale for some URDFs that ReplicaCAD didn't give the scale to:
-        if name == "kitchenCupboard_01":
-            scale = 0.4
-
-        if name in keep_articulated:
-            scene.add_entity(
+    if spec["kind"] == "articulated":
+        #########################################################
+        # Load articulated objects (doors, cabinets with URDFs) #
+        #########################################################
+        if spec["collision"]:
+            return scene.add_entity(
                 gs.morphs.URDF(
-                    file=str(urdf_path),
-                    pos=pos_gen,
-                    quat=quat_gen,
-                    scale=scale,
+                    file=spec["file"],
+                    pos=spec["pos"],
+                    quat=spec["quat"],
+                    scale=spec["scale"],
                     # fixed=art.get("fixed_base"),
                     visualization=True,
                     collision=True,
@@ -151,16 +260,17 @@ def add_replicad_scene(
                 material=gs.materials.Rigid(friction=0.5, coup_restitution=0.0),
                 surface=gs.surfaces.Default(vis_mode="visual")
             )
-        else:
-            scene.add_entity(
-                gs.morphs.URDF(
-                    file=str(urdf_path),
-                    pos=pos_gen,
-                    quat=quat_gen,
-                    scale=scale,
-                    fixed=art.get("fixed_base"),
-                    collision=False,
-                ),
-                material=gs.materials.Rigid(friction=0.5, coup_restitution=0.0),
-                surface=gs.surfaces.Default(vis_mode="visual")
-            )
+        return scene.add_entity(
+            gs.morphs.URDF(
+                file=spec["file"],
+                pos=spec["pos"],
+                quat=spec["quat"],
+                scale=spec["scale"],
+                fixed=spec["fixed"],
+                collision=False,
+            ),
+            material=gs.materials.Rigid(friction=0.5, coup_restitution=0.0),
+            surface=gs.surfaces.Default(vis_mode="visual")
+        )
+
+    raise ValueError(f"Unknown scene entity kind: {spec['kind']}")
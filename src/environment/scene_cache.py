@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+from src.utils.root import get_temp_data_abs_path
+
+
+"""
+Persistent, content-hashed cache for scene setup.
+
+Genesis can't serialize a built scene, so what is cached is everything around it that can be:
+    - The resolved scene "plan" (every entity to add, with file, pose and collision settings), keyed by the content
+      of the scene config + the loading settings + Genesis version. A hit only skips parsing the scene, stage and
+      object config JSONs, which is cheap. A stale entry can never be picked up after any of those inputs change (the
+      downloaded ReplicaCAD stage/object configs are treated as immutable).
+    - The processed collision geometry of every ReplicaCAD object loaded with collision, processed on its first
+      load, see asset_cache.py. Genesis would otherwise decimate every collision mesh on every scene load.
+    - Compiled sim kernels, see use_persistent_kernel_cache(..).
+Doesn't import Genesis, asset preprocessing pool workers use this module.
+"""
+
+CACHE_FORMAT_VERSION = 1  # Bump when the plan format changes
+
+
+def get_cache_dir(*subdirs: str) -> Path:
+    cache_dir = get_temp_data_abs_path("cache", check_exists=False).joinpath(*subdirs)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def file_sha256(file: str | Path) -> str:
+    sha = hashlib.sha256()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def scene_cache_key(scene_config_file: str | Path, **settings) -> str:
+    """
+    Hash of the scene config content, the loading settings (sets are sorted so key is stable) and Genesis version.
+    """
+    import genesis as gs
+    key_data = {
+        "format": CACHE_FORMAT_VERSION,
+        "genesis": gs.__version__,
+        "scene_config": file_sha256(scene_config_file),
+        "settings": {k: sorted(v) if isinstance(v, (set, frozenset, list, tuple, dict)) else v for k, v in settings.items()},
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def load_cached_plan(key: str) -> list[dict] | None:
+    plan_file = get_cache_dir("scene_plans") / f"{key}.json"
+    if not plan_file.exists():
+        return None
+    with open(plan_file, "r") as f:
+        return json.load(f)
+
+
+def save_cached_plan(key: str, plan: list[dict]):
+    plan_file = get_cache_dir("scene_plans") / f"{key}.json"
+    tmp_file = plan_file.with_suffix(".tmp")  # Write + rename so concurrent runs never read a partial file
+    with open(tmp_file, "w") as f:
+        json.dump(plan, f)
+    os.replace(tmp_file, plan_file)
+
+
+def use_persistent_kernel_cache():
+    """
+    Keep compiled sim kernels under temp_data/cache/kernels (mounted in the container) instead of ~/.cache, so the
+    JIT warm-up of `scene.build()` is paid once, not on every fresh container/worker. Call before `gs.init(..)`.
+    """
+    os.environ.setdefault("TI_OFFLINE_CACHE", "1")
+    os.environ.setdefault("TI_OFFLINE_CACHE_FILE_PATH", str(get_cache_dir("kernels")))
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.robots.droid import DroidManager
+from src.robots.droid_const import EXT_CAM_1_LEFT_OFFSET_T
+from src.environment.rigid_objs import get_entity_pos
+from src.utils.geom import quat_multiply, rotvec_to_quat, trans_quat_to_T
+
+
+"""
+Per-episode scene randomization, so the seeds of an evaluation job run different initial conditions.
+
+Applied after restoring the start snapshot: every free object (see get_free_entities(..)) is shifted in x/y and
+rotated about the vertical axis, and the observation exterior cam is jittered around its DROID placement. All offsets
+are uniform in [-max, max] and drawn from episode_rng(seed, episode), so an episode can be reproduced (e.g. replayed
+from a dataset, see sim_runs/replay_episode.py). Objects stay at their settled height, offsets should stay small
+enough not to push them into each other.
+"""
+
+
+def episode_rng(seed: int, episode: int) -> np.random.Generator:
+    return np.random.default_rng(seed * 100_003 + episode)
+
+
+@dataclass
+class EpisodeRandomization:
+    enabled: bool = True
+    object_xy_m: float = 0.02     # Object position offset in x and y
+    object_yaw_rad: float = 0.2   # Object rotation about the world z axis
+    cam_pos_m: float = 0.01       # Exterior cam position offset per axis, in the cam frame
+    cam_rot_rad: float = 0.02     # Exterior cam rotation about each of its axes
+
+    def apply(self, droid: DroidManager, objects: list, rng: np.random.Generator):
+        """
+        objects: the free (movable) objects of the scene.
+        """
+        if not self.enabled:
+            droid.set_ext_cam_offset()
+            return
+        for obj in objects:
+            pos = get_entity_pos(obj)
+            pos[:2] += rng.uniform(-self.object_xy_m, self.object_xy_m, size=2)
+            yaw = rng.uniform(-self.object_yaw_rad, self.object_yaw_rad)
+            quat = quat_multiply(rotvec_to_quat([0.0, 0.0, yaw]), obj.get_quat().cpu().numpy())
+            obj.set_pos(pos)
+            obj.set_quat(quat)
+
+        jitter_T = trans_quat_to_T(
+            rng.uniform(-self.cam_pos_m, self.cam_pos_m, size=3),
+            rotvec_to_quat(rng.uniform(-self.cam_rot_rad, self.cam_rot_rad, size=3)),
+        )
+        droid.set_ext_cam_offset(EXT_CAM_1_LEFT_OFFSET_T @ jitter_T)
@@ -0,0 +1,61 @@
+import csv
+from pathlib import Path
+from dataclasses import dataclass, asdict, fields
+
+import numpy as np
+
+
+"""
+Evaluation jobs and per-episode results, without any sim/model imports so the scheduler process and result
+tooling stay light (the runner lives in src/evaluation/runner.py).
+"""
+
+
+@dataclass
+class EvalJob:
+    sim_run: str
+    prompt: str
+    seeds: list[int]
+    episodes: int = 1  # Per seed
+
+
+@dataclass
+class EpisodeResult:
+    sim_run: str
+    prompt: str
+    seed: int
+    episode: int
+    success: bool | None  # None: scene has no success predicate
+    termination: str      # "success", "max_steps" or "max_time"
+    steps: int            # Inference calls (action chunks)
+    sim_time_s: float
+    wall_time_s: float
+    tracking_rms_rad: float | None = None  # RMS of q_desired - q_actual over the arm joints, see joint_actions.py
+
+
+def write_results_csv(results: list[EpisodeResult], path: str | Path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(EpisodeResult)])
+        writer.writeheader()
+        for result in results:
+            writer.writerow(asdict(result))
+
+
+def print_results_summary(results: list[EpisodeResult]):
+    """
+    Per (sim_run, prompt): success rate, mean steps/time per episode and throughput in episodes/hour.
+    """
+    groups = {}
+    for result in results:
+        groups.setdefault((result.sim_run, result.prompt), []).append(result)
+    print(f"{'sim_run':<32} {'episodes':>8} {'success':>8} {'steps':>6} {'wall_s':>8} {'eps/hour':>9}  prompt")
+    for (sim_run, prompt), group in groups.items():
+        judged = [r.success for r in group if r.success is not None]
+        success_rate = f"{np.mean(judged):.0%}" if judged else "n/a"
+        wall_time = np.mean([r.wall_time_s for r in group])
+        print(
+            f"{sim_run:<32} {len(group):>8} {success_rate:>8} {np.mean([r.steps for r in group]):>6.1f} "
+            f"{wall_time:>8.1f} {3600 / wall_time:>9.1f}  {prompt}"
+        )
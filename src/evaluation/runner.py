@@ -0,0 +1,209 @@
+import time
+import uuid
+import random
+from dataclasses import asdict
+
+import numpy as np
+import torch
+
+from src.robots.droid import DroidManager
+from src.sims.base import BaseSimSettings
+from src.sims.snapshot import SceneSnapshot
+from src.sims.sim_scene import create_sim_scene
+from src.sims.registry import get_sim_settings
+from src.inference.pi0_inference import Pi0Inference
+from src.inference.pipelined_rollout import PipelinedRollout
+from src.inference.chunked_rollout import ChunkedRollout
+from src.dataset.episode_writer import EpisodeWriter
+from src.evaluation.results import EvalJob, EpisodeResult
+from src.evaluation.randomization import EpisodeRandomization, episode_rng
+from src.environment.rigid_objs import get_free_entities
+from src.utils import profiler
+
+
+"""
+Headless, non-interactive evaluation of a matrix of (sim_run, prompt, seeds, episodes) jobs.
+
+Each scene is built once (per sim_run) and every episode starts from its settled start snapshot, with object poses
+and the exterior cam randomized from (seed, episode), see src/evaluation/randomization.py. An episode ends
+on task success (see `task_success()` of the sim settings), or when its step budget (action chunks) or wall-clock
+budget runs out. One row per episode is written to a results table (CSV, see src/evaluation/results.py).
+Optionally every episode is also recorded as fine-tuning data, see src/dataset/episode_writer.py.
+"""
+
+
+def seed_everything(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+class _SimInstance:
+    """
+    A built scene for one sim_run, reused by all episodes of that sim_run.
+    """
+
+    def __init__(self, sim_run: str, sim_config: dict):
+        self.ss: BaseSimSettings = get_sim_settings(sim_name=sim_run, **sim_config)
+        self.scene = create_sim_scene(self.ss)
+        self.ss.setup_scene(self.scene)
+        self.droid = DroidManager(
+            self.scene, self.ss.franka_pos, self.ss.franka_quat,
+            rest_pose=self.ss.rest_pose, obs_cam_res=self.ss.obs_cam_res, mjcf_file=self.ss.mjcf_file,
+            action_interpolation=self.ss.action_interpolation,
+        )
+        self.scene.build()
+        self.droid.setup()
+        self.start_snapshot = SceneSnapshot(self.scene)
+        self.start_snapshot.capture(self.droid.hold_start_pos)
+        self.objects = get_free_entities(self.scene, exclude=(self.droid.franka,))
+
+
+class EvalRunner:
+
+    def __init__(
+        self,
+        pi0: Pi0Inference | None,
+        max_steps: int = 40,
+        max_time_s: float = 600.0,
+        actions_per_chunk: int = 8,
+        sim_config: dict | None = None,
+        prefetch_at: int | None = None,
+        chunking: dict | None = None,
+        dataset_dir: str | None = None,
+        randomization: dict | None = None,
+    ):
+        """
+        max_steps: step budget per episode, in action chunks of actions_per_chunk actions (chunked roll-outs get the
+            same number of actions, over fewer or more inference calls)
+        max_time_s: wall-clock budget per episode
+        sim_config: preset, config_file and overrides of every scene, see get_sim_settings(..)
+        prefetch_at: run episodes with pipelined inference, see src/inference/pipelined_rollout.py
+        chunking: ChunkedRollout kwargs, run episodes with cached action chunks, see src/inference/chunked_rollout.py
+        dataset_dir: record every episode (observations, prompts, action chunks) into this dataset dir
+        randomization: EpisodeRandomization kwargs, e.g. {"enabled": False}, see src/evaluation/randomization.py
+        """
+        self._pi0 = pi0
+        self._max_steps = max_steps
+        self._max_time_s = max_time_s
+        self._actions_per_chunk = actions_per_chunk
+        self._sim_config = sim_config or {}
+        self._prefetch_at = prefetch_at
+        self._chunking = chunking
+        self._randomization = EpisodeRandomization(**(randomization or {}))
+        self._sims = {}  # sim_run -> _SimInstance
+        self._writer = EpisodeWriter(dataset_dir) if dataset_dir else None
+
+    def set_policy(self, pi0: Pi0Inference):
+        """
+        For runners created before the policy client was up (pi0=None), see src/utils/startup.py.
+        """
+        self._pi0 = pi0
+
+    def build_sims(self, sim_runs: list[str]):
+        """
+        Build the scenes of these sim_runs now instead of at their first episode.
+        """
+        for sim_run in sim_runs:
+            self._get_sim(sim_run)
+
+    def _get_sim(self, sim_run: str) -> _SimInstance:
+        if sim_run not in self._sims:
+            print(f"Building scene for {sim_run}...")
+            self._sims[sim_run] = _SimInstance(sim_run, self._sim_config)
+        return self._sims[sim_run]
+
+    def run_episode(self, sim_run: str, prompt: str, seed: int, episode: int) -> EpisodeResult:
+        try:
+            return self._run_episode(sim_run, prompt, seed, episode)
+        except Exception:  # Drop the partial episode, the next start_episode(..) would find it still open
+            if self._writer:
+                self._writer.discard_episode()
+            raise
+
+    def _run_episode(self, sim_run: str, prompt: str, seed: int, episode: int) -> EpisodeResult:
+        sim = self._get_sim(sim_run)
+        seed_everything(seed * 100_003 + episode)
+        sim.start_snapshot.restore()
+        self._randomization.apply(sim.droid, sim.objects, episode_rng(seed, episode))
+        sim.droid.tracking_error.reset()
+        if self._writer:
+            # Unique across workers/prompts, episodes of several processes can go to the same dataset dir
+            self._writer.start_episode(
+                f"{sim_run}_seed{seed}_ep{episode}_{uuid.uuid4().hex[:8]}", sim_run=sim_run, seed=seed,
+                episode=episode, obs_cam_res=list(sim.ss.obs_cam_res), steps_per_action=sim.ss.steps_per_action,
+                dt=sim.ss.dt, actions_per_chunk=self._actions_per_chunk, prefetch_at=self._prefetch_at,
+                chunking=self._chunking, sim_config=sim.ss.config.to_dict(),
+                randomization=asdict(self._randomization),
+            )
+        pipelined = None
+        if self._prefetch_at is not None:
+            pipelined = PipelinedRollout(
+                sim.droid, self._pi0, sim.ss.steps_per_action, actions_per_chunk=self._actions_per_chunk,
+                prefetch_at=self._prefetch_at, on_chunk=self._writer.add_step if self._writer else None,
+            )
+        chunked = None
+        if self._chunking is not None:
+            chunked = ChunkedRollout(
+                sim.droid, self._pi0, sim.ss.steps_per_action, **self._chunking,
+                on_chunk=self._writer.add_step if self._writer else None,
+            )
+
+        start = time.perf_counter()
+        termination, steps, success = "max_steps", 0, sim.ss.task_success()
+        executed_actions = 0
+        while executed_actions < self._max_steps * self._actions_per_chunk:
+            if pipelined:
+                executed_actions += pipelined.step(prompt=prompt)
+            elif chunked:
+                executed_actions += chunked.step(prompt=prompt)
+            else:
+                scene_obv = sim.droid.get_scene_observation()
+                actions = self._pi0.forward(droid_observation=scene_obv, prompt=prompt, actions=self._actions_per_chunk)
+                if self._writer:
+                    self._writer.add_step(scene_obv, prompt, actions)
+                sim.droid.apply_abs_joint_actions(actions=actions, steps_per_action=sim.ss.steps_per_action)
+                executed_actions += len(actions)
+            steps += 1
+            success = sim.ss.task_success()
+            if success:
+                termination = "success"
+                break
+            if time.perf_counter() - start > self._max_time_s:
+                termination = "max_time"
+                break
+
+        profiler.print_episode_report(f"{sim_run} seed={seed} ep={episode}")
+        tracking = sim.droid.tracking_error.result()
+        if self._writer:
+            self._writer.end_episode(success=success, termination=termination, steps=steps)
+        return EpisodeResult(
+            sim_run=sim_run, prompt=prompt, seed=seed, episode=episode,
+            success=success, termination=termination, steps=steps,
+            sim_time_s=executed_actions * sim.ss.steps_per_action * sim.ss.dt,
+            wall_time_s=time.perf_counter() - start,
+            tracking_rms_rad=float(np.sqrt(np.mean(tracking["rms"][:7] ** 2))) if tracking else None,
+        )
+
+    def run(self, jobs: list[EvalJob]) -> list[EpisodeResult]:
+        results = []
+        n_episodes = sum(len(job.seeds) * job.episodes for job in jobs)
+        # Group by sim_run so each scene is built once
+        for job in sorted(jobs, key=lambda j: j.sim_run):
+            for seed in job.seeds:
+                for episode in range(job.episodes):
+                    result = self.run_episode(job.sim_run, job.prompt, seed, episode)
+                    results.append(result)
+                    print(
+                        f"[{len(results)}/{n_episodes}] {job.sim_run} seed={seed} ep={episode}: "
+                        f"{result.termination} in {result.steps} steps, {result.wall_time_s:.1f}s"
+                    )
+        self.close()
+        return results
+
+    def close(self):
+        """
+        Wait for all recorded episodes to be written.
+        """
+        if self._writer:
+            self._writer.flush()
@@ -0,0 +1,263 @@
+import time
+import queue
+import traceback
+import multiprocessing as mp
+from dataclasses import dataclass, asdict
+
+from src.evaluation.results import EvalJob, EpisodeResult
+
+"""
+Process-pool episode scheduler: spreads the episodes of an evaluation matrix over N worker processes, each with its
+own Genesis instance (on `gpu` or `cpu` backend). Every worker builds a scene once per sim_run it gets episodes
+for (see EvalRunner) and all workers share one inference endpoint.
+
+Episodes are streamed to workers over a queue. If an episode raises, or its worker dies mid-episode, the episode is
+retried (up to `max_retries`) and a crashed worker is replaced, up to `max_respawns` times per worker slot (a worker
+that dies at startup, e.g. policy server down or gs.init failing, would otherwise be respawned forever). Once no
+worker is left the remaining episodes fail. Per-worker utilization (busy time over time alive) is reported at the end.
+"""
+
+LOST_TASK_TIMEOUT_S = 10.0  # All workers idle this long with episodes unaccounted for: re-queue them
+
+
+@dataclass
+class EpisodeTask:
+    task_id: int
+    sim_run: str
+    prompt: str
+    seed: int
+    episode: int
+
+
+@dataclass
+class WorkerStats:
+    worker_id: int
+    episodes: int = 0
+    failures: int = 0
+    busy_s: float = 0.0
+    started_at: float = 0.0
+    ended_at: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        alive_s = (self.ended_at or time.monotonic()) - self.started_at
+        return self.busy_s / alive_s if alive_s > 0 else 0.0
+
+
+def _worker_main(
+    worker_id: int, backend: str, runner_kwargs: dict, pi0_kwargs: dict, warmup_kwargs: dict | None, task_q, result_q,
+):
+    """
+    Worker process entry point, imports Genesis here so the parent never imports (let alone initializes) it.
+    The model client connects (and warms up) while Genesis is imported and initialized, see src/utils/startup.py.
+    """
+    from src.utils.startup import Startup
+    from src.inference.pi0_inference import Pi0Inference
+
+    def init_sim():
+        import genesis as gs
+        from src.evaluation.runner import EvalRunner
+        from src.environment.scene_cache import use_persistent_kernel_cache
+
+        use_persistent_kernel_cache()
+        gs.init(backend=gs.gpu if backend == "gpu" else gs.cpu, logging_level="warning")
+        return EvalRunner(None, **runner_kwargs)
+
+    startup = Startup()
+    pi0, runner = startup.run(
+        connect_policy=lambda: Pi0Inference(**pi0_kwargs),
+        build_sim=init_sim,
+        warmup=(lambda pi0: pi0.warmup(**warmup_kwargs)) if warmup_kwargs is not None else None,
+    )
+    runner.set_policy(pi0)
+    result_q.put(("ready", worker_id, None, startup.summary()))
+
+    while True:
+        task = task_q.get()
+        if task is None:
+            break
+        result_q.put(("started", worker_id, task.task_id, None))
+        try:
+            result = runner.run_episode(task.sim_run, task.prompt, task.seed, task.episode)
+            result_q.put(("done", worker_id, task.task_id, asdict(result)))
+        except Exception:
+            result_q.put(("error", worker_id, task.task_id, traceback.format_exc()))
+    runner.close()
+    print(f"Worker {worker_id} {pi0.client_summary()}")
+
+
+class EpisodeScheduler:
+
+    def __init__(
+        self,
+        n_workers: int,
+        backend: str = "gpu",
+        runner_kwargs: dict = None,
+        pi0_kwargs: dict = None,
+        max_retries: int = 2,
+        warmup_kwargs: dict | None = None,
+        max_respawns: int = 3,
+    ):
+        """
+        runner_kwargs: passed to EvalRunner in every worker (budgets, sim config, ...)
+        pi0_kwargs: passed to Pi0Inference in every worker (host/port of the shared inference endpoint)
+        warmup_kwargs: Pi0Inference.warmup(..) kwargs, every worker sends a warm-up request while it initializes
+        max_respawns: replacements of crashed workers per worker slot
+        """
+        self._n_workers = n_workers
+        self._backend = backend
+        self._runner_kwargs = runner_kwargs or {}
+        self._pi0_kwargs = pi0_kwargs or {}
+        self._max_retries = max_retries
+        self._warmup_kwargs = warmup_kwargs
+        self._max_respawns = max_respawns
+        # Spawn, not fork: CUDA/Genesis state can't be forked
+        self._ctx = mp.get_context("spawn")
+        self._task_q = self._ctx.Queue()
+        self._result_q = self._ctx.Queue()
+        self._workers = {}  # worker_id -> Process
+        self._stats = {}    # worker_id -> WorkerStats
+        self._slots = {}    # worker_id -> worker slot
+        self._respawns = {}  # worker slot -> replacements so far
+        self._next_worker_id = 0
+
+    def _spawn_worker(self, slot: int):
+        worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                worker_id, self._backend, self._runner_kwargs, self._pi0_kwargs, self._warmup_kwargs,
+                self._task_q, self._result_q,
+            ),
+            daemon=True,
+        )
+        process.start()
+        self._workers[worker_id] = process
+        self._slots[worker_id] = slot
+        self._stats[worker_id] = WorkerStats(worker_id=worker_id, started_at=time.monotonic())
+
+    def run(self, jobs: list[EvalJob]) -> tuple[list[EpisodeResult], list[dict]]:
+        """
+        Returns (results, failures), failures are episodes that still failed after all retries.
+        """
+        tasks = {}
+        for job in sorted(jobs, key=lambda j: j.sim_run):  # Consecutive episodes of a sim_run reuse built scenes
+            for seed in job.seeds:
+                for episode in range(job.episodes):
+                    task_id = len(tasks)
+                    tasks[task_id] = EpisodeTask(task_id, job.sim_run, job.prompt, seed, episode)
+        for task in tasks.values():
+            self._task_q.put(task)
+        for slot in range(min(self._n_workers, len(tasks))):
+            self._respawns[slot] = 0
+            self._spawn_worker(slot)
+
+        attempts = {task_id: 0 for task_id in tasks}
+        finished = set()  # task_ids with a result or a final failure
+        in_flight = {}  # worker_id -> (task_id, start time)
+        ready = set()  # worker_ids that finished startup
+        last_message = time.monotonic()
+        results, failures = [], []
+
+        def _retry_or_fail(task_id: int, error: str):
+            if task_id in finished:
+                return
+            attempts[task_id] += 1
+            if attempts[task_id] <= self._max_retries:
+                print(f"Retrying episode {task_id} ({attempts[task_id]}/{self._max_retries})")
+                self._task_q.put(tasks[task_id])
+            else:
+                finished.add(task_id)
+                failures.append({**asdict(tasks[task_id]), "error": error})
+
+        def _handle(kind: str, worker_id: int, task_id: int, payload):
+            if kind == "ready":
+                ready.add(worker_id)
+                print(f"Worker {worker_id} ready. {payload}")
+            elif kind == "started":
+                if worker_id not in self._workers:
+                    # Worker already reaped as crashed before this message came through
+                    _retry_or_fail(task_id, "worker crashed")
+                else:
+                    in_flight[worker_id] = (task_id, time.monotonic())
+            elif kind in ("done", "error"):
+                _, start = in_flight.pop(worker_id, (task_id, time.monotonic()))
+                stats = self._stats[worker_id]
+                stats.busy_s += time.monotonic() - start
+                if task_id in finished:
+                    return  # Late result of an episode that was already retried
+                if kind == "done":
+                    stats.episodes += 1
+                    finished.add(task_id)
+                    results.append(EpisodeResult(**payload))
+                    print(f"[{len(results)}/{len(tasks)}] worker {worker_id}: {payload['sim_run']} "
+                          f"seed={payload['seed']} ep={payload['episode']} -> {payload['termination']}")
+                else:
+                    stats.failures += 1
+                    print(f"Episode {task_id} failed on worker {worker_id}:\n{payload}")
+                    _retry_or_fail(task_id, payload)
+
+        while len(finished) < len(tasks):
+            messages = []
+            try:
+                messages.append(self._result_q.get(timeout=1.0))
+                while True:  # Drain, so messages sent right before a crash are handled before the crash check
+                    messages.append(self._result_q.get_nowait())
+            except queue.Empty:
+                pass
+            for message in messages:
+                _handle(*message)
+            if messages:
+                last_message = time.monotonic()
+
+            # Crashed workers: retry their in-flight episode and replace them
+            for worker_id, process in list(self._workers.items()):
+                if process.is_alive():
+                    continue
+                print(f"Worker {worker_id} died (exit code {process.exitcode})")
+                self._stats[worker_id].ended_at = time.monotonic()
+                del self._workers[worker_id]
+                if worker_id in in_flight:
+                    task_id, _ = in_flight.pop(worker_id)
+                    self._stats[worker_id].failures += 1
+                    _retry_or_fail(task_id, f"worker crashed, exit code {process.exitcode}")
+                slot = self._slots[worker_id]
+                if len(finished) < len(tasks) and self._respawns[slot] < self._max_respawns:
+                    self._respawns[slot] += 1
+                    self._spawn_worker(slot)
+
+            # A worker that crashes right after taking a task can die before its "started" message is sent, the task
+            # is then neither queued nor in flight. All workers idle and silent for a while: re-queue what's missing.
+            idle = all(w in ready and w not in in_flight for w in self._workers)
+            if self._workers and idle and time.monotonic() - last_message > LOST_TASK_TIMEOUT_S:
+                missing = [task_id for task_id in tasks if task_id not in finished]
+                print(f"All workers idle, re-queueing {len(missing)} episode(s) lost by crashed workers")
+                for task_id in missing:
+                    _retry_or_fail(task_id, "lost by a crashed worker")
+                last_message = time.monotonic()
+
+            if not self._workers and len(finished) < len(tasks):
+                print(f"No workers left after {self._max_respawns} respawns per slot, failing the remaining episodes")
+                for task_id in tasks:
+                    if task_id not in finished:
+                        finished.add(task_id)
+                        failures.append({**asdict(tasks[task_id]), "error": "no workers left"})
+
+        self._shutdown()
+        return results, failures
+
+    def _shutdown(self):
+        for _ in self._workers:
+            self._task_q.put(None)
+        for worker_id, process in self._workers.items():
+            process.join(timeout=60)
+            if process.is_alive():
+                process.terminate()
+            self._stats[worker_id].ended_at = time.monotonic()
+        self._workers = {}
+
+    def print_worker_stats(self):
+        print(f"{'worker':>6} {'episodes':>8} {'failures':>8} {'busy_s':>8} {'util':>6}")
+        for stats in self._stats.values():
+            print(f"{stats.worker_id:>6} {stats.episodes:>8} {stats.failures:>8} {stats.busy_s:>8.1f} {stats.utilization:>6.0%}")
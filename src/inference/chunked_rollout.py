@@ -0,0 +1,137 @@
+from typing import Callable, TYPE_CHECKING
+
+import numpy as np
+
+from src.utils import profiler
+
+if TYPE_CHECKING:  # Genesis and the model client aren't needed to run a roll-out with other droid/pi0 objects
+    from src.robots.droid import DroidManager
+    from src.inference.pi0_inference import Pi0Inference
+
+
+"""
+Serial VLA roll-out that caches action chunks and re-plans at a configurable interval.
+
+The plain serial loop takes the first 8 actions of every (10, 8) chunk, drops the rest and queries the policy again.
+Here every chunk is kept until it runs out, and the policy is queried every `replan_every` actions:
+    - replan_every = chunk length (10, the default): all actions of a chunk are executed, 20% fewer inference calls
+      than taking 8 (replan_every=8 without ensembling is the serial loop)
+    - replan_every < chunk length: chunks overlap, and with `ensemble_decay` set the overlapping predictions of all
+      cached chunks for a time step are averaged (temporal ensembling, as in ACT), w_i = exp(-ensemble_decay * i),
+      i = 0 for the oldest chunk. > 0 favors older chunks (smoother), < 0 newer ones (more reactive), 0 is the mean.
+      Without ensembling the newest chunk's actions are executed.
+    - replan_tolerance (adaptive interval): when a new chunk agrees with the cached plan (max arm joint difference on
+      the overlap below the tolerance) the scene is taken as quasi-static and the interval doubles, up to the chunk
+      length minus one (one overlapping action is kept to compare with). A disagreeing chunk resets it to replan_every.
+The gripper command always comes from the newest chunk, averaging a 0/1 command makes no sense.
+
+    Timeline, replan_every=4, chunk length 10:
+    t:          0  1  2  3 | 4  5  6  7 | 8  9 10 11
+    chunk 0:    a0 a1 a2 a3  a4 a5 a6 a7  a8 a9
+    chunk 1:               | b0 b1 b2 b3  b4 b5 b6 b7 b8 b9
+    chunk 2:                            | c0 c1 c2 c3 ...
+    executed:   a0 a1 a2 a3 | e(a4,b0) .. | e(a8,b4,c0) e(a9,b5,c1) e(b6,c2) ..
+"""
+
+
+def ensemble_action_chunks(chunks: list[tuple[int, np.ndarray]], t: int, n: int, decay: float | None) -> np.ndarray:
+    """
+    Actions for time steps t..t+n-1 from the cached chunks, (start time step, (A, 8) actions) oldest first.
+    The newest chunk must cover all n steps. decay None: the newest chunk's actions only.
+    """
+    start, actions = chunks[-1]
+    if decay is None or len(chunks) == 1:
+        return np.array(actions[t - start:t - start + n], dtype=np.float64)
+
+    # (C, n, 8) predictions of every chunk for every step, NaN where a chunk doesn't cover the step
+    preds = np.full((len(chunks), n, actions.shape[-1]), np.nan)
+    for c, (chunk_start, chunk_actions) in enumerate(chunks):
+        lo, hi = max(t, chunk_start), min(t + n, chunk_start + len(chunk_actions))
+        if lo < hi:
+            preds[c, lo - t:hi - t] = chunk_actions[lo - chunk_start:hi - chunk_start]
+    covered = ~np.isnan(preds[..., 0])
+    age_rank = np.cumsum(covered, axis=0) - 1  # 0 for the oldest chunk covering a step
+    weights = np.where(covered, np.exp(-decay * age_rank), 0.0)
+    out = np.array(preds[-1])  # Gripper column from the newest chunk
+    out[:, :7] = np.einsum("cn,cnj->nj", weights, np.nan_to_num(preds[..., :7])) / weights.sum(axis=0)[:, None]
+    return out
+
+
+class ChunkedRollout:
+    """
+    Executes the actions up to the next re-plan per step(..) call, one inference call per step.
+    """
+
+    def __init__(
+        self,
+        droid: "DroidManager",
+        pi0: "Pi0Inference",
+        steps_per_action: int,
+        replan_every: int | None = None,
+        ensemble_decay: float | None = None,
+        replan_tolerance: float | None = None,
+        on_chunk: Callable[[dict, str, np.ndarray], None] | None = None,
+    ):
+        """
+        replan_every: actions executed between inference calls (at most the chunk length), None: the chunk length
+        ensemble_decay: temporal ensembling of overlapping chunks, None executes the newest chunk only
+        replan_tolerance: adaptive re-plan interval (radians), None keeps replan_every
+        on_chunk: called with (observation, prompt, action chunk) for every inference call, e.g.
+            EpisodeWriter.add_step (see src/dataset/episode_writer.py)
+        """
+        if replan_every is not None and replan_every < 1:
+            raise ValueError(f"replan_every must be >= 1, got {replan_every}")
+        self._droid = droid
+        self._pi0 = pi0
+        self._steps_per_action = steps_per_action
+        self._replan_every = replan_every
+        self._ensemble_decay = ensemble_decay
+        self._replan_tolerance = replan_tolerance
+        self._on_chunk = on_chunk
+        self.n_inference_calls = 0
+        self.n_actions = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Drop all cached chunks, e.g. after a scene reset or a prompt change.
+        """
+        self._chunks = []  # (start time step, actions), oldest first
+        self._t = 0  # Actions executed since reset
+        self._interval = self._replan_every
+
+    def _update_interval(self, new_chunk: np.ndarray):
+        if self._replan_tolerance is None or not self._chunks:
+            return
+        start, prev = self._chunks[-1]
+        overlap = prev[self._t - start:, :7]
+        agrees = len(overlap) > 0 and np.abs(new_chunk[:len(overlap), :7] - overlap).max() < self._replan_tolerance
+        replan_every = self._replan_every or len(new_chunk)
+        self._interval = min(2 * self._interval, len(new_chunk) - 1) if agrees else replan_every
+        self._interval = max(self._interval, replan_every)
+
+    def step(self, prompt: str) -> int:
+        """
+        Query the policy once, then execute the actions until the next re-plan. Returns the number of actions executed.
+        """
+        scene_obv = self._droid.get_scene_observation()
+        chunk = np.asarray(self._pi0.forward(droid_observation=scene_obv, prompt=prompt, actions=None))
+        self.n_inference_calls += 1
+        if self._on_chunk:
+            self._on_chunk(scene_obv, prompt, chunk)
+        self._interval = self._interval or len(chunk)
+        self._update_interval(chunk)
+        self._chunks = [(start, actions) for start, actions in self._chunks if start + len(actions) > self._t]
+        self._chunks.append((self._t, chunk))
+
+        n = min(self._interval, len(chunk))
+        with profiler.timer("chunked/ensemble"):
+            actions = ensemble_action_chunks(self._chunks, self._t, n, self._ensemble_decay)
+        self._droid.apply_abs_joint_actions(actions=actions, steps_per_action=self._steps_per_action)
+        self._t += n
+        self.n_actions += n
+        return n
+
+    def summary(self) -> str:
+        per_call = self.n_actions / max(self.n_inference_calls, 1)
+        return f"Chunked roll-out: {self.n_inference_calls} inference calls, {per_call:.1f} actions per call"
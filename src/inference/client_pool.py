@@ -0,0 +1,304 @@
+import time
+import socket
+import threading
+from collections import deque
+from typing import TYPE_CHECKING
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from openpi_client.websocket_client_policy import WebsocketClientPolicy
+
+
+"""
+Pool of websocket connections to one or more policy servers (replicas of the same model), used by Pi0Inference.
+
+    pool = PolicyClientPool(["gpu0:8000", "gpu1:8000"], timeout_s=10.0)
+    response = pool.infer(observation)           # Same as WebsocketClientPolicy.infer(..)
+    responses = pool.infer_many(observations)    # In parallel across replicas
+    print(pool.summary())                        # Per replica latency, queue depth, errors
+
+- Load balancing: each request goes to the healthy replica with the fewest outstanding (queued + in flight) requests,
+  ties go to the lower median latency. A connection serves one request at a time (the websocket protocol is
+  request/response), so with several sim workers sharing replicas, requests queue per connection.
+- Deadlines: timeout_s bounds each attempt of a request, incl. queueing on the connection. A request that misses it
+  while running on the server has its connection closed (that unblocks the waiting thread) and the replica counts as
+  failed. One still queued (in the pool or behind another request on the connection) is abandoned and never sent,
+  a busy replica isn't marked failed.
+- Failures: a failed replica is unhealthy for a backoff (doubling up to max_backoff_s) and is reconnected on its next
+  request, the request is retried on another healthy replica (up to max_retries times).
+"""
+
+
+def _parse_endpoint(endpoint: str) -> tuple[str, int]:
+    host, sep, port = endpoint.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid policy server endpoint '{endpoint}', expected <host>:<port>")
+    return host or "localhost", int(port)
+
+
+def _close_client(client: "WebsocketClientPolicy | None"):
+    # openpi_client has no close(), closing its websocket also makes a blocked infer(..) raise
+    ws = getattr(client, "_ws", None)
+    if ws is not None:
+        try:
+            ws.close()
+        except Exception:
+            pass
+
+
+class _Replica:
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.name = f"{host}:{port}"
+        self.client = None  # Connected lazily, None after a failure
+        self.lock = threading.Lock()  # One request at a time on the connection
+        self.owner = None  # Abandon event of the request holding the connection
+        self.owner_lock = threading.Lock()  # Guards owner, held while a timed out request closes the connection
+        self.outstanding = 0  # Queued + in flight requests
+        self.retry_at = 0.0  # Unhealthy until then (time.monotonic())
+        self.consecutive_failures = 0
+        self.n_requests = 0
+        self.n_failures = 0
+        self.latencies_s = deque(maxlen=200)
+
+    def median_latency_s(self) -> float:
+        return float(np.median(self.latencies_s)) if self.latencies_s else 0.0
+
+
+class PolicyClientPool:
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        connections_per_endpoint: int = 1,
+        timeout_s: float | None = None,
+        max_retries: int = 2,
+        connect_timeout_s: float = 5.0,
+        backoff_s: float = 1.0,
+        max_backoff_s: float = 30.0,
+    ):
+        """
+        endpoints: "<host>:<port>" of each policy server
+        connections_per_endpoint: parallel connections (concurrent requests) per server
+        timeout_s: default deadline per request attempt, None waits as long as the server takes (e.g. first request
+            compiles the model)
+        max_retries: retries of a failed request, each on the least loaded healthy replica (preferring untried ones)
+        connect_timeout_s: TCP connect probe per (re)connect attempt
+        """
+        if not endpoints:
+            raise ValueError("No policy server endpoints given")
+        self._replicas = [
+            _Replica(*_parse_endpoint(endpoint)) for endpoint in endpoints for _ in range(connections_per_endpoint)
+        ]
+        self._timeout_s = timeout_s
+        self._max_retries = max_retries
+        self._connect_timeout_s = connect_timeout_s
+        self._backoff_s = backoff_s
+        self._max_backoff_s = max_backoff_s
+        self._lock = threading.Lock()  # Replica selection and bookkeeping
+        self._healthy = threading.Condition(self._lock)
+        # Twice the connections: requests timed out on a stuck connection keep their thread until it's closed
+        self._executor = ThreadPoolExecutor(max_workers=2 * len(self._replicas), thread_name_prefix="policy_pool")
+        self.n_retries = 0
+        self.n_timeouts = 0
+        self._server_metadata = self._wait_for_server()
+
+    def _connect(self, replica: _Replica):
+        # WebsocketClientPolicy(..) retries forever on a refused connection, probe first so a down replica fails fast
+        from openpi_client.websocket_client_policy import WebsocketClientPolicy
+
+        with socket.create_connection((replica.host, replica.port), timeout=self._connect_timeout_s):
+            pass
+        replica.client = WebsocketClientPolicy(host=replica.host, port=replica.port)
+
+    def _wait_for_server(self) -> dict:
+        """
+        Blocks until at least one replica accepts a connection (like WebsocketClientPolicy does for a single server),
+        replicas that are down are reconnected on later requests.
+        """
+        waiting_since = time.monotonic()
+        while True:
+            for replica in self._replicas:
+                try:
+                    self._connect(replica)
+                except OSError:
+                    self._mark_failed(replica)
+            connected = [replica for replica in self._replicas if replica.client is not None]
+            if connected:
+                if len(connected) < len(self._replicas):
+                    down = sorted({r.name for r in self._replicas if r.client is None})
+                    print(f"Policy servers not reachable (will retry): {', '.join(down)}")
+                return connected[0].client.get_server_metadata()
+            print(f"Still waiting for policy server(s) ({time.monotonic() - waiting_since:.0f}s)...")
+            time.sleep(self._backoff_s)
+
+    def get_server_metadata(self) -> dict:
+        return self._server_metadata
+
+    def _mark_failed(self, replica: _Replica):
+        with self._lock:
+            replica.n_failures += 1
+            replica.consecutive_failures += 1
+            backoff = min(self._backoff_s * 2 ** (replica.consecutive_failures - 1), self._max_backoff_s)
+            replica.retry_at = time.monotonic() + backoff
+
+    def _mark_ok(self, replica: _Replica, latency_s: float):
+        with self._lock:
+            replica.n_requests += 1
+            replica.consecutive_failures = 0
+            replica.latencies_s.append(latency_s)
+            self._healthy.notify_all()
+
+    def _call(self, replica: _Replica, observation: dict, abandoned: threading.Event) -> dict | None:
+        try:
+            with replica.lock:
+                with replica.owner_lock:
+                    if abandoned.is_set():
+                        return None  # Timed out while queued on the connection, nobody waits for it anymore
+                    replica.owner = abandoned
+                try:
+                    if replica.client is None:
+                        self._connect(replica)
+                    start = time.perf_counter()
+                    try:
+                        response = replica.client.infer(observation)
+                    except Exception:
+                        _close_client(replica.client)
+                        replica.client = None
+                        raise
+                finally:
+                    with replica.owner_lock:
+                        replica.owner = None
+            if not abandoned.is_set():
+                self._mark_ok(replica, time.perf_counter() - start)
+            return response
+        finally:
+            with self._lock:
+                replica.outstanding -= 1
+                self._healthy.notify_all()
+
+    def _dispatch(
+        self, observation: dict, tried: set, timeout_s: float | None,
+    ) -> tuple[_Replica, Future, threading.Event, float]:
+        """
+        Send to the least loaded healthy replica, waits (up to timeout_s) while none is healthy.
+        Returns the replica, the request's future, the event to abandon it and its deadline.
+        """
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                healthy = [r for r in self._replicas if r.retry_at <= now]
+                candidates = [r for r in healthy if r.name not in tried] or healthy
+                if candidates:
+                    replica = min(candidates, key=lambda r: (r.outstanding, r.median_latency_s()))
+                    replica.outstanding += 1
+                    break
+                wait_s = min(r.retry_at for r in self._replicas) - now
+                if deadline is not None:
+                    if now >= deadline:
+                        raise TimeoutError("No healthy policy server before the request deadline")
+                    wait_s = min(wait_s, deadline - now)
+                self._healthy.wait(wait_s)
+        abandoned = threading.Event()
+        return replica, self._executor.submit(self._call, replica, observation, abandoned), abandoned, deadline
+
+    def _abandon(self, replica: _Replica, future: Future, abandoned: threading.Event) -> bool:
+        """
+        Give up on a timed out request. Returns whether the replica was serving it (and so missed the deadline), False
+        if it was still queued and never reached the server.
+        """
+        if future.cancel():
+            # Still queued in the executor, _call(..) never runs to release it
+            with self._lock:
+                replica.outstanding -= 1
+                self._healthy.notify_all()
+            return False
+        with replica.owner_lock:
+            abandoned.set()
+            # Only close the connection if it's serving this request, not one queued ahead of it
+            if replica.owner is abandoned:
+                _close_client(replica.client)
+                return True
+        return False
+
+    def _result(
+        self,
+        observation: dict,
+        replica: _Replica,
+        future: Future,
+        abandoned: threading.Event,
+        deadline: float | None,
+        timeout_s: float | None,
+    ) -> dict:
+        tried = {replica.name}
+        for attempt in range(self._max_retries + 1):
+            try:
+                return future.result(timeout=None if deadline is None else max(deadline - time.monotonic(), 0.0))
+            except TimeoutError:
+                error = TimeoutError(f"no response within {timeout_s}s")
+                self.n_timeouts += 1
+                if self._abandon(replica, future, abandoned):
+                    self._mark_failed(replica)
+                    print(f"Policy server {replica.name} failed ({type(error).__name__}: {error})")
+                else:
+                    # Busy with other requests, but not failed itself
+                    print(f"Request timed out queued for policy server {replica.name}")
+            except Exception as e:
+                error = e
+                self._mark_failed(replica)
+                print(f"Policy server {replica.name} failed ({type(error).__name__}: {error})")
+            if attempt == self._max_retries:
+                break
+            self.n_retries += 1
+            replica, future, abandoned, deadline = self._dispatch(observation, tried, timeout_s)
+            tried.add(replica.name)
+        raise RuntimeError(f"Policy inference failed after {attempt + 1} attempt(s)") from error
+
+    def infer(self, observation: dict, timeout_s: float | None = None) -> dict:
+        return self.infer_many([observation], timeout_s)[0]
+
+    def infer_many(self, observations: list[dict], timeout_s: float | None = None) -> list[dict]:
+        """
+        Requests are sent all at once, spread over the replicas, results come back in order.
+        timeout_s: deadline of every request attempt, default the pool's timeout_s.
+        """
+        timeout_s = self._timeout_s if timeout_s is None else timeout_s
+        requests = [(observation, *self._dispatch(observation, set(), timeout_s)) for observation in observations]
+        return [self._result(observation, *request, timeout_s) for observation, *request in requests]
+
+    def stats(self) -> list[dict]:
+        """
+        Per replica (connection) stats, latencies in ms over the last 200 requests.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "endpoint": replica.name,
+                "healthy": replica.retry_at <= now,
+                "outstanding": replica.outstanding,
+                "requests": replica.n_requests,
+                "failures": replica.n_failures,
+                "latency_p50_ms": 1000 * replica.median_latency_s(),
+                "latency_p95_ms": 1000 * float(np.percentile(replica.latencies_s, 95)) if replica.latencies_s else 0.0,
+            } for replica in self._replicas]
+
+    def summary(self) -> str:
+        lines = [f"Policy client pool: {self.n_retries} retries, {self.n_timeouts} timeouts"]
+        for s in self.stats():
+            lines.append(
+                f"  {s['endpoint']:<24} {'healthy' if s['healthy'] else 'DOWN':<8} queue {s['outstanding']:>2}  "
+                f"{s['requests']:>6} req  {s['failures']:>3} failed  "
+                f"p50 {s['latency_p50_ms']:7.1f} ms  p95 {s['latency_p95_ms']:7.1f} ms"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for replica in self._replicas:
+            _close_client(replica.client)
+            replica.client = None
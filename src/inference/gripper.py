@@ -0,0 +1,10 @@
+import numpy as np
+
+
+def normalize_gripper(gripper_position: np.ndarray) -> np.ndarray:
+    """
+    Map gripper finger angle(s) (..., 2) in radians to the [0, 1] gripper state Pi0 expects, shape (..., 1).
+    Only the first finger is used, both fingers get the same command.
+    """
+    gripper = gripper_position[..., :1]
+    return np.clip(gripper / (np.pi/4), 0.0, 1.0).astype(np.float32)
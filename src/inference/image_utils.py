@@ -0,0 +1,54 @@
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+def fits_without_resize(cur_height: int, cur_width: int, height: int, width: int) -> bool:
+    """
+    True if an image already fits (height, width) touching at least one side, i.e. resize_with_pad(..) would
+    only zero-pad it. E.g. cams rendered at 224x126 (16:9) for a 224x224 model input.
+    """
+    return max(cur_width / width, cur_height / height) == 1.0
+
+
+def zero_pad_center(images: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    Center images (..., h, w, c) in a zero (..., height, width, c) canvas, same placement as resize_with_pad(..).
+    """
+    cur_height, cur_width = images.shape[-3:-1]
+    pad_height = max(0, int((height - cur_height) / 2))
+    pad_width = max(0, int((width - cur_width) / 2))
+    out = np.zeros((*images.shape[:-3], height, width, images.shape[-1]), dtype=images.dtype)
+    out[..., pad_height:pad_height + cur_height, pad_width:pad_width + cur_width, :] = images
+    return out
+
+
+def resize_with_pad_batch(images: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    Batched version of openpi_client.image_tools.resize_with_pad(..), same output geometry (keep aspect ratio,
+    scale down to fit, center with zero padding), but resizes a whole (B, H, W, 3) uint8 stack in one
+    interpolate call instead of one PIL resize per image. Runs on GPU if available.
+
+    Antialiased bilinear interpolation is used to match PIL's BILINEAR downscaling (pixel values can still be
+    off by a few units of uint8 w.r.t. PIL).
+    """
+    n, cur_height, cur_width, c = images.shape
+    if (cur_height, cur_width) == (height, width):
+        return images
+    if fits_without_resize(cur_height, cur_width, height, width):
+        return zero_pad_center(images, height, width)
+
+    ratio = max(cur_width / width, cur_height / height)
+    resized_height = int(cur_height / ratio)
+    resized_width = int(cur_width / ratio)
+    pad_height = max(0, int((height - resized_height) / 2))
+    pad_width = max(0, int((width - resized_width) / 2))
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    x = torch.from_numpy(np.ascontiguousarray(images)).to(device).permute(0, 3, 1, 2).float()  # (B, 3, H, W)
+    x = F.interpolate(x, size=(resized_height, resized_width), mode="bilinear", antialias=True, align_corners=False)
+    x = x.round_().clamp_(0, 255).to(torch.uint8).permute(0, 2, 3, 1)
+
+    out = torch.zeros((n, height, width, c), dtype=torch.uint8, device=device)
+    out[:, pad_height:pad_height + resized_height, pad_width:pad_width + resized_width] = x
+    return out.cpu().numpy()
@@ -1,15 +1,61 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import numpy as np
 
 from openpi_client import image_tools
-from openpi_client.websocket_client_policy import WebsocketClientPolicy
+
+from src.utils import profiler
+from src.robots.droid_const import CAM_RES
+from src.inference.client_pool import PolicyClientPool
+from src.inference.gripper import normalize_gripper
+from src.inference.image_utils import resize_with_pad_batch, fits_without_resize, zero_pad_center
+
+
+def _resize_with_pad(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    image_tools.resize_with_pad(..), but skip the resize if cams already render at model resolution
+    (see OBS_CAM_RES in src/robots/droid_const.py).
+    """
+    if fits_without_resize(*image.shape[:2], height, width):
+        return zero_pad_center(image, height, width)
+    return image_tools.resize_with_pad(image, height, width)
+
+
+def _to_numpy(x) -> np.ndarray:
+    """
+    Joint states come out of Genesis as (CUDA) torch tensors, but may already be on host (e.g. numpy views into
+    DroidManager's pinned observation buffer), those are used as-is, no copy.
+    """
+    if isinstance(x, np.ndarray):
+        return x
+    return x.cpu().numpy()
 
 
 class Pi0Inference:
 
-    def __init__(self):
-        self._pi0_model_client = WebsocketClientPolicy(host="localhost", port=8000)
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8000,
+        endpoints: list[str] | None = None,
+        connections_per_endpoint: int = 1,
+        timeout_s: float | None = None,
+        max_retries: int = 2,
+    ):
+        """
+        endpoints: "<host>:<port>" of each policy server (replicas of the same model), default host:port.
+        Requests are load balanced, retried and time out as described in src/inference/client_pool.py.
+        """
+        self._pi0_model_client = PolicyClientPool(
+            endpoints or [f"{host}:{port}"], connections_per_endpoint=connections_per_endpoint,
+            timeout_s=timeout_s, max_retries=max_retries,
+        )
+        # Server tells us if it accepts a whole batch of observations in one request (see stub_policy_server.py)
+        self._server_batched = bool(self._pi0_model_client.get_server_metadata().get("batched", False))
+        self._executor = None  # Lazily created background worker, see forward_async(..)
 
-    def forward(self, droid_observation: dict, prompt:str, actions: int = 10):
+    def forward(self, droid_observation: dict, prompt:str, actions: int | None = 10):
         """
         For simplicity, droid_observation should be of the following form, as seen
         in the output of src/robots/droid.py get_scene_observation(..)
@@ -27,8 +73,9 @@ class Pi0Inference:
         wrist_cam_img = droid_observation["wrist_cam_img"]
         ext_camera_img = droid_observation["ext_camera_img"]
 
-        joint_positions = joint_positions.cpu().numpy()
-        gripper_position = gripper_position.cpu().numpy()
+        with profiler.timer("infer/to_numpy"):
+            joint_positions = _to_numpy(joint_positions)
+            gripper_position = _to_numpy(gripper_position)
 
         """
         See src/data_inpection/droid_data.py
@@ -43,12 +90,11 @@ class Pi0Inference:
         """
         # Resize images on the client side to minimize bandwidth, latency, and match training routines.
         # Resizing it to 224x224 (as seen in openpi repo)
-        ext_camera_img = image_tools.resize_with_pad(ext_camera_img, 224, 224)
-        wrist_cam_img = image_tools.resize_with_pad(wrist_cam_img, 224, 224)
+        with profiler.timer("infer/resize_with_pad"):
+            ext_camera_img = _resize_with_pad(ext_camera_img, 224, 224)
+            wrist_cam_img = _resize_with_pad(wrist_cam_img, 224, 224)
 
-        gripper = gripper_position[0]
-        gripper_norm = np.clip(gripper / (np.pi/4), 0.0, 1.0)
-        gripper_norm = np.array([gripper_norm], dtype=np.float32)
+        gripper_norm = normalize_gripper(gripper_position)
         # print(f"gripper_position: {gripper_position}, gripper_norm: {gripper_norm}")  # Must end up between 0 and 1
 
         observation = {
@@ -67,12 +113,116 @@ class Pi0Inference:
 
         In the π0 paper, Franka runs at 20Hz with a 16 step horizon (π0 paper, APPENDIX D. Inference). Here I'll
         use 15-20Hz, with a 8-10 step horizon per chunk.
-        # TODO: Record the tracking error (q_desired - q_actual).
+        The tracking error (q_desired - q_actual) is recorded by DroidManager, see src/robots/joint_actions.py.
         """
         try:
             # print(f"Running inference...")
-            model_response = self._pi0_model_client.infer(observation)
+            with profiler.timer("infer/round_trip"):
+                model_response = self._pi0_model_client.infer(observation)
             return model_response["actions"][:actions]  # Shape: (10, 8), numpy.float64
         except Exception:
             print("Failed to run Pi0 model inference")
             raise
+
+    def forward_batch(self, observations: dict, prompts: str | list[str], actions: int | None = 10) -> np.ndarray:
+        """
+        Batched forward(..) for B envs, observations are stacked along the first dim, as seen in the output of
+        src/robots/droid_batched.py get_scene_observation(..):
+            observations {
+                "joint_positions": (B, 7),
+                "gripper_position": (B, 2),
+                "wrist_cam_img": (B, H, W, 3),
+                "ext_camera_img": (B, H, W, 3),
+            }
+        prompts: one prompt for all envs, or one per env.
+        Returns action chunks of shape (B, actions, 8).
+
+        Images are resized for all envs at once. If the model server accepts batches the whole batch goes out as one
+        msgpack payload (one round-trip), otherwise it falls back to one request per env.
+        """
+        joint_positions = _to_numpy(observations["joint_positions"])
+        gripper_norm = normalize_gripper(_to_numpy(observations["gripper_position"]))
+        n_envs = joint_positions.shape[0]
+        if isinstance(prompts, str):
+            prompts = [prompts] * n_envs
+        if len(prompts) != n_envs:
+            raise ValueError(f"Got {len(prompts)} prompts for {n_envs} envs")
+
+        with profiler.timer("infer/resize_with_pad"):
+            ext_camera_imgs = resize_with_pad_batch(observations["ext_camera_img"], 224, 224)
+            wrist_cam_imgs = resize_with_pad_batch(observations["wrist_cam_img"], 224, 224)
+
+        try:
+            with profiler.timer("infer/round_trip"):
+                if self._server_batched:
+                    model_response = self._pi0_model_client.infer({
+                        "observation/exterior_image_1_left": ext_camera_imgs,
+                        "observation/wrist_image_left": wrist_cam_imgs,
+                        "observation/joint_position": joint_positions,
+                        "observation/gripper_position": gripper_norm,
+                        "prompt": prompts,
+                    })
+                    return np.asarray(model_response["actions"])[:, :actions]  # Shape: (B, 10, 8)
+                # One request per env, sent concurrently over the pool's connections
+                model_responses = self._pi0_model_client.infer_many([{
+                    "observation/exterior_image_1_left": ext_camera_imgs[i],
+                    "observation/wrist_image_left": wrist_cam_imgs[i],
+                    "observation/joint_position": joint_positions[i],
+                    "observation/gripper_position": gripper_norm[i],
+                    "prompt": prompts[i],
+                } for i in range(n_envs)])
+                return np.stack([model_response["actions"][:actions] for model_response in model_responses])
+        except Exception:
+            print("Failed to run batched Pi0 model inference")
+            raise
+
+    def forward_async(self, droid_observation: dict, prompt: str, actions: int | None = 10) -> Future:
+        """
+        Non-blocking version of forward(..), the inference call runs on a single background worker thread
+        so the caller can keep stepping physics while the model server works. Call `.result()` on the returned
+        Future to get the action chunk.
+
+        Joint tensors still on device are copied to host here (on the caller's thread) so the worker never touches
+        sim memory that may be overwritten by the next sim steps. Host views from DroidManager's observation buffer
+        stay valid for one more observation, enough for one request in flight.
+        """
+        if self._executor is None:
+            # Single worker: requests are in order anyways (the client pool itself is thread-safe)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pi0_inference")
+        droid_observation = dict(droid_observation)
+        for key in ("joint_positions", "gripper_position"):
+            droid_observation[key] = _to_numpy(droid_observation[key])
+        return self._executor.submit(self.forward, droid_observation, prompt, actions)
+
+    def warmup(self, cam_res: tuple = CAM_RES, prompt: str = "", n_envs: int | None = None) -> float:
+        """
+        Dummy inference (blank images at the obs cam res, rest pose zeros), so the server compiles/JITs the model now
+        and not during the first episode. n_envs: warm up forward_batch(..) with that batch size instead (servers
+        compile per input shape). Returns the round-trip time in seconds.
+        """
+        width, height = cam_res
+        observation = {
+            "joint_positions": np.zeros(7, dtype=np.float32),
+            "gripper_position": np.zeros(2, dtype=np.float32),
+            "wrist_cam_img": np.zeros((height, width, 3), dtype=np.uint8),
+            "ext_camera_img": np.zeros((height, width, 3), dtype=np.uint8),
+        }
+        start = time.perf_counter()
+        if n_envs is None:
+            self.forward(observation, prompt)
+        else:
+            self.forward_batch({key: np.stack([value] * n_envs) for key, value in observation.items()}, prompt)
+        return time.perf_counter() - start
+
+    def client_summary(self) -> str:
+        """
+        Latency, queue depth and failures per policy server connection.
+        """
+        return self._pi0_model_client.summary()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._pi0_model_client.close()
+
@@ -0,0 +1,123 @@
+from typing import Callable, TYPE_CHECKING
+
+import numpy as np
+
+from src.utils import profiler
+
+if TYPE_CHECKING:  # Genesis and the model client aren't needed to run a roll-out with other droid/pi0 objects
+    from src.robots.droid import DroidManager
+    from src.inference.pi0_inference import Pi0Inference
+
+
+"""
+Pipelined (asynchronous) VLA roll-out.
+
+The serial loop is: observe -> infer (blocking) -> apply all actions of the chunk. Physics sits idle while the model
+server runs, and the model server sits idle while physics steps.
+
+Here, partway through the current plan (after `prefetch_at` actions) an observation is captured and the next chunk
+is requested in the background while the remaining actions of the current plan are stepped. The new chunk was
+planned from the state at action `prefetch_at`, so by the time it arrives its actions for the steps executed since
+are stale and are dropped. The last `blend_steps` actions of the current plan are never executed, they overlap with
+the start of what is left of the new chunk and the two are blended (real-time-chunking style) to avoid a jump in
+joint targets when switching chunks.
+
+Per step at most `actions_per_chunk` actions are executed, fewer when the plan is shorter: the new chunk only
+reaches (chunk length) actions past the request, so with a (10, 8) chunk, actions_per_chunk=8 and prefetch_at=4 the
+steps alternate between 8 and 4 executed actions (the short steps request the next chunk at their end, without
+overlap). step(..) returns the number executed. b(x, y) below is the blend of x and y.
+
+    Timeline, chunk length 10, actions_per_chunk=8, prefetch_at=4, blend_steps=2:
+    t:          0  1  2  3  4  5  6  7  8  9  10 11 12 13 14
+    chunk n:    a0 a1 a2 a3 a4 a5 a6 a7 a8 a9
+                            ^ obs + request chunk n+1
+    chunk n+1:              b0 b1 b2 b3 b4 b5 b6 b7 b8 b9
+                                                    ^ obs + request chunk n+2
+    chunk n+2:                                      c0 c1 c2 ..
+    executed:   a0 .. a7 (step 1) | b(a8,b4) b(a9,b5) b6 b7 (step 2) | b(b8,c0) b(b9,c1) c2 .. (step 3)
+"""
+
+
+def blend_action_chunks(prev_tail: np.ndarray, new_chunk: np.ndarray, blend_steps: int) -> np.ndarray:
+    """
+    Linearly cross-fade the arm joint targets from prev_tail into new_chunk over the first blend_steps actions.
+    Both inputs are time-aligned (i.e. prev_tail[i] and new_chunk[i] are targets for the same time step).
+    The gripper command (last column) always comes from the newest chunk, blending a 0/1 command makes no sense.
+    """
+    out = np.array(new_chunk, dtype=np.float64, copy=True)
+    n = min(len(prev_tail), len(new_chunk), blend_steps)
+    for i in range(n):
+        w = (i + 1) / (blend_steps + 1)  # Weight of the new chunk, ramps up towards 1
+        out[i, :7] = (1.0 - w) * prev_tail[i, :7] + w * new_chunk[i, :7]
+    return out
+
+
+class PipelinedRollout:
+    """
+    Runs one action chunk per step(..) call, overlapping the next inference request with physics stepping.
+    """
+
+    def __init__(
+        self,
+        droid: "DroidManager",
+        pi0: "Pi0Inference",
+        steps_per_action: int,
+        actions_per_chunk: int = 8,
+        prefetch_at: int = 4,
+        blend_steps: int = 2,
+        on_chunk: Callable[[dict, str, np.ndarray], None] | None = None,
+    ):
+        """
+        on_chunk: called with (observation, prompt, action chunk) for every inference call, e.g.
+            EpisodeWriter.add_step (see src/dataset/episode_writer.py)
+        """
+        if not 0 <= prefetch_at <= actions_per_chunk:
+            raise ValueError(f"prefetch_at must be in [0, {actions_per_chunk}], got {prefetch_at}")
+        self._droid = droid
+        self._pi0 = pi0
+        self._steps_per_action = steps_per_action
+        self._actions_per_chunk = actions_per_chunk
+        self._prefetch_at = prefetch_at
+        self._blend_steps = blend_steps
+        self._on_chunk = on_chunk
+        self._actions = None  # Actions not executed yet, [0] is the target of the next action
+
+    def reset(self):
+        """
+        Drop any pending actions, e.g. after a scene reset or a prompt change.
+        """
+        self._actions = None
+
+    def step(self, prompt: str) -> int:
+        """
+        Execute the current plan up to the switch to the next chunk. Returns the number of actions executed.
+        """
+        if self._actions is None or len(self._actions) == 0:
+            # Start of episode, nothing to overlap with
+            scene_obv = self._droid.get_scene_observation()
+            self._actions = np.asarray(self._pi0.forward(droid_observation=scene_obv, prompt=prompt, actions=None))
+            if self._on_chunk:
+                self._on_chunk(scene_obv, prompt, self._actions)
+
+        chunk = self._actions
+        # Keep the last blend_steps actions of the plan to blend into the next chunk
+        n_exec = max(min(self._actions_per_chunk, len(chunk) - self._blend_steps), 1)
+        k = min(self._prefetch_at, n_exec)
+
+        self._droid.apply_abs_joint_actions(actions=chunk[:k], steps_per_action=self._steps_per_action)
+        # Request next chunk from the state at action k, keep stepping while the model runs
+        scene_obv = self._droid.get_scene_observation()
+        future = self._pi0.forward_async(droid_observation=scene_obv, prompt=prompt, actions=None)
+        self._droid.apply_abs_joint_actions(actions=chunk[k:n_exec], steps_per_action=self._steps_per_action)
+        with profiler.timer("pipelined/wait_for_chunk"):  # Inference time not hidden behind physics
+            new_chunk = np.asarray(future.result())
+        if self._on_chunk:
+            self._on_chunk(scene_obv, prompt, new_chunk)
+
+        # Drop the part of the new chunk that was planned for steps we already executed, new_chunk[0] is for step k
+        self._actions = blend_action_chunks(
+            prev_tail=chunk[n_exec:],
+            new_chunk=new_chunk[n_exec - k:],
+            blend_steps=self._blend_steps,
+        )
+        return n_exec
@@ -0,0 +1,75 @@
+import time
+import argparse
+
+import numpy as np
+
+
+"""
+Local stand-in for the openpi policy server (same websocket + msgpack protocol as
+openpi/serving/websocket_policy_server.py) so the client side can be run and benchmarked without the real model.
+
+It answers every request with an action chunk that holds the current joint positions (plus optional noise), and
+can fake model latency. With `--batched` it advertises `{"batched": True}` in its metadata and accepts observations
+stacked along a leading batch dim, see Pi0Inference.forward_batch(..).
+
+python -m src.inference.stub_policy_server --port 8000 --batched --latency_ms 80
+"""
+
+ACTION_HORIZON = 10  # Same chunk shape as pi0_fast_droid_jointpos: (10, 8)
+
+
+class StubPolicy:
+
+    def __init__(self, noise_std: float = 0.0, latency_ms: float = 0.0, seed: int = 0):
+        self._noise_std = noise_std
+        self._latency_s = latency_ms / 1000.0
+        self._rng = np.random.default_rng(seed)
+
+    def infer(self, obs: dict) -> dict:
+        """
+        Echo (and perturb) the observed joint/gripper state as an absolute joint-position action chunk.
+        Works for a single observation (7,) or a batch (B, 7).
+        """
+        if self._latency_s > 0:
+            time.sleep(self._latency_s)
+        joints = np.asarray(obs["observation/joint_position"], dtype=np.float64)
+        gripper = np.asarray(obs["observation/gripper_position"], dtype=np.float64)
+        action = np.concatenate([joints, gripper], axis=-1)  # (..., 8)
+        actions = np.repeat(action[..., None, :], ACTION_HORIZON, axis=-2)  # (..., 10, 8)
+        if self._noise_std > 0:
+            actions[..., :7] += self._rng.normal(0.0, self._noise_std, size=actions[..., :7].shape)
+        return {"actions": actions}
+
+
+def serve_stub_policy(policy: StubPolicy, host: str, port: int, batched: bool):
+    from websockets.sync.server import serve  # Only the server needs them, StubPolicy runs without
+    from openpi_client import msgpack_numpy
+
+    packer = msgpack_numpy.Packer()
+    metadata = {"stub": True, "batched": batched}
+
+    def _handler(websocket):
+        print(f"Connection from {websocket.remote_address} opened")
+        websocket.send(packer.pack(metadata))
+        for message in websocket:
+            obs = msgpack_numpy.unpackb(message)
+            infer_time = time.monotonic()
+            action = policy.infer(obs)
+            action["server_timing"] = {"infer_ms": 1000 * (time.monotonic() - infer_time)}
+            websocket.send(packer.pack(action))
+        print(f"Connection from {websocket.remote_address} closed")
+
+    with serve(_handler, host, port, compression=None, max_size=None) as server:
+        print(f"Stub policy server listening on {host}:{port} (batched={batched})")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in policy server for client-side benchmarks")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batched", action="store_true", help="Accept batched observations in one request")
+    parser.add_argument("--noise_std", type=float, default=0.0, help="Std of noise added to echoed joint targets")
+    parser.add_argument("--latency_ms", type=float, default=0.0, help="Fake model latency per request")
+    args = parser.parse_args()
+    serve_stub_policy(StubPolicy(args.noise_std, args.latency_ms), args.host, args.port, args.batched)
@@ -1,11 +1,18 @@
 import numpy as np
 import genesis as gs
+import torch
 from datetime import datetime
 
+from src.robots.obs_buffer import ObservationBuffer
+from src.robots.joint_actions import joint_targets, interpolate_joint_targets, TrackingError
+from src.utils import profiler
+from src.utils.root import get_temp_data_abs_path
+from src.utils.video_recorder import StreamingVideoRecorder
+from src.utils.recording_clock import RecordingClock
 from src.robots.droid_const import (
     JOINT_DAMPING,  POSITIONAL_GAINS,  VELOCITY_GAINS,  FORCE_RANGES_LOWER, FORCE_RANGES_UPPER,
     CAM_RES, CAM_FOV, MUJOCO_FILE, EXT_CAM_1_LEFT_OFFSET_T, WRIST_CAM_OFFSET_T, REST_POSE,
-    SETUP_STABILITY_STEPS, JOINT_NAMES, END_EFFECTOR_NAME, EXT_CAM_2_LEFT_OFFSET_T
+    SETUP_STABILITY_STEPS, JOINT_NAMES, END_EFFECTOR_NAME, EXT_CAM_2_LEFT_OFFSET_T, ACTION_INTERPOLATIONS
 )
 
 
@@ -31,31 +38,54 @@ class DroidManager:
         scene: gs.Scene,
         base_pos: list,
         base_quat: list,
-        render_all_steps: bool,
         enable_left_2_cam: bool = False,
         rest_pose: list = REST_POSE,
+        obs_cam_res: tuple = CAM_RES,
+        record_cam_res: tuple = CAM_RES,
+        mjcf_file: str = MUJOCO_FILE,
+        action_interpolation: str = "hold",
     ):
+        """
+        obs_cam_res: render res of the cams used for observations (wrist and ext cam 1), see OBS_CAM_RES.
+        record_cam_res: render res of the recording-only cam (ext cam 2), can stay high-res when obs cams are low-res.
+        mjcf_file: robot model, e.g. a faster (less stable) gripper variant, see README.
+        action_interpolation: joint targets between actions, "hold", "linear" or "cubic",
+            see src/robots/joint_actions.py
+        """
+        if action_interpolation not in ACTION_INTERPOLATIONS:
+            raise ValueError(f"action_interpolation must be one of {ACTION_INTERPOLATIONS}, got {action_interpolation}")
         self._scene = scene
-        self._render_all_steps = render_all_steps
         self._enable_left_2_cam = enable_left_2_cam
         self._rest_pose = rest_pose
-        self._record_every_n = 1
-        self._render_step_counter = 0
+        self._obs_cam_res = obs_cam_res
+        self._record_cam_res = record_cam_res
+        self._recorder = None
+        self._record_clock = None
+        self._adaptive_timestep = None
+        self._action_interpolation = action_interpolation
+        self._last_target = None  # Joint targets of the last action, start of the next interpolation
+        self.tracking_error = TrackingError()
         self._franka = scene.add_entity(
-            gs.morphs.MJCF(file=str(MUJOCO_FILE), pos=base_pos, quat=base_quat)
+            gs.morphs.MJCF(file=str(mjcf_file), pos=base_pos, quat=base_quat)
         )
         self._end_effector = self._franka.get_link(name=END_EFFECTOR_NAME)
         self._dofs_idx = [self._franka.get_joint(name).dof_idx_local for name in JOINT_NAMES]
+        self._obs_buffer = self._create_obs_buffer()
         self._create_cams()
 
+    def _create_obs_buffer(self) -> ObservationBuffer:
+        return ObservationBuffer(n_dofs=len(self._dofs_idx))
+
     def _create_cams(self):
-        def _pinhole_cam():
+        def _pinhole_cam(res):
             # pos/lookat will be reset after GS Scene build
-            return self._scene.add_camera(pos=[0, 0, 0], lookat=[0, 0, 0], res=CAM_RES, fov=CAM_FOV, GUI=False, near=0.005)
-        self._wrist_camera = _pinhole_cam()
-        self._ext_cam_1_left = _pinhole_cam()
+            # Same vertical FOV at any res (of same aspect ratio) keeps the same intrinsics, just scaled
+            return self._scene.add_camera(pos=[0, 0, 0], lookat=[0, 0, 0], res=res, fov=CAM_FOV, GUI=False, near=0.005)
+        self._wrist_camera = _pinhole_cam(self._obs_cam_res)
+        self._ext_cam_1_left = _pinhole_cam(self._obs_cam_res)
         if self._enable_left_2_cam:
-            self._ext_cam_2_left = _pinhole_cam()
+            # Only used for recording
+            self._ext_cam_2_left = _pinhole_cam(self._record_cam_res)
 
     def _set_control_params(self):
         self._franka.set_dofs_kv(VELOCITY_GAINS, self._dofs_idx)
@@ -65,21 +95,24 @@ class DroidManager:
 
     def goto_start_pos(self, setup_steps: int = SETUP_STABILITY_STEPS):
         # Teleport to starting position
-        print(f"LF_DEBUG self._rest_pose: {self._rest_pose}")
         self._franka.set_dofs_position(self._rest_pose, self._dofs_idx)
         # Solve for starting position
-        self._franka.control_dofs_position(self._rest_pose, self._dofs_idx)
+        self.hold_start_pos()
         # Wait for stabilization
         print(f"Running {setup_steps} steps to stabilize at home position.")
-
-        # Disable rendering while setup is happening
-        _render_all_steps = self._render_all_steps
-        self._render_all_steps = False
+        # Only renders if a recording is running and a frame is due, see src/utils/recording_clock.py
         self.steps(n=setup_steps)
-        self._render_all_steps = _render_all_steps
-
         print(f"Done waiting for stabilization.")
 
+    def hold_start_pos(self, envs_idx=None):
+        """
+        Set PD targets to the rest pose, without moving or stepping. Controller targets are not part of the sim
+        state, so this is re-applied after restoring a SceneSnapshot (see src/sims/snapshot.py).
+        envs_idx is only used by batched scenes (see droid_batched.py).
+        """
+        self._franka.control_dofs_position(self._rest_pose, self._dofs_idx)
+        self._last_target = None
+
     def setup(self):
         """
         After GS Scene has build, setup arm + cameras tp their desired state.
@@ -95,19 +128,55 @@ class DroidManager:
         # Solve for starting position
         self.goto_start_pos()
 
+    def set_ext_cam_offset(self, offset_T: np.ndarray = EXT_CAM_1_LEFT_OFFSET_T):
+        """
+        Move the observation exterior cam relative to the robot base, e.g. per-episode camera jitter (see
+        src/evaluation/randomization.py). Defaults to its standard DROID placement.
+        """
+        self._ext_cam_1_left.attach(rigid_link=self._franka.base_link, offset_T=offset_T)
+
+    def set_adaptive_timestep(self, adaptive_timestep):
+        """
+        After setup(..), run actions with coarse/fine physics steps (see src/sims/adaptive_timestep.py) instead of
+        a fixed steps_per_action.
+        """
+        if self._action_interpolation != "hold":
+            raise ValueError("Adaptive timesteps vary the steps per action, only action_interpolation='hold' is supported")
+        adaptive_timestep.setup(self._scene, self._franka, self._end_effector)
+        self._adaptive_timestep = adaptive_timestep
+
+    @property
+    def franka(self):
+        return self._franka
+
+    def get_dofs_position(self) -> np.ndarray:
+        """
+        All 9 DOF positions (7 arm joints + 2 gripper fingers) in radians, on host.
+        """
+        return self._franka.get_dofs_position(dofs_idx_local=self._dofs_idx).cpu().numpy()
+
     def get_scene_observation(self):
         """
-        Get DROID state, mainly joint pos and camera data
+        Get DROID state, mainly joint pos and camera data.
+        Joint positions are numpy views into a pinned host buffer (see src/robots/obs_buffer.py), valid until the
+        observation after the next one.
         """
         # Make sure wrist cam is on gripper, facing correctly
-        self._wrist_camera.move_to_attach()
+        with profiler.timer("obs/move_to_attach"):
+            self._wrist_camera.move_to_attach()
         # Get the current joint and gripper revolute angles in radians
         dofs_positions = self._franka.get_dofs_position(dofs_idx_local=self._dofs_idx)  # 9 joints, held in CUDA Tensor
+        # Single device->host copy, overlaps with rendering below
+        self._obs_buffer.start_dofs_copy(dofs_positions)
+        # Get cam images
+        with profiler.timer("obs/render_wrist"):
+            wrist_cam_img = self._wrist_camera.render()[0]  # 0th is the rgb_arr, numpy.ndarray, uint8, Shape: (obs_cam_res[1], obs_cam_res[0], 3)
+        with profiler.timer("obs/render_ext"):
+            ext_camera_img = self._ext_cam_1_left.render()[0]
+        with profiler.timer("obs/dofs_to_host"):
+            dofs_positions = self._obs_buffer.dofs()
         joint_positions = dofs_positions[:7]  # First 7 DOFs are the arm joints
         gripper_position = dofs_positions[7:]  # 8th and 9th DOF is the gripper joints
-        # Get cam images
-        wrist_cam_img = self._wrist_camera.render()[0]  # 0th is the rgb_arr, numpy.ndarray, uint8, Shape: (720, 1280, 3)
-        ext_camera_img = self._ext_cam_1_left.render()[0]
 
         return {
             "joint_positions": joint_positions,
@@ -116,54 +185,109 @@ class DroidManager:
             "ext_camera_img": ext_camera_img,
         }
 
+    def _recorded_cams(self) -> dict:
+        cams = {"wrist": self._wrist_camera, "scene": self._ext_cam_1_left}
+        if self._enable_left_2_cam:
+            cams["scene_2"] = self._ext_cam_2_left
+        return cams
+
+    def _record_frame(self, repeat: int = 1):
+        with profiler.timer("record/frame"):
+            # Make sure wrist cam is on gripper, facing correctly
+            self._wrist_camera.move_to_attach()
+            for name, cam in self._recorded_cams().items():
+                frame = cam.render()[0]
+                for _ in range(repeat):
+                    self._recorder.add_frame(name, frame)  # Blocks if the encoder is behind
+
     def steps(self, n: int = 1):
         """
         Helper, run through multiple sim steps
-        Skip computing cam location and graphics during movement to run sim faster.
-        """
-        for _ in range(n):
-            self._scene.step()
-            if self._render_all_steps:
-                self._render_step_counter += 1
-                if self._render_step_counter % self._record_every_n == 0:
-                    # self._wrist_camera.move_to_attach()
-                    # _ = self._wrist_camera.render()
-                    # _ = self._ext_cam_1_left.render()
-                    if self._enable_left_2_cam:
-                        self._ext_cam_2_left.render()
+        Skip computing cam location and graphics during movement to run sim faster, cams are only rendered while
+        recording, when the recording clock has a frame due.
+        """
+        recording = self._recorder is not None and self._recorder.recording
+        profiler.count("sim/steps", n)
+        with profiler.timer("sim/steps"):
+            for _ in range(n):
+                self._scene.step()
+                if recording:
+                    frames_due = self._record_clock.tick(self._scene.dt)
+                    if frames_due:
+                        self._record_frame(repeat=frames_due)
+
+    def _track(self, target: torch.Tensor):
+        self.tracking_error.add(target, self._franka.get_dofs_position(dofs_idx_local=self._dofs_idx))
 
     def apply_abs_joint_actions(self, actions: np.ndarray, steps_per_action: int):
-        # Absolute joint pos approach
-        for i, action in enumerate(actions):
-            arm_targets = action[:7]    # desired joint positions (radians)
-            gripper_cmd = action[7]     # this will be 0.0 or 1.0 from model output
-            # print(f"LF_DEBUG: model out, gripper_cmd: {gripper_cmd}")
-            # if gripper_cmd > 0.5:
-            if gripper_cmd > 0.2:
-                gripper_target = np.pi / 4  # ~45° in radians, closed
-            else:
-                gripper_target = 0.0       # open
-            franka_act = np.hstack([arm_targets, [gripper_target], [gripper_target]])
-            self._franka.control_dofs_position(franka_act, self._dofs_idx)
-            self.steps(steps_per_action)
-
-    def cams_start_recording(self, dt: float, target_fps: float = 60.0):
-        # Start recording and configure downsampling so that it renders approximately target_fps
-        self._record_every_n = int(round(1.0 / (target_fps * dt)))
-        self._render_step_counter = 0
-        # self._wrist_camera.start_recording()
-        # self._ext_cam_1_left.start_recording()
-        if self._enable_left_2_cam: self._ext_cam_2_left.start_recording()
-
-    def cams_end_recording(self, path: str):
-        time_stamp = datetime.now().strftime("%m-%d-%y_%H-%M")
-        # self._wrist_camera.stop_recording(
-        #     save_to_filename=f"{path}/wrist_{time_stamp}.mp4"
-        # )
-        # self._ext_cam_1_left.stop_recording(
-        #     save_to_filename=f"{path}/scene_{time_stamp}.mp4"
-        # )
-        if self._enable_left_2_cam:
-            self._ext_cam_2_left.stop_recording(
-                save_to_filename=f"{path}/scene_2_{time_stamp}.mp4"
-            )
+        """
+        Absolute joint pos approach: 7 arm joint targets (radians) plus a gripper command (0 open .. 1 closed) per
+        action, the gripper command is thresholded and applied to both fingers. The whole chunk is converted on
+        device at once, see src/robots/joint_actions.py. Tracking error is recorded at the end of every action.
+        actions: (n_actions, 8), or (N, n_actions, 8) for all envs of a BatchedDroidManager.
+        """
+        with profiler.timer("act/targets"):
+            targets = joint_targets(actions, gs.tc_float, gs.device)  # (n_actions, [N,] 9)
+        if len(targets) == 0:
+            return
+        if self._adaptive_timestep:
+            gripper_cmds = targets[:, 7].cpu().numpy()  # One host copy per chunk
+            for target, gripper_cmd in zip(targets, gripper_cmds):
+                # Picks coarse or fine steps for this action, steps_per_action is not used
+                self._adaptive_timestep.run_action(
+                    lambda: self._franka.control_dofs_position(target, self._dofs_idx), self.steps, float(gripper_cmd),
+                )
+                self._track(target)
+        elif self._action_interpolation == "hold":
+            for target in targets:
+                self._franka.control_dofs_position(target, self._dofs_idx)
+                self.steps(steps_per_action)
+                self._track(target)
+        else:
+            with profiler.timer("act/interpolate"):
+                prev_target = self._last_target
+                if prev_target is None:
+                    prev_target = self._franka.get_dofs_position(dofs_idx_local=self._dofs_idx)
+                step_targets = interpolate_joint_targets(
+                    prev_target, targets, steps_per_action, self._action_interpolation,
+                )
+            for i, step_target in enumerate(step_targets):
+                self._franka.control_dofs_position(step_target, self._dofs_idx)
+                self.steps()
+                if (i + 1) % steps_per_action == 0:
+                    self._track(step_target)
+        self._last_target = targets[-1]
+
+    def cams_start_recording(self, target_fps: float = 60.0, path: str = None, segment_name: str = None):
+        """
+        Start streaming all cams (wrist, ext cam 1 and, if enabled, ext cam 2) to `{path}/{cam}_{segment_name}.mp4`,
+        see src/utils/video_recorder.py. Frames are encoded as they are rendered, so memory doesn't grow with the
+        recording length. Call again (e.g. on every episode reset) to start a new segment.
+        Frames are rendered at exactly target_fps of sim time, whatever dt is, see src/utils/recording_clock.py.
+        path: defaults to temp_data/, segment_name: defaults to a timestamp.
+        """
+        if self._recorder is None or self._record_clock.fps != target_fps:
+            self.cams_end_recording()
+            self._recorder = StreamingVideoRecorder(fps=target_fps)
+            self._record_clock = RecordingClock(fps=target_fps)
+        self._record_clock.reset()
+        path = path or get_temp_data_abs_path(check_exists=False)
+        segment_name = segment_name or datetime.now().strftime("%m-%d-%y_%H-%M-%S")
+        self._recorder.start_segment(path, segment_name, list(self._recorded_cams()))
+
+    def cams_end_recording(self, close: bool = True) -> list:
+        """
+        Finish the current segment (blocks until all its frames are encoded), returns the written files.
+        close: also stop the encoder threads, keep them (close=False) when more segments follow.
+        """
+        if self._recorder is None:
+            return []
+        try:
+            files = self._recorder.end_segment()
+        finally:
+            if close:
+                self._recorder.close()
+                self._recorder = None
+        for file in files:
+            print(f"Saved recording: {file}")
+        return files
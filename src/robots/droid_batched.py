@@ -0,0 +1,125 @@
+import numpy as np
+import genesis as gs
+from genesis.utils import geom as gu
+
+from src.utils import profiler
+from src.robots.droid import DroidManager
+from src.robots.obs_buffer import ObservationBuffer
+from src.robots.droid_const import CAM_RES, MUJOCO_FILE, REST_POSE, SETUP_STABILITY_STEPS, WRIST_CAM_OFFSET_T, EXT_CAM_1_LEFT_OFFSET_T
+
+
+"""
+DROID setup in a batched Genesis scene (`scene.build(n_envs=N, env_spacing=...)`).
+
+All N envs share one scene build, joint state is read and joint targets are applied for all envs at once as
+(N, ...) tensors. Observations are returned stacked so a single (batched) inference request can serve all envs.
+
+Cameras: Genesis cameras attached to a link follow env 0 only, so instead a single set of cameras is re-posed
+on each env (link pose + env offset + mount offset) right before rendering it. Use an `env_spacing` large enough
+that the neighbouring apartments are not in view (ReplicaCAD apartments are ~10m across).
+"""
+
+class BatchedDroidManager(DroidManager):
+
+    def __init__(
+        self,
+        scene: gs.Scene,
+        n_envs: int,
+        base_pos: list,
+        base_quat: list,
+        rest_pose: list = REST_POSE,
+        obs_cam_res: tuple = CAM_RES,
+        mjcf_file: str = MUJOCO_FILE,
+        action_interpolation: str = "hold",
+    ):
+        self._n_envs = n_envs  # Needed by _create_obs_buffer(..) during super().__init__(..)
+        # Per-step camera rendering/recording is single env only
+        super().__init__(
+            scene, base_pos, base_quat, enable_left_2_cam=False, rest_pose=rest_pose,
+            obs_cam_res=obs_cam_res, mjcf_file=mjcf_file, action_interpolation=action_interpolation,
+        )
+
+    def _create_obs_buffer(self) -> ObservationBuffer:
+        return ObservationBuffer(n_dofs=len(self._dofs_idx), n_envs=self._n_envs)
+
+    @property
+    def n_envs(self) -> int:
+        return self._n_envs
+
+    def _envs_count(self, envs_idx) -> int:
+        return self._n_envs if envs_idx is None else len(envs_idx)
+
+    def _tile(self, values: list, envs_idx=None) -> np.ndarray:
+        return np.tile(np.asarray(values, dtype=np.float32), (self._envs_count(envs_idx), 1))
+
+    def setup(self):
+        """
+        After GS Scene has been built (with n_envs), setup arm to its desired state in all envs.
+        Cameras are posed per env when rendering, see _render_env_cams(..).
+        """
+        self._set_control_params()
+        self.goto_start_pos()
+
+    def goto_start_pos(self, setup_steps: int = SETUP_STABILITY_STEPS, envs_idx=None):
+        """
+        Teleport arm to rest pose in all envs (or only in envs_idx) and let it stabilize.
+        NOTE: physics steps for all envs at once, when resetting a subset the other envs hold their current joint
+        targets during the stabilization steps. Prefer restoring a SceneSnapshot (src/sims/snapshot.py) for resets,
+        which doesn't step at all.
+        """
+        self._franka.set_dofs_position(self._tile(self._rest_pose, envs_idx), self._dofs_idx, envs_idx=envs_idx)
+        self.hold_start_pos(envs_idx)
+        print(f"Running {setup_steps} steps to stabilize at home position ({self._envs_count(envs_idx)} envs).")
+        self.steps(n=setup_steps)
+        print(f"Done waiting for stabilization.")
+
+    def hold_start_pos(self, envs_idx=None):
+        self._franka.control_dofs_position(self._tile(self._rest_pose, envs_idx), self._dofs_idx, envs_idx=envs_idx)
+        self._last_target = None
+
+    def _render_env_cams(self, env_idx: int):
+        """
+        Pose cameras on env `env_idx` and render them. Returns (wrist_cam_img, ext_camera_img).
+        """
+        env_offset_T = gu.trans_to_T(np.asarray(self._scene.envs_offset[env_idx], dtype=np.float64))
+
+        ee_T = gu.trans_quat_to_T(
+            self._end_effector.get_pos(envs_idx=[env_idx])[0].cpu().numpy(),
+            self._end_effector.get_quat(envs_idx=[env_idx])[0].cpu().numpy(),
+        )
+        base_link = self._franka.base_link
+        base_T = gu.trans_quat_to_T(
+            base_link.get_pos(envs_idx=[env_idx])[0].cpu().numpy(),
+            base_link.get_quat(envs_idx=[env_idx])[0].cpu().numpy(),
+        )
+        self._wrist_camera.set_pose(transform=env_offset_T @ ee_T @ WRIST_CAM_OFFSET_T)
+        self._ext_cam_1_left.set_pose(transform=env_offset_T @ base_T @ EXT_CAM_1_LEFT_OFFSET_T)
+        return self._wrist_camera.render()[0], self._ext_cam_1_left.render()[0]
+
+    def get_scene_observation(self):
+        """
+        Get DROID state for all envs, stacked along the first dim:
+            joint_positions  (N, 7) numpy view into pinned host buffer
+            gripper_position (N, 2) numpy view into pinned host buffer
+            wrist_cam_img    (N, H, W, 3) uint8
+            ext_camera_img   (N, H, W, 3) uint8
+        """
+        dofs_positions = self._franka.get_dofs_position(dofs_idx_local=self._dofs_idx)  # (N, 9)
+        self._obs_buffer.start_dofs_copy(dofs_positions)
+        with profiler.timer("obs/render_envs"):
+            wrist_imgs, ext_imgs = zip(*(self._render_env_cams(i) for i in range(self._n_envs)))
+        with profiler.timer("obs/dofs_to_host"):
+            dofs_positions = self._obs_buffer.dofs()
+        return {
+            "joint_positions": dofs_positions[:, :7],
+            "gripper_position": dofs_positions[:, 7:],
+            "wrist_cam_img": np.stack(wrist_imgs),
+            "ext_camera_img": np.stack(ext_imgs),
+        }
+
+    @staticmethod
+    def env_observation(batched_observation: dict, env_idx: int) -> dict:
+        """
+        Slice a single env's observation out of get_scene_observation(..) output.
+        """
+        return {k: v[env_idx] for k, v in batched_observation.items()}
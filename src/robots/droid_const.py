@@ -1,6 +1,6 @@
 import numpy as np
-from genesis.utils import geom as gu
 
+from src.utils import geom as gu
 from src.utils.root import get_assets_abs_path
 
 
@@ -36,6 +36,14 @@ FORCE_RANGES_UPPER = [86., 86., 86., 86., 11.5, 11.5, 11.5, 100., 100.]
 CAM_RES = (1280, 720)  # Zed mini at 60 fps (this is for the wrist cam, using for scene cam as well for now)
 CAM_FOV = 57.  # Vertical FOV for Zed mini: 57 degrees
 
+# Resolutions to render observation cams at. Same aspect ratio and vertical FOV as CAM_RES (i.e. same intrinsics,
+# scaled), so rendering directly at a low res rasterizes far fewer pixels and skips downscaling before inference.
+OBS_CAM_RES = {
+    "full": CAM_RES,      # Zed mini res, downscaled to 224x224 on the client
+    "droid": (320, 180),  # DROID dataset images, e.g. exterior_image_1_left: (180, 320, 3)
+    "model": (224, 126),  # Pi0 input width, only zero-padded to 224x224 on the client
+}
+
 EXT_CAM_1_LEFT_OFFSET_T = gu.trans_quat_to_T(
     # https://github.com/arhanjain/sim-evals/blob/main/src/environments/droid_environment.py#L53
     trans=np.array([0.05, 0.57, 0.66]),
@@ -51,3 +59,10 @@ WRIST_CAM_OFFSET_T = gu.trans_quat_to_T(
     trans=np.array([0.03026469, 0.07047331, 0.02246456]),
     quat=np.array([-0.000662797508,  0.000376455792,  0.988124130,  0.153655398])  # (w,x,y,z)
 )
+
+# Pi0 gripper command (0 open .. 1 closed) above this closes both gripper fingers to GRIPPER_CLOSED (radians)
+GRIPPER_CMD_THRESHOLD = 0.2
+GRIPPER_CLOSED = np.pi / 4
+
+# Joint targets between two actions, see src/robots/joint_actions.py
+ACTION_INTERPOLATIONS = ("hold", "linear", "cubic")
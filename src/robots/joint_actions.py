@@ -0,0 +1,114 @@
+import numpy as np
+import torch
+
+from src.robots.droid_const import GRIPPER_CMD_THRESHOLD, GRIPPER_CLOSED, ACTION_INTERPOLATIONS
+
+
+"""
+Vectorized joint-action application, used by DroidManager.apply_abs_joint_actions(..).
+
+A whole action chunk (A, 8), or (N, A, 8) for N batched envs, goes to the device in one copy and all gripper targets
+are thresholded at once, giving (A, [N,] 9) joint targets (7 arm joints + both gripper fingers). Per action the PD
+targets are then either:
+    - hold:   set once, held for all steps_per_action physics steps (the DROID/Pi0 15 Hz action rate)
+    - linear: interpolated per physics step from the previous action's target to this one's
+    - cubic:  cubic Hermite (Catmull-Rom tangents) through the action targets, also smooth in joint velocity
+The per-step targets of the whole chunk are computed in one go on the device, the step loop only indexes into them.
+Gripper targets are never interpolated, they switch at the start of the action.
+
+TrackingError accumulates q_desired - q_actual at the end of every action period on the device (no host sync per
+action), read it out once per episode.
+"""
+
+
+def joint_targets(actions, dtype: torch.dtype, device) -> torch.Tensor:
+    """
+    (..., A, 8) Pi0 actions -> (A, ..., 9) joint targets on device, action axis first.
+    """
+    actions = torch.as_tensor(np.asarray(actions), dtype=dtype, device=device)
+    gripper = torch.where(actions[..., 7:8] > GRIPPER_CMD_THRESHOLD, GRIPPER_CLOSED, 0.0).to(dtype)
+    targets = torch.cat([actions[..., :7], gripper, gripper], dim=-1)
+    return targets.movedim(-2, 0)
+
+
+def interpolate_joint_targets(
+    prev_target: torch.Tensor, targets: torch.Tensor, steps_per_action: int, mode: str,
+) -> torch.Tensor:
+    """
+    Per physics step targets (A * steps_per_action, ..., 9) from the target before the chunk, (..., 9), and the
+    chunk's targets (A, ..., 9). The last step of every action is at that action's target.
+    """
+    if mode not in ACTION_INTERPOLATIONS or mode == "hold":
+        raise ValueError(f"Interpolation must be one of {ACTION_INTERPOLATIONS[1:]}, got '{mode}'")
+    points = torch.cat([prev_target[None], targets])  # (A + 1, ..., 9) waypoints
+    start, end = points[:-1], points[1:]
+    # (1, S, 1, ...) step fraction in (0, 1]
+    u = torch.arange(1, steps_per_action + 1, dtype=targets.dtype, device=targets.device) / steps_per_action
+    u = u.view(1, -1, *[1] * (targets.dim() - 1))
+    start, end = start[:, None], end[:, None]
+    if mode == "linear":
+        steps = start + u * (end - start)
+    else:
+        # Catmull-Rom tangents, one-sided at the ends of the chunk
+        tangents = torch.empty_like(points)
+        tangents[1:-1] = (points[2:] - points[:-2]) / 2
+        tangents[0] = points[1] - points[0]
+        tangents[-1] = points[-1] - points[-2]
+        m_start, m_end = tangents[:-1, None], tangents[1:, None]
+        u2, u3 = u * u, u * u * u
+        steps = (
+            (2 * u3 - 3 * u2 + 1) * start + (u3 - 2 * u2 + u) * m_start
+            + (-2 * u3 + 3 * u2) * end + (u3 - u2) * m_end
+        )
+    steps[..., 7:] = end[..., 7:]  # Gripper switches at the start of the action
+    return steps.flatten(0, 1)
+
+
+class TrackingError:
+    """
+    Running RMS and max of q_desired - q_actual per DOF (radians), over actions and envs.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._sq_sum = None
+        self._max = None
+        self._count = 0
+
+    def add(self, q_desired: torch.Tensor, q_actual: torch.Tensor):
+        """
+        q_desired, q_actual: (..., n_dofs) on device, stays there.
+        """
+        error = (q_desired - q_actual).reshape(-1, q_desired.shape[-1])
+        sq_sum, abs_max = (error * error).sum(dim=0), error.abs().amax(dim=0)
+        if self._sq_sum is None:
+            self._sq_sum, self._max = sq_sum, abs_max
+        else:
+            self._sq_sum += sq_sum
+            self._max = torch.maximum(self._max, abs_max)
+        self._count += error.shape[0]
+
+    def result(self) -> dict | None:
+        """
+        {"rms": (n_dofs,), "max": (n_dofs,), "samples": int} on host, None before the first action.
+        """
+        if not self._count:
+            return None
+        return {
+            "rms": torch.sqrt(self._sq_sum / self._count).cpu().numpy(),
+            "max": self._max.cpu().numpy(),
+            "samples": self._count,
+        }
+
+    def summary(self) -> str:
+        result = self.result()
+        if result is None:
+            return "Tracking error: no actions"
+        return (
+            f"Tracking error (q_desired - q_actual, {result['samples']} samples), arm joints [rad]:\n"
+            f"  rms {np.array2string(result['rms'][:7], precision=4)}\n"
+            f"  max {np.array2string(result['max'][:7], precision=4)}\n"
+            f"  gripper rms {result['rms'][7:].mean():.4f}, max {result['max'][7:].max():.4f}"
+        )
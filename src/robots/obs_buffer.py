@@ -0,0 +1,43 @@
+import numpy as np
+import torch
+
+
+class ObservationBuffer:
+    """
+    Preallocated (pinned) host buffers for the joint state part of an observation.
+
+    Genesis keeps joint state on the GPU, copying each joint tensor to host separately (`.cpu().numpy()`) means
+    several small device->host syncs and allocations per inference step. Instead, all DOFs are copied in a single
+    non-blocking transfer into a pinned buffer, the copy overlaps with camera rendering, and the caller gets numpy
+    views into the buffer (no copies).
+
+    Buffers rotate over `n_slots` so an observation handed to a background inference call (see
+    Pi0Inference.forward_async(..)) is not overwritten by the next observation while still in use.
+
+    Camera frames already come back from `render()` as host numpy arrays, those are passed through as-is.
+    """
+
+    def __init__(self, n_dofs: int, n_envs: int = 0, n_slots: int = 2):
+        shape = (n_envs, n_dofs) if n_envs > 0 else (n_dofs,)
+        self._pinned = torch.cuda.is_available()
+        self._dofs = [torch.empty(shape, dtype=torch.float32, pin_memory=self._pinned) for _ in range(n_slots)]
+        self._dofs_np = [buf.numpy() for buf in self._dofs]  # Share memory with the pinned tensors
+        self._copy_done = torch.cuda.Event() if self._pinned else None
+        self._slot = 0
+
+    def start_dofs_copy(self, dofs_positions: torch.Tensor):
+        """
+        Kick off the device->host copy of all DOFs into the next slot, does not block.
+        """
+        self._slot = (self._slot + 1) % len(self._dofs)
+        self._dofs[self._slot].copy_(dofs_positions, non_blocking=self._pinned)
+        if self._pinned:
+            self._copy_done.record()
+
+    def dofs(self) -> np.ndarray:
+        """
+        Wait for the copy started in start_dofs_copy(..) and return a view of the host buffer.
+        """
+        if self._pinned:
+            self._copy_done.synchronize()
+        return self._dofs_np[self._slot]
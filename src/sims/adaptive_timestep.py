@@ -0,0 +1,166 @@
+import numpy as np
+import genesis as gs
+
+from src.utils import profiler
+from src.environment.rigid_objs import get_free_entities, get_entity_pos, get_contacts
+
+
+"""
+Adaptive physics timestep: coarse steps while the arm moves through free space, fine steps only around contact.
+
+Fine steps (~2 ms) are only needed for stable gripper/object contact (see README, dt=0.002 vs the fast robot model),
+but most of an episode is free-space arm motion. Before every action this picks a mode:
+    - fine:   gripper links touching anything, gripper within `near_dist` of a free object, gripper command changing,
+              or within `hold_fine_actions` actions of the last reason to be fine (hysteresis)
+    - coarse: otherwise, `coarse_factor` times larger dt, same number of sim seconds
+After a coarse action the contacts are checked, if any penetrates more than `max_penetration` (something was hit
+faster than the coarse step could resolve) the mode switches to fine and, with `rollback`, the action is re-run in
+fine mode from the state before it.
+
+Both modes cover exactly one action period: fine_steps * dt_fine == coarse_steps * dt_coarse == 1 / action_hz, so
+the 15 Hz action rate stays exact (the default 33 steps at dt=0.002 is 0.066 s, not 1/15 s).
+
+The scene must be built with dt = dt_fine (see scene_dt(..)), the timestep is then switched at runtime by writing
+Genesis internals (_set_sim_dt(..)), only verified against Genesis v0.3.6 (see scripts/first_time_setup.md), setup(..)
+raises on any other version. What follows the new dt:
+    - rigid integration: the substep dt field (_rigid_global_info.substep_dt) is runtime data read by the step kernels
+    - sim/solver `dt` and `substep_dt` attributes, i.e. sim time and everything computed from them per step
+What doesn't: anything Genesis derived from dt at build time, e.g. the constraint solver time constants (sol_params),
+which are clamped to at least 2 * substep_dt of the build dt. Coarse steps keep the fine dt's clamp, so contacts are
+stiffer than in a scene built at dt_coarse, one more reason contact stays in fine mode.
+tests/test_adaptive_timestep.py checks that a free body falls the same after a dt switch as in a scene built with
+that dt.
+"""
+
+SUPPORTED_GENESIS_VERSION = "0.3.6"
+
+
+def _set_sim_dt(scene: gs.Scene, dt: float):
+    sim = scene.sim
+    substep_dt = dt / sim.substeps
+    sim._dt, sim._substep_dt = dt, substep_dt
+    for solver in sim.solvers:
+        solver._dt, solver._substep_dt = dt, substep_dt
+    sim.rigid_solver._rigid_global_info.substep_dt[None] = substep_dt
+
+
+class AdaptiveTimestep:
+
+    def __init__(
+        self,
+        action_hz: float = 15.0,
+        fine_steps: int = 35,
+        coarse_factor: int = 5,
+        near_dist: float = 0.15,
+        max_penetration: float = 0.005,
+        hold_fine_actions: int = 3,
+        rollback: bool = True,
+    ):
+        """
+        fine_steps: sim steps per action in fine mode, must be divisible by coarse_factor
+            (35 at 15 Hz: dt_fine=1.9 ms ~ the default dt=0.002, dt_coarse=9.5 ms ~ the fast robot model's dt=0.01)
+        near_dist: gripper to free object (center) distance below which steps are fine
+        max_penetration: contact penetration (m) after a coarse action that counts as unstable
+        """
+        if fine_steps % coarse_factor != 0:
+            raise ValueError(f"fine_steps ({fine_steps}) must be divisible by coarse_factor ({coarse_factor})")
+        self.fine_steps = fine_steps
+        self.coarse_steps = fine_steps // coarse_factor
+        self.dt_fine = self.scene_dt(action_hz, fine_steps)
+        self.dt_coarse = self.dt_fine * coarse_factor
+        self._near_dist = near_dist
+        self._max_penetration = max_penetration
+        self._hold_fine_actions = hold_fine_actions
+        self._rollback = rollback
+        self._scene = None
+        self._fine_for = 0  # Actions left to stay in fine mode
+        self._last_gripper_cmd = None
+        self.stats = {"fine": 0, "coarse": 0, "rollbacks": 0, "sim_steps": 0, "sim_time_s": 0.0}
+
+    @staticmethod
+    def scene_dt(action_hz: float = 15.0, fine_steps: int = 35) -> float:
+        """
+        dt to build the scene with (SimOptions(dt=..)), also the fine mode dt.
+        """
+        return 1.0 / (action_hz * fine_steps)
+
+    def setup(self, scene: gs.Scene, franka, end_effector):
+        """
+        After scene build. franka: the robot entity, end_effector: its gripper base link (all links below it are
+        gripper links).
+        """
+        if abs(scene.dt - self.dt_fine) > 1e-9:
+            raise ValueError(f"Scene dt {scene.dt} != fine dt {self.dt_fine}, build it with AdaptiveTimestep.scene_dt(..)")
+        if gs.__version__ != SUPPORTED_GENESIS_VERSION:
+            raise NotImplementedError(
+                f"Changing dt after scene build is only verified for Genesis {SUPPORTED_GENESIS_VERSION}, "
+                f"got {gs.__version__}"
+            )
+        if not hasattr(getattr(scene.sim.rigid_solver, "_rigid_global_info", None), "substep_dt"):
+            raise NotImplementedError(f"Genesis {gs.__version__} doesn't support changing dt after scene build")
+        self._scene = scene
+        self._end_effector = end_effector
+        self._gripper_links = np.arange(end_effector.idx, franka.link_end)
+        self._franka_links = np.arange(franka.link_start, franka.link_end)
+        self._objects = get_free_entities(scene, exclude=(franka,))
+
+    def _gripper_in_contact(self, contacts: dict) -> bool:
+        in_a = np.isin(contacts["link_a"], self._gripper_links) & ~np.isin(contacts["link_b"], self._franka_links)
+        in_b = np.isin(contacts["link_b"], self._gripper_links) & ~np.isin(contacts["link_a"], self._franka_links)
+        return bool(np.any(in_a | in_b))
+
+    def _gripper_near_object(self) -> bool:
+        if not self._objects:
+            return False
+        gripper_pos = self._end_effector.get_pos().cpu().numpy()
+        return any(np.linalg.norm(get_entity_pos(obj) - gripper_pos) < self._near_dist for obj in self._objects)
+
+    def _needs_fine(self, gripper_cmd: float) -> bool:
+        gripper_changed = self._last_gripper_cmd is not None and gripper_cmd != self._last_gripper_cmd
+        self._last_gripper_cmd = gripper_cmd
+        if gripper_changed or self._gripper_in_contact(get_contacts(self._scene)) or self._gripper_near_object():
+            self._fine_for = self._hold_fine_actions
+        if self._fine_for > 0:
+            self._fine_for -= 1
+            return True
+        return False
+
+    def run_action(self, apply_control, steps, gripper_cmd: float):
+        """
+        Run one action period: apply_control() sets the joint targets, steps(n) runs n sim steps.
+        """
+        if self._needs_fine(gripper_cmd):
+            self._run(apply_control, steps, fine=True)
+            return
+
+        state = self._scene.get_state() if self._rollback else None
+        self._run(apply_control, steps, fine=False)
+        max_penetration = float(np.max(get_contacts(self._scene)["penetration"], initial=0.0))
+        if max_penetration > self._max_penetration:
+            self._fine_for = self._hold_fine_actions
+            if self._rollback:
+                # Frames already recorded during the rejected coarse steps stay in the recording
+                self.stats["rollbacks"] += 1
+                self.stats["coarse"] -= 1  # Counted as the fine action it's re-run as
+                profiler.count("adaptive_dt/rollbacks")
+                self._scene.reset(state=state)
+                self.stats["sim_time_s"] -= self.coarse_steps * self.dt_coarse  # Sim steps of it still count as compute
+                self._run(apply_control, steps, fine=True)
+
+    def _run(self, apply_control, steps, fine: bool):
+        mode = "fine" if fine else "coarse"
+        self.stats[mode] += 1
+        profiler.count(f"adaptive_dt/{mode}_actions")
+        dt, n = (self.dt_fine, self.fine_steps) if fine else (self.dt_coarse, self.coarse_steps)
+        _set_sim_dt(self._scene, dt)
+        apply_control()
+        steps(n)
+        self.stats["sim_steps"] += n
+        self.stats["sim_time_s"] += n * dt
+
+    def summary(self) -> str:
+        n = max(1, self.stats["fine"] + self.stats["coarse"])
+        return (
+            f"Adaptive dt: {self.stats['coarse'] / n:.0%} of {n} actions coarse "
+            f"(dt {1000 * self.dt_coarse:.1f} ms vs {1000 * self.dt_fine:.1f} ms), {self.stats['rollbacks']} rollbacks"
+        )
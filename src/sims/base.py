@@ -12,6 +12,10 @@ class BaseSimSettings(ABC):
     skip_loading = {}
     keep_articulated = {}
     load_articulated = False,
+    use_scene_cache = True  # Reuse resolved scene plan, see src/environment/scene_cache.py
+    merge_static_visuals = False  # Bake stage + visual-only objects into one mesh, see src/environment/mesh_merge.py
+    merged_decimate_ratio = None
+    auto_collision_lod = False  # Collision only for objects in reach of the Franka, see src/environment/collision_lod.py
 
     @abstractmethod
     def setup_scene(self, scene: gs.Scene):
@@ -21,12 +25,19 @@ class BaseSimSettings(ABC):
         pass
 
     @abstractmethod
-    def scene_reset(self):
+    def scene_reset(self, envs_idx=None):
         """
-        Reset scene objects to starting position
+        Reset scene objects to starting position, in all parallel envs or only in envs_idx
         """
         pass
 
+    def task_success(self) -> bool | None:
+        """
+        Whether the scene's main task is done (e.g. bottle in bowl), checked by the evaluation runner
+        (src/evaluation/runner.py). None if the scene has no success predicate.
+        """
+        return None
+
     @abstractmethod
     def _add_objects(self, scene: gs.Scene):
         """
@@ -37,14 +48,22 @@ class BaseSimSettings(ABC):
 
 class ReplicadBase(BaseSimSettings):
 
+    _replicad_entities = {}  # ReplicaCAD entities by name, see add_replicad_scene(..)
+
     def setup_scene(self, scene: gs.Scene):
-        add_replicad_scene(
+        self._replicad_entities = add_replicad_scene(
             scene=scene,
             scene_config_file=self.scene_config_file,
             keep_as_rigid=self.keep_as_rigid,
             skip_loading=self.skip_loading,
             load_articulated=self.load_articulated,
             keep_articulated=self.keep_articulated,
+            use_cache=self.use_scene_cache,
+            merge_visuals=self.merge_static_visuals,
+            merged_decimate_ratio=self.merged_decimate_ratio,
+            auto_collision_lod=self.auto_collision_lod,
+            franka_pos=self.franka_pos,
+            franka_quat=self.franka_quat,
         )
 
         self._add_objects(scene)
@@ -0,0 +1,109 @@
+import importlib
+from pathlib import Path
+
+from src.sims.sim_config import SimConfig, DEFAULT_PRESET, load_sim_config
+from src.robots.droid_const import OBS_CAM_RES, ACTION_INTERPOLATIONS
+from src.utils.root import get_assets_abs_path, get_temp_data_abs_path
+
+
+"""
+Lazy scene registry: scene configs are registered by name (see list_scenes()/register_scene(..) in
+src/sims/sim_config.py) and the sim settings class of a config's `scene.builder` is only imported (with Genesis and
+the ReplicaCAD dataset) once a scene is actually selected. Importing this module, listing scenes and validating
+configs stay cheap, e.g. for config-validation jobs and before the model client has connected.
+"""
+
+# builder name -> "module:class", the class takes a SimConfig
+SCENE_BUILDERS = {
+    "replicad": "src.sims.replicad_plus_objs_scenes:ReplicadConfigScene",
+}
+
+
+def register_scene_builder(name: str, target: str):
+    SCENE_BUILDERS[name] = target
+
+
+def _builder_class(name: str):
+    if name not in SCENE_BUILDERS:
+        raise ValueError(f"Unknown scene builder: {name}. Available: {list(SCENE_BUILDERS.keys())}")
+    module, _, attr = SCENE_BUILDERS[name].partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def build_sim_settings(config: SimConfig):
+    return _builder_class(config.scene.builder)(config)
+
+
+def get_sim_settings(sim_name: str, preset: str = DEFAULT_PRESET, config_file: str = None, overrides: list[str] = ()):
+    return build_sim_settings(load_sim_config(sim_name, preset, config_file, overrides))
+
+
+def _asset_exists(file: str) -> bool:
+    return (Path(file) if Path(file).is_absolute() else get_assets_abs_path(file, check_exists=False)).exists()
+
+
+def validate_sim_config(config: SimConfig, check_files: bool = True) -> list[str]:
+    """
+    Problems that would only show up at scene build (or later), without importing Genesis. Empty if none.
+    check_files: also check that robot/object assets and the ReplicaCAD scene exist.
+    """
+    problems = []
+    if config.scene.builder not in SCENE_BUILDERS:
+        problems.append(f"unknown scene.builder '{config.scene.builder}'")
+    if config.sim.dt <= 0 or config.sim.steps_per_action < 1 or config.sim.substeps < 1:
+        problems.append("sim.dt must be > 0, sim.steps_per_action and sim.substeps >= 1")
+    for key in ("obs_res", "record_res"):
+        if getattr(config.cameras, key) not in OBS_CAM_RES:
+            problems.append(f"cameras.{key} '{getattr(config.cameras, key)}' not one of {list(OBS_CAM_RES.keys())}")
+    if config.robot.action_interpolation not in ACTION_INTERPOLATIONS:
+        problems.append(
+            f"robot.action_interpolation '{config.robot.action_interpolation}' not one of {list(ACTION_INTERPOLATIONS)}"
+        )
+
+    objects = {obj.name: obj for obj in config.objects}
+    for obj in config.objects:
+        if obj.type not in ("urdf", "mjcf", "mesh", "replicacad", "box"):
+            problems.append(f"objects.{obj.name}: unknown type '{obj.type}'")
+        elif obj.type == "box" and obj.size is None:
+            problems.append(f"objects.{obj.name}: box needs a size")
+        elif obj.type != "box" and not obj.file:
+            problems.append(f"objects.{obj.name}: no file")
+    task = config.task
+    if task.type == "inside_container":
+        for name in [*task.objects, task.container]:
+            if name not in objects:
+                problems.append(f"task: unknown object '{name}'")
+    elif task.type == "joint_open":
+        if task.entity not in config.scene.keep_articulated:
+            problems.append(f"task: entity '{task.entity}' not in scene.keep_articulated")
+    elif task.type is not None:
+        problems.append(f"task: unknown type '{task.type}'")
+
+    if check_files:
+        if not _asset_exists(config.robot.mjcf_file):
+            problems.append(f"robot.mjcf_file not found: {config.robot.mjcf_file}")
+        for obj in config.objects:
+            if obj.type in ("urdf", "mjcf", "mesh") and obj.file and not _asset_exists(obj.file):
+                problems.append(f"objects.{obj.name}: file not found: {obj.file}")
+        replicad_dir = get_temp_data_abs_path("haosulab-ReplicaCAD", check_exists=False)
+        scene_file = replicad_dir / "configs" / "scenes" / f"{config.scene.replicad}.scene_instance.json"
+        if not scene_file.exists():
+            problems.append(f"ReplicaCAD scene not found: {scene_file}")
+        for obj in config.objects:
+            if obj.type == "replicacad" and not (replicad_dir / "objects" / f"{obj.file}.glb").exists():
+                problems.append(f"objects.{obj.name}: ReplicaCAD object not found: {obj.file}")
+    return problems
+
+
+def check_sim_config(
+    sim_name: str, preset: str = DEFAULT_PRESET, config_file: str = None, overrides: list[str] = (),
+) -> SimConfig:
+    """
+    Raise on an invalid config before anything expensive (model client, Genesis init, scene build) has started.
+    Returns the config, build it with build_sim_settings(..).
+    """
+    config = load_sim_config(sim_name, preset, config_file, overrides)
+    problems = validate_sim_config(config)
+    if problems:
+        raise ValueError(f"Invalid sim config for {sim_name} ({preset}):\n  " + "\n  ".join(problems))
+    return config
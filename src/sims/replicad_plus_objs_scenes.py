@@ -1,218 +1,125 @@
-from doctest import debug
-from math import sqrt
+from pathlib import Path
 
 import numpy as np
 import genesis as gs
 
-from src.robots.droid_const import REST_POSE
-from src.sims.base import BaseSimSettings, ReplicadBase
-from src.environment.rigid_objs import add_replicacad_obj
+from src.robots.droid_const import REST_POSE, OBS_CAM_RES
+from src.sims.base import ReplicadBase
+from src.sims.sim_config import SimConfig, ObjectConfig
+from src.environment.rigid_objs import add_replicacad_obj, set_entity_pose, get_entity_pos, is_inside_container
+from src.environment.asset_cache import collision_mesh_morph
 from src.environment.scene import get_replicacad_scene_config
-from src.utils.root import get_assets_abs_path, get_temp_data_abs_path
+from src.utils.root import get_assets_abs_path
 
 
-def get_sim_settings(sim_name: str) -> BaseSimSettings:
-    available_scenes = {
-        "replicad_apt0_partnet_objs": ReplicadApt0PlusObjs,
-        "replicad_apt5_kitchen": ReplicadApt5Kitchen,
-        "replicad_apt4_google_scan_objs": ReplicadApt4_GoogleScanObjs,
-        "replicad_apt4_FAIR_DTC_objs": ReplicadApt4_FairDtcObjs,
-    }
-    if sim_name not in available_scenes:
-        raise ValueError(f"Unknown scene setup: {sim_name}. Available scenes: {list(available_scenes.keys())}")
-    return available_scenes[sim_name]()
+"""
+ReplicaCAD apartments plus objects, built from the declarative configs in configs/scenes/ (one file per sim run)
+layered on a solver preset in configs/presets/, see src/sims/sim_config.py. Selected by name through
+src/sims/registry.py (scene.builder = "replicad").
+"""
 
 
-class ReplicadApt0PlusObjs(ReplicadBase):
-    """
-    # NOTE: For fast sim set:
-        dt = 0.01
-        steps_per_action = 7
-    in src/sims/replicad_plus_objs_scenes.py and use
-    assets/panda_wt_robotiq_2f85-fast/panda_wt_2f85-fast.xml in src/robots/droid.py
-
-    Plus use this simpler scene setup!
-    # scene = gs.Scene(
-    #     show_viewer=False,
-    #     show_FPS=False,
-    #     sim_options=gs.options.SimOptions(dt=ss.dt, requires_grad=False),
-    #     renderer=gs.renderers.Rasterizer(),
-    # )
-
-    # Why dt = 0.01 and steps_per_action = 7:
-    Freq = 15Hz = 1/15 secs/action
-    DT = 0.01 secs/step
-    STEPS_PER_ACTION = Freq / DT = 6.6777 steps/actions = 7 steps/actions
-    """
+def _asset_path(file: str) -> str:
+    return file if Path(file).is_absolute() else str(get_assets_abs_path(file, check_exists=False))
 
-    """
-    # Sim info
-    Freq = 15Hz = 1/15 secs/action
-    DT = 0.002 secs/step
-    STEPS_PER_ACTION = Freq / DT = 33.33 steps/actions = 33 steps/actions
-    """
-    dt = 0.002
-    steps_per_action = 33
-    render_all_steps = False  # Whether to render cameras at all sim steps
-
-    # Scene info
-    scene_config_file = get_replicacad_scene_config("apt_0")
-    keep_as_rigid = {"frl_apartment_table_02"}
-    skip_loading = {"frl_apartment_lamp_02"}  # We're using the table that has lamps, so get the lamps out of the way
-    franka_pos = [0.7, -2.9, 0.9]
-    franka_quat = [np.cos(np.pi/8), 0., 0., np.sin(np.pi/8)]
-    rest_pose = REST_POSE
-    load_articulated = False
-
-    # Sim objects
-    _pn_bottle = None  # Object from PartNet dataset
-    _replica_bowl = None    # Object from ReplicaCAD dataset
-    def _add_objects(self, scene: gs.Scene):
-        self._pn_bottle = scene.add_entity(
-            material=gs.materials.Rigid(rho=300),
+
+def _add_object(scene: gs.Scene, obj: ObjectConfig):
+    material = gs.materials.Rigid(rho=obj.rho) if obj.rho is not None else gs.materials.Rigid()
+    if obj.type == "urdf":
+        return scene.add_entity(
+            material=material,
             morph=gs.morphs.URDF(
-                file=str(get_assets_abs_path("3763/mobility_vhacd_fixed.urdf")),
-                scale=0.09,
-                pos=[0.95, -2.55, 0.99],
-                quat=[1/sqrt(2), 0, 1/sqrt(2), 0],
+                file=_asset_path(obj.file), scale=obj.scale, pos=obj.pos, quat=obj.quat, fixed=obj.fixed,
             ),
         )
-        self._replica_bowl = add_replicacad_obj(scene, "frl_apartment_bowl_07", [0.6, -2.3,  1], [0.7071, 0.7071, 0, 0])
-
-    def scene_reset(self):
-        self._pn_bottle.set_pos([0.95, -2.55, 0.99])
-        self._pn_bottle.set_quat([1/sqrt(2), 0, 1/sqrt(2), 0])
-        self._replica_bowl.set_pos([0.6, -2.3,  1])
-        self._replica_bowl.set_quat([0.7071, 0.7071, 0, 0])
-
-
-class ReplicadApt4_GoogleScanObjs(ReplicadBase):
-    # dt = 0.01  # Run sim way faster!
-    # steps_per_action = 7
-    dt = 0.002
-    steps_per_action = 33
-    render_all_steps = False
-    load_articulated = False
-    scene_config_file = get_replicacad_scene_config("apt_4")
-    franka_pos = [2.75, -5.1, 0.4]
-    franka_quat = [0, 0, 0, 1]
-    rest_pose = [0, -0.4, 0, -1.8, 0, 1.4, 0, 0., 0.]
-    # keep_as_rigid = {"frl_apartment_table_03"}
-    keep_as_rigid = {}
-    skip_loading = {}
-    _table_plane = None
-    _g_chicken_racer_toy = None  # Google Scan Dataset object
-    _g_basket = None             # Google Scan Dataset object
-    _g_helicopter = None         # Google Scan Dataset object
-    _g_fire_truck = None         # Google Scan Dataset object
-
-    def _add_mjcf_obj(self, file, scene, pos, quat=[1, 0, 0, 0]):
+    if obj.type == "mjcf":
         return scene.add_entity(
             gs.morphs.MJCF(
-                file=file, pos=pos, quat=quat, visualization=True,
-                collision=True, convexify=False,
+                file=_asset_path(obj.file), pos=obj.pos, quat=obj.quat, scale=obj.scale,
+                visualization=obj.visualization, collision=obj.collision, convexify=False,
             ),
-            material=gs.materials.Rigid(),
+            material=material,
             surface=gs.surfaces.Default(vis_mode="visual"),
         )
-
-    def _add_objects(self, scene: gs.Scene):
-        # FIXME: figure out why this specific table "frl_apartment_table_03" has odd collision
-        # properties with partial obj passthrough
-        self._table_plane = scene.add_entity(
+    if obj.type == "mesh":
+        return scene.add_entity(
+            # see src/environment/asset_cache.py
+            collision_mesh_morph(_asset_path(obj.file), pos=obj.pos, quat=obj.quat, fixed=obj.fixed, scale=obj.scale),
+            surface=gs.surfaces.Default(vis_mode="visual"),
+        )
+    if obj.type == "replicacad":
+        return add_replicacad_obj(scene, obj.file, obj.pos, obj.quat, scale=obj.scale)
+    if obj.type == "box":
+        return scene.add_entity(
             morph=gs.morphs.Box(
-                pos=[2.27, -5.33, 0.363], size=[0.7, 1.2, 0.1],
-                fixed=True, collision=True, visualization=False,
+                pos=obj.pos, size=obj.size, fixed=obj.fixed, collision=obj.collision,
+                visualization=obj.visualization,
             ),
         )
-        self._g_chicken_racer_toy = self._add_mjcf_obj(
-            file="/workspace/RoboSandbox/assets/CHICKEN_RACER/model.xml", scene=scene, pos=[2.3, -5.4, 0.42],
-        )
-        self._g_basket = self._add_mjcf_obj(
-            file="/workspace/RoboSandbox/assets/Target_Basket_Medium/model.xml", scene=scene, pos=[2.3, -4.95, 0.52],
-        )
-        self._g_helicopter = self._add_mjcf_obj(
-            file="/workspace/RoboSandbox/assets/HELICOPTER/model.xml", scene=scene, pos=[2.375, -5.225, 0.41], quat=[0.7071, 0, 0, 0.7071],
-        )
-        self._g_fire_truck = self._add_mjcf_obj(
-            file="/workspace/RoboSandbox/assets/FIRE_TRUCK/model.xml", scene=scene, pos=[2.15, -5.2, 0.41],
-        )
+    raise ValueError(f"Unknown object type '{obj.type}' of {obj.name}")
 
-    def scene_reset(self):
-        self._g_chicken_racer_toy.set_pos([2.3, -5.25, 0.45])
-        self._g_chicken_racer_toy.set_quat([1, 0, 0, 0])
-        self._g_basket.set_pos([2.3, -4.95, 0.42])
-        self._g_basket.set_quat([1, 0, 0, 0])
-        self._g_helicopter.set_pos([2.375, -5.225, 0.41])
-        self._g_helicopter.set_quat([0.7071, 0, 0, 0.7071])
-        self._g_fire_truck.set_pos([2.15, -5.2, 0.41])
-        self._g_fire_truck.set_quat([1, 0, 0, 0])
-
-
-class ReplicadApt5Kitchen(ReplicadBase):
-    # dt = 0.01  # Run sim way faster!
-    # steps_per_action = 7
-    dt = 0.002
-    steps_per_action = 33
-    render_all_steps = False
-    franka_pos = [-1.3, -2.5, 0.9]
-    franka_quat = [0, 0, 0, -1]
-    rest_pose = REST_POSE
-    keep_articulated = {"fridge"}
-    load_articulated = True
-    scene_config_file = get_replicacad_scene_config("apt_5")
-    def _add_objects(self, scene: gs.Scene): pass
-    def scene_reset(self): pass
-
-
-class ReplicadApt4_FairDtcObjs(ReplicadBase):
-    # dt = 0.01  # Run sim way faster!
-    # steps_per_action = 7
+
+class ReplicadConfigScene(ReplicadBase):
     """
-    # Sim info
-    Freq = 15Hz = 1/15 secs/action
-    DT = 0.002 secs/step
-    STEPS_PER_ACTION = Freq / DT = 33.33 steps/actions = 33 steps/actions
+    Sim settings of a SimConfig: ReplicaCAD scene, robot pose, objects and task success predicate.
     """
-    dt = 0.002
-    steps_per_action = 33
-    render_all_steps = False
-    load_articulated = False
-    scene_config_file = get_replicacad_scene_config("apt_4")
-    franka_pos = [2.85, -2.1, 0.6]
-    franka_quat = [0, 0, 0, 1]
-    rest_pose = [0, -0.8, 0, -2, 0, 1.7, 0, 0.0, 0.0]
-    keep_as_rigid = {"frl_apartment_table_04", "frl_apartment_table_03", "frl_apartment_table_02", "frl_apartment_table_01"}
-    skip_loading = {}
-
-    _dtc_orange_juice = None  # FAIR Digital Twin Catalogue asset
-    _dtc_coffee_mug = None    # FAIR DTC asset
-
-    def _add_glb_obj(self, file, scene, pos, quat=[1, 0, 0, 0]):
-        return scene.add_entity(
-            gs.morphs.Mesh(
-                file=file, pos=pos, quat=quat, visualization=True, collision=True,
-                fixed=False, convexify=False, decimate=True, decompose_nonconvex=False,
-            ),
-            surface=gs.surfaces.Default(vis_mode="visual"),
-        )
 
-    def _add_objects(self, scene: gs.Scene):
-        self._dtc_orange_juice = self._add_glb_obj(
-            file="/workspace/RoboSandbox/assets/Carton_Toy_0E9D95Af_OrangeJuice_1/DTC_1_1_Carton_Toy_0E9D95Af_OrangeJuice_1_3d-asset.glb",
-            scene=scene,
-            pos=[2.2, -1.9, 0.762],
-            quat=[0.5, 0.5, -0.5, -0.5],
-        )
-        self._dtc_coffee_mug = self._add_glb_obj(
-            file="/workspace/RoboSandbox/assets/Kitchen_Mug_79E00D2C_CoffeeMug/DTC_1_1_Kitchen_Mug_79E00D2C_CoffeeMug_3d-asset.glb",
-            scene=scene,
-            pos=[2.25, -2.2, 0.762],
-            quat=[0.5, 0.5, -0.5, -0.5],
-        )
+    def __init__(self, config: SimConfig):
+        self.config = config
+        scene = config.scene
+        self.scene_config_file = get_replicacad_scene_config(scene.replicad)
+        self.keep_as_rigid = set(scene.keep_as_rigid)
+        self.skip_loading = set(scene.skip_loading)
+        self.load_articulated = scene.load_articulated
+        self.keep_articulated = set(scene.keep_articulated)
+        self.use_scene_cache = scene.use_scene_cache
+        self.merge_static_visuals = scene.merge_static_visuals
+        self.merged_decimate_ratio = scene.merged_decimate_ratio
+        self.auto_collision_lod = scene.auto_collision_lod
+
+        self.franka_pos = config.robot.pos
+        self.franka_quat = config.robot.quat
+        self.rest_pose = config.robot.rest_pose or REST_POSE
+        self.mjcf_file = _asset_path(config.robot.mjcf_file)
+        self.action_interpolation = config.robot.action_interpolation
+        self.obs_cam_res = OBS_CAM_RES[config.cameras.obs_res]
+        self.record_cam_res = OBS_CAM_RES[config.cameras.record_res]
+        self.objects = {}  # Object entities by name, see configs/scenes/
+
+    # Backed by the config, so changes (e.g. adaptive dt, recording) are part of SimConfig.to_dict()
+    @property
+    def dt(self) -> float:
+        return self.config.sim.dt
+
+    @dt.setter
+    def dt(self, value: float):
+        self.config.sim.dt = value
+
+    @property
+    def steps_per_action(self) -> int:
+        return self.config.sim.steps_per_action
+
+    @steps_per_action.setter
+    def steps_per_action(self, value: int):
+        self.config.sim.steps_per_action = value
 
-    def scene_reset(self):
-        self._dtc_orange_juice.set_pos([2.2, -1.9, 0.762])
-        self._dtc_orange_juice.set_quat([0.5, 0.5, -0.5, -0.5])
-        self._dtc_coffee_mug.set_pos([2.25, -2.2, 0.762])
-        self._dtc_coffee_mug.set_quat([0.5, 0.5, -0.5, -0.5])
+    def _add_objects(self, scene: gs.Scene):
+        self.objects = {obj.name: _add_object(scene, obj) for obj in self.config.objects}
+
+    def scene_reset(self, envs_idx=None):
+        for obj in self.config.objects:
+            if not obj.fixed:
+                set_entity_pose(self.objects[obj.name], obj.reset_pos or obj.pos, obj.reset_quat or obj.quat, envs_idx)
+
+    def task_success(self) -> bool | None:
+        task = self.config.task
+        if task.type == "inside_container":
+            container_pos = get_entity_pos(self.objects[task.container])
+            return all(
+                is_inside_container(get_entity_pos(self.objects[name]), container_pos, task.radius, task.height)
+                for name in task.objects
+            )
+        if task.type == "joint_open":
+            angles = self._replicad_entities[task.entity].get_dofs_position().cpu().numpy()
+            return bool(np.abs(angles).max() > task.angle)
+        return None
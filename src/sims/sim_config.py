@@ -0,0 +1,253 @@
+import tomllib
+from pathlib import Path
+from dataclasses import dataclass, field, fields, asdict
+
+from src.utils.root import get_configs_abs_path
+
+
+"""
+Declarative sim settings, no Genesis needed to load them.
+
+A sim run's config is layered, later layers win:
+    1. preset       configs/presets/<preset>.toml: time step, solver, robot model, cameras ("accurate", "fast", ...)
+    2. scene        configs/scenes/<sim_run>.toml: ReplicaCAD apartment, robot pose, objects, task; can also override
+                    any preset table (e.g. a scene that needs more solver iterations)
+    3. config file  --config <file>.toml/.yaml with any of the above tables, e.g. for a speed/accuracy sweep
+    4. overrides    --set sim.dt=0.01 --set solver.iterations=100 --set objects.pn_bottle.pos=[0.9,-2.5,1.0]
+                    (values are parsed as TOML, anything that doesn't parse is taken as a string)
+Objects are merged by name, so a later layer only needs to give the fields it changes.
+Scenes are registered by name: every file in configs/scenes/, plus any added with register_scene(..).
+src/sims/registry.py builds sim settings from the result, see get_sim_settings(..).
+"""
+
+DEFAULT_PRESET = "accurate"
+CONFIG_SUFFIXES = (".toml", ".yaml", ".yml")
+
+_registered_scenes = {}  # Scene configs outside configs/scenes/, name -> file
+
+
+@dataclass
+class SimSection:
+    dt: float = 0.002
+    steps_per_action: int = 33
+    substeps: int = 20
+
+
+@dataclass
+class SolverSection:
+    """
+    gs.options.RigidOptions, unset fields keep the Genesis defaults.
+    """
+    integrator: str | None = None  # gs.integrator.<name>
+    constraint_solver: str | None = None  # gs.constraint_solver.<name>
+    iterations: int | None = None
+    ls_iterations: int | None = None
+    tolerance: float | None = None
+    contact_resolve_time: float | None = None
+
+    def rigid_options(self) -> dict:
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+
+@dataclass
+class RobotSection:
+    mjcf_file: str = "panda_wt_robotiq_2f85/panda_wt_2f85.xml"  # Relative to assets/, or absolute
+    pos: list = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    quat: list = field(default_factory=lambda: [1.0, 0.0, 0.0, 0.0])
+    rest_pose: list | None = None  # None: REST_POSE of src/robots/droid_const.py
+    action_interpolation: str = "hold"  # Joint targets between actions: "hold", "linear" or "cubic"
+
+
+@dataclass
+class CameraSection:
+    obs_res: str = "full"  # Observation cams (wrist, ext cam 1), OBS_CAM_RES key
+    record_res: str = "full"  # Recording-only cam (ext cam 2)
+
+
+@dataclass
+class SceneSection:
+    builder: str = "replicad"  # Sim settings class, see SCENE_BUILDERS in src/sims/registry.py
+    replicad: str = "apt_0"  # ReplicaCAD scene instance
+    keep_as_rigid: list = field(default_factory=list)
+    skip_loading: list = field(default_factory=list)
+    load_articulated: bool = False
+    keep_articulated: list = field(default_factory=list)
+    use_scene_cache: bool = True  # Reuse resolved scene plan, see src/environment/scene_cache.py
+    merge_static_visuals: bool = False  # Bake stage + visual-only objects into one mesh, see src/environment/mesh_merge.py
+    merged_decimate_ratio: float | None = None
+    auto_collision_lod: bool = False  # Collision only for objects in reach of the Franka, see src/environment/collision_lod.py
+
+
+@dataclass
+class ObjectConfig:
+    name: str
+    type: str  # "urdf", "mjcf", "mesh" (GLB/OBJ), "replicacad" (object by name) or "box"
+    file: str | None = None  # Relative to assets/ or absolute, ReplicaCAD object name for "replicacad"
+    pos: list = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    quat: list = field(default_factory=lambda: [1.0, 0.0, 0.0, 0.0])
+    reset_pos: list | None = None  # Pose on scene_reset(..), default pos/quat
+    reset_quat: list | None = None
+    scale: float = 1.0
+    rho: float | None = None  # Density, default of the material otherwise
+    size: list | None = None  # "box" only
+    fixed: bool = False
+    collision: bool = True
+    visualization: bool = True
+
+
+@dataclass
+class TaskConfig:
+    prompt: str = ""  # Example prompt
+    type: str | None = None  # Success predicate: "inside_container", "joint_open" or None
+    # inside_container: all `objects` within `radius`/`height` of `container`
+    objects: list = field(default_factory=list)
+    container: str | None = None
+    radius: float = 0.1
+    height: float = 0.15
+    # joint_open: any joint of ReplicaCAD entity `entity` opened past `angle` (rad)
+    entity: str | None = None
+    angle: float = 0.5
+
+
+_SECTIONS = {
+    "sim": SimSection, "solver": SolverSection, "robot": RobotSection, "cameras": CameraSection, "scene": SceneSection,
+}
+
+
+@dataclass
+class SimConfig:
+    name: str
+    preset: str
+    sim: SimSection = field(default_factory=SimSection)
+    solver: SolverSection = field(default_factory=SolverSection)
+    robot: RobotSection = field(default_factory=RobotSection)
+    cameras: CameraSection = field(default_factory=CameraSection)
+    scene: SceneSection = field(default_factory=SceneSection)
+    objects: list[ObjectConfig] = field(default_factory=list)
+    task: TaskConfig = field(default_factory=TaskConfig)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimConfig":
+        data = dict(data)
+        unknown = set(data) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown config table(s): {sorted(unknown)}")
+        config = {name: _build(section, data.get(name, {}), name) for name, section in _SECTIONS.items()}
+        names = [obj.get("name") for obj in data.get("objects", [])]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Object names must be unique: {names}")
+        return cls(
+            name=data.get("name", ""),
+            preset=data.get("preset", ""),
+            objects=[_build(ObjectConfig, obj, f"objects.{obj.get('name')}") for obj in data.get("objects", [])],
+            task=_build(TaskConfig, data.get("task", {}), "task"),
+            **config,
+        )
+
+
+def _build(cls, data: dict, where: str):
+    valid = {f.name for f in fields(cls)}
+    unknown = set(data) - valid
+    if unknown:
+        raise ValueError(f"Unknown setting(s) {sorted(unknown)} in [{where}], valid: {sorted(valid)}")
+    try:
+        return cls(**data)
+    except TypeError as e:
+        raise ValueError(f"Invalid [{where}]: {e}") from e
+
+
+def _load_file(path: Path) -> dict:
+    if path.suffix == ".toml":
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    if path.suffix in (".yaml", ".yml"):
+        import yaml  # Optional, TOML configs need nothing beyond the standard library
+        with open(path, "r") as f:
+            return yaml.safe_load(f) or {}
+    raise ValueError(f"Unsupported config file {path}, expected one of {CONFIG_SUFFIXES}")
+
+
+def _find_config(kind: str, name: str) -> Path:
+    if kind == "scenes" and name in _registered_scenes:
+        return _registered_scenes[name]
+    for suffix in CONFIG_SUFFIXES:
+        path = get_configs_abs_path(f"{kind}/{name}{suffix}", check_exists=False)
+        if path.exists():
+            return path
+    available = list_scenes() if kind == "scenes" else list_presets()
+    raise ValueError(f"Unknown {kind[:-1]}: {name}. Available: {available}")
+
+
+def _list_configs(kind: str) -> list[str]:
+    return sorted(p.stem for p in get_configs_abs_path(kind).iterdir() if p.suffix in CONFIG_SUFFIXES)
+
+
+def register_scene(name: str, config_file: str | Path):
+    """
+    Make a scene config outside configs/scenes/ available as sim run `name`. Only the path is stored, the file is
+    read when the scene is selected.
+    """
+    _registered_scenes[name] = Path(config_file)
+
+
+def list_scenes() -> list[str]:
+    return sorted({*_list_configs("scenes"), *_registered_scenes})
+
+
+def list_presets() -> list[str]:
+    return _list_configs("presets")
+
+
+def merge_config(base: dict, update: dict) -> dict:
+    """
+    Recursive merge of config dicts, `objects` are merged by name.
+    """
+    merged = dict(base)
+    for key, value in update.items():
+        if key == "objects":
+            objects = {obj["name"]: obj for obj in merged.get("objects", [])}
+            for obj in value:
+                objects[obj["name"]] = merge_config(objects.get(obj["name"], {}), obj)
+            merged["objects"] = list(objects.values())
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def parse_override(override: str) -> dict:
+    """
+    "solver.iterations=100" -> {"solver": {"iterations": 100}}, "objects.<name>.<field>=.." updates that object.
+    """
+    key, sep, value = override.partition("=")
+    keys = key.strip().split(".")
+    if not sep or not all(keys):
+        raise ValueError(f"Invalid override '{override}', expected <table>.<key>=<value>")
+    try:
+        value = tomllib.loads(f"value = {value.strip()}")["value"]
+    except tomllib.TOMLDecodeError:
+        value = value.strip()
+    if keys[0] == "objects":
+        if len(keys) != 3:
+            raise ValueError(f"Invalid override '{override}', expected objects.<name>.<field>=<value>")
+        return {"objects": [{"name": keys[1], keys[2]: value}]}
+    for k in reversed(keys):
+        value = {k: value}
+    return value
+
+
+def load_sim_config(
+    sim_run: str, preset: str = DEFAULT_PRESET, config_file: str | Path = None, overrides: list[str] = (),
+) -> SimConfig:
+    preset = preset or DEFAULT_PRESET
+    data = merge_config(_load_file(_find_config("presets", preset)), _load_file(_find_config("scenes", sim_run)))
+    if config_file:
+        data = merge_config(data, _load_file(Path(config_file)))
+    for override in overrides or ():
+        data = merge_config(data, parse_override(override))
+    data.update(name=sim_run, preset=preset)
+    return SimConfig.from_dict(data)
@@ -0,0 +1,26 @@
+import genesis as gs
+
+from src.sims.replicad_plus_objs_scenes import ReplicadConfigScene
+
+
+def create_sim_scene(ss: ReplicadConfigScene, show_viewer: bool = False) -> gs.Scene:
+    """
+    Genesis scene with the time step and solver settings of the sim settings' config (preset, see
+    src/sims/sim_config.py), e.g. stable gripper physics at dt=0.002 with the "accurate" preset.
+    """
+    rigid_options = ss.config.solver.rigid_options()
+    if "integrator" in rigid_options:
+        rigid_options["integrator"] = getattr(gs.integrator, rigid_options["integrator"])
+    if "constraint_solver" in rigid_options:
+        rigid_options["constraint_solver"] = getattr(gs.constraint_solver, rigid_options["constraint_solver"])
+    return gs.Scene(
+        show_viewer=show_viewer,
+        show_FPS=False,
+        rigid_options=gs.options.RigidOptions(**rigid_options),
+        sim_options=gs.options.SimOptions(
+            dt=ss.dt,
+            substeps=ss.config.sim.substeps,
+            requires_grad=False,
+        ),
+        renderer=gs.renderers.Rasterizer()
+    )
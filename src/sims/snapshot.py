@@ -0,0 +1,33 @@
+import genesis as gs
+
+
+class SceneSnapshot:
+    """
+    Snapshot of the full sim state (all entities' qpos/qvel, in all envs) to restore episodes from in a single call.
+
+    Capture it once the scene has settled after setup (arm at rest pose, objects resting), every later reset is
+    then a restore instead of `scene.reset()` + per-object `scene_reset()` + `goto_start_pos()` stabilization steps.
+
+    Controller targets (e.g. PD position targets) are not part of the Genesis sim state, so callables that re-apply
+    them are passed to capture(..) and run after every restore, with the envs_idx being restored.
+    """
+
+    def __init__(self, scene: gs.Scene):
+        self._scene = scene
+        self._state = None
+        self._restore_hooks = []
+
+    @property
+    def captured(self) -> bool:
+        return self._state is not None
+
+    def capture(self, *restore_hooks):
+        self._state = self._scene.get_state()
+        self._restore_hooks = list(restore_hooks)
+
+    def restore(self, envs_idx=None):
+        if not self.captured:
+            raise RuntimeError("No scene snapshot captured yet, call capture(..) after setup")
+        self._scene.reset(state=self._state, envs_idx=envs_idx)
+        for hook in self._restore_hooks:
+            hook(envs_idx)
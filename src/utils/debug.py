@@ -2,8 +2,6 @@ import sys
 import inspect
 from collections import ChainMap
 
-import torch
-import IPython
 import numpy as np
 
 
@@ -59,6 +57,7 @@ def enter_interactive(exit_at_end=False, stack_depth=1):
             print("Not injecting caller's local vars...")
 
     print("=" * 42)
+    import IPython  # Only when actually debugging
     IPython.embed(user_ns=interactive_namespace)
     if exit_at_end:
         sys.exit()
@@ -77,6 +76,7 @@ def inspect_structure(obj):
         print("Not iterable")
         return
 
+    torch = sys.modules.get("torch")  # A torch tensor means torch is already imported, no need to import it here
     if isinstance(obj, np.ndarray):
         print(f"dtype: {obj.dtype}")
         print(f"shape: {obj.shape}")
@@ -14,14 +14,50 @@ def habitat_to_genesis_transform(translation, rotation_quat):
     # Quaternion (w, x, y, z) apply Rx90:
     qx90 = np.array([sqrt(2)/2, sqrt(2)/2, 0, 0])  # 90° about X
     q = np.array(rotation_quat, dtype=float)         # Habitat quaternion (w, x, y, z)
-    # Quaternion multiply: new_q = qx90 * q  (apply X-90 first, then original rotation)
-    w1,x1,y1,z1 = qx90
-    w2,x2,y2,z2 = q
-    new_quat = np.array([
+    # new_q = qx90 * q  (apply X-90 first, then original rotation)
+    new_quat = quat_multiply(qx90, q)
+    new_quat /= np.linalg.norm(new_quat)
+    return tuple(new_pos), tuple(new_quat)
+
+
+def trans_quat_to_T(trans, quat) -> np.ndarray:
+    """
+    4x4 homogeneous transform of a translation and a (w, x, y, z) quaternion, same as genesis.utils.geom's
+    trans_quat_to_T(..) without importing Genesis.
+    """
+    trans = np.asarray(trans, dtype=float)
+    w, x, y, z = np.asarray(quat, dtype=float)
+    s = 2.0 / (w*w + x*x + y*y + z*z)  # Also right for slightly non-unit quaternions
+    T = np.eye(4)
+    T[:3, :3] = [
+        [1 - s*(y*y + z*z), s*(x*y - w*z), s*(x*z + w*y)],
+        [s*(x*y + w*z), 1 - s*(x*x + z*z), s*(y*z - w*x)],
+        [s*(x*z - w*y), s*(y*z + w*x), 1 - s*(x*x + y*y)],
+    ]
+    T[:3, 3] = trans
+    return T
+
+
+def quat_multiply(q1, q2) -> np.ndarray:
+    """
+    Hamilton product q1 * q2 of (w, x, y, z) quaternions, i.e. rotate by q2, then by q1.
+    """
+    w1, x1, y1, z1 = q1
+    w2, x2, y2, z2 = q2
+    return np.array([
         w1*w2 - x1*x2 - y1*y2 - z1*z2,
         w1*x2 + x1*w2 + y1*z2 - z1*y2,
         w1*y2 - x1*z2 + y1*w2 + z1*x2,
         w1*z2 + x1*y2 - y1*x2 + z1*w2
     ], dtype=float)
-    new_quat /= np.linalg.norm(new_quat)
-    return tuple(new_pos), tuple(new_quat)
+
+
+def rotvec_to_quat(rotvec) -> np.ndarray:
+    """
+    (w, x, y, z) quaternion of a rotation vector (axis * angle in radians).
+    """
+    rotvec = np.asarray(rotvec, dtype=float)
+    angle = np.linalg.norm(rotvec)
+    if angle < 1e-12:
+        return np.array([1.0, 0.0, 0.0, 0.0])
+    return np.concatenate([[np.cos(angle / 2)], np.sin(angle / 2) * rotvec / angle])
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import nullcontext
+from collections import deque, defaultdict
+
+import numpy as np
+
+
+"""
+Lightweight, always-available hot-path profiling.
+
+    from src.utils import profiler
+    with profiler.timer("obs/render_wrist"):
+        ...
+    profiler.count("sim_steps", n)
+
+Disabled (the default) timer(..) returns a shared no-op context manager and count(..) returns right away, so the
+instrumentation can stay in the hot path. Enable with `profiler.enable()` (run scripts: `--profile`, or env var
+ROBOSANDBOX_PROFILE=1), then:
+    - rolling histograms: the last `window` durations per timer, for percentiles (summary_table(..))
+    - per-episode summary: totals since the last episode_summary(..) call, i.e. how a loop iteration splits up
+    - Chrome trace (optional, `trace_file`): open in chrome://tracing or https://ui.perfetto.dev
+
+Timers measure host wall time. Genesis runs physics/rendering synchronously from the caller's point of view, so
+sim/render phases are accounted for correctly, torch ops are timed when their result is waited on.
+"""
+
+
+class _Timer:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.record(self._name, self._start, time.perf_counter_ns() - self._start)
+        return False
+
+
+_NULL_TIMER = nullcontext()
+
+
+class Profiler:
+
+    def __init__(self, window: int = 1000, max_trace_events: int = 1_000_000):
+        """
+        window: durations kept per timer for the rolling histograms
+        max_trace_events: Chrome trace events kept in memory, later events are dropped
+        """
+        self.enabled = False
+        self._window = window
+        self._max_trace_events = max_trace_events
+        self._trace_file = None
+        self._lock = threading.Lock()  # Timers also run on background threads (e.g. Pi0Inference.forward_async)
+        self._rolling = defaultdict(lambda: deque(maxlen=self._window))  # name -> durations (ms)
+        self._episode = defaultdict(lambda: [0, 0.0])  # name -> [calls, total ms]
+        self._counters = defaultdict(int)
+        self._trace = []
+        self._t0 = time.perf_counter_ns()
+        self._episode_start = time.perf_counter()
+
+    def enable(self, trace_file: str | Path = None):
+        self.enabled = True
+        self._episode_start = time.perf_counter()
+        self._trace_file = Path(trace_file) if trace_file else None
+
+    def disable(self):
+        self.enabled = False
+
+    def timer(self, name: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] += n
+
+    def record(self, name: str, start_ns: int, duration_ns: int):
+        duration_ms = duration_ns / 1e6
+        with self._lock:
+            self._rolling[name].append(duration_ms)
+            stats = self._episode[name]
+            stats[0] += 1
+            stats[1] += duration_ms
+            if self._trace_file is not None and len(self._trace) < self._max_trace_events:
+                self._trace.append({
+                    "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                    "ts": (start_ns - self._t0) / 1e3, "dur": duration_ns / 1e3,  # us
+                })
+
+    def summary_table(self) -> str:
+        """
+        Rolling histogram percentiles of every timer.
+        """
+        with self._lock:
+            rolling = {name: np.array(durations) for name, durations in self._rolling.items() if durations}
+        lines = [f"{'timer':<28} {'n':>6} {'mean ms':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"]
+        for name, d in sorted(rolling.items()):
+            p50, p90, p99 = np.percentile(d, [50, 90, 99])
+            lines.append(f"{name:<28} {len(d):>6} {d.mean():>9.2f} {p50:>8.2f} {p90:>8.2f} {p99:>8.2f} {d.max():>8.2f}")
+        return "\n".join(lines)
+
+    def episode_summary(self, title: str = "Episode") -> str:
+        """
+        Per-timer totals and share of the wall time since the last call, plus counters; resets both.
+        Timers nest (e.g. "sim/steps" includes "record/frame"), so shares don't add up to 100%.
+        """
+        with self._lock:
+            episode, self._episode = dict(self._episode), defaultdict(lambda: [0, 0.0])
+            counters, self._counters = dict(self._counters), defaultdict(int)
+            wall_ms = 1000 * (time.perf_counter() - self._episode_start)
+            self._episode_start = time.perf_counter()
+        lines = [
+            f"{title} profile ({wall_ms / 1e3:.1f}s wall):",
+            f"  {'timer':<28} {'calls':>7} {'total s':>9} {'share':>6} {'ms/call':>9}",
+        ]
+        for name, (calls, total) in sorted(episode.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {name:<28} {calls:>7} {total / 1e3:>9.2f} {total / wall_ms:>6.1%} {total / calls:>9.2f}")
+        for name, value in sorted(counters.items()):
+            lines.append(f"  {name:<28} {value:>7}")
+        return "\n".join(lines)
+
+    def write_trace(self):
+        """
+        Write the Chrome trace (if enabled with a trace_file), safe to call repeatedly, rewrites the whole file.
+        """
+        if self._trace_file is None:
+            return
+        with self._lock:
+            events = list(self._trace)
+        self._trace_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._trace_file, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"Chrome trace written to {self._trace_file}")
+
+
+_profiler = Profiler()
+if os.environ.get("ROBOSANDBOX_PROFILE", "0") == "1":
+    _profiler.enable(os.environ.get("ROBOSANDBOX_PROFILE_TRACE"))
+
+
+def get_profiler() -> Profiler:
+    return _profiler
+
+
+def enable(trace_file: str | Path = None):
+    _profiler.enable(trace_file)
+
+
+def timer(name: str):
+    return _profiler.timer(name)
+
+
+def count(name: str, n: int = 1):
+    _profiler.count(name, n)
+
+
+def print_episode_report(title: str = "Episode"):
+    """
+    Print the per-episode summary and the rolling histograms, and flush the Chrome trace. No-op when disabled.
+    """
+    if not _profiler.enabled:
+        return
+    print(_profiler.episode_summary(title))
+    print(_profiler.summary_table())
+    _profiler.write_trace()
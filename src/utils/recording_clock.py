@@ -0,0 +1,43 @@
+"""
+Recording clock: decides when a video frame is due from simulated time, not from step counts.
+
+Frame k of a recording is due once the sim time since the recording started reaches k / fps. The clock is advanced
+by every sim step (whatever issued it: `goto_start_pos`, `apply_abs_joint_actions`, ...) and is not affected by
+scene resets, so a recording plays back at real sim speed at exactly `fps`, and steps with no frame due skip
+rendering entirely (at dt=0.002 and 30 fps, 1 step in ~17 renders).
+"""
+
+
+class RecordingClock:
+
+    def __init__(self, fps: float):
+        self._fps = fps
+        self.reset()
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def sim_time(self) -> float:
+        return self._sim_time
+
+    def reset(self):
+        """
+        Restart at sim time 0, the first step after a reset produces the first frame.
+        """
+        self._sim_time = 0.0
+        self._frames = 0
+
+    def tick(self, dt: float) -> int:
+        """
+        Advance by one sim step of dt, returns the number of frames due (0 most steps; more than 1 only if a single
+        step is longer than a frame interval, in which case the same render should be written that many times).
+        """
+        self._sim_time += dt
+        # Frame time from the frame index, not accumulated, so rounding never drifts the frame rate
+        due = 0
+        while self._frames / self._fps <= self._sim_time + 1e-9:
+            self._frames += 1
+            due += 1
+        return due
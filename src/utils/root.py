@@ -27,6 +27,9 @@ def get_assets_abs_path(subpath: str = None, check_exists: bool = True) -> Path:
 def get_temp_data_abs_path(subpath: str = None, check_exists: bool = True) -> Path:
     return _get_abs_path("temp_data", subpath, check_exists=check_exists)
 
+def get_configs_abs_path(subpath: str = None, check_exists: bool = True) -> Path:
+    return _get_abs_path("configs", subpath, check_exists=check_exists)
+
 
 if __name__ == '__main__':
     print(f"get_root_abs_path(): {get_root_abs_path()}")
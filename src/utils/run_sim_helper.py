@@ -1,15 +1,142 @@
 import argparse
 
+from src.robots.droid_const import OBS_CAM_RES
+from src.sims.sim_config import DEFAULT_PRESET
+
 
 def sim_arg_parser():
     """Lightweight argument parser for sim runs"""
     parser = argparse.ArgumentParser(description="Run sim with specified settings")
-    parser.add_argument("--sim_run", required=True, help="Sim setting, see src/sims/replicad_plus_objs_scenes.py")
+    parser.add_argument("--sim_run", required=True, help="Sim setting, see configs/scenes/")
     parser.add_argument("--prompt", default="", help="VLA prompt")
+    parser.add_argument(
+        "--prefetch_at", type=int, default=None,
+        help="Pipelined inference: request next action chunk after this many actions of the current chunk. "
+             "Unset runs the serial observe -> infer -> act loop.",
+    )
+    parser.add_argument(
+        "--blend_steps", type=int, default=2,
+        help="Pipelined inference: number of overlapping actions to blend when switching chunks",
+    )
+    add_chunking_args(parser)
+    add_sim_config_args(parser)
+    parser.add_argument(
+        "--obs_res", default=None, choices=list(OBS_CAM_RES.keys()),
+        help="Observation cam render res, see OBS_CAM_RES in src/robots/droid_const.py (cameras.obs_res)",
+    )
+    parser.add_argument(
+        "--merge_static_visuals", action="store_true",
+        help="Bake the ReplicaCAD stage + visual-only furniture into a single mesh entity",
+    )
+    parser.add_argument(
+        "--auto_collision_lod", action="store_true",
+        help="Enable collision only for ReplicaCAD objects in reach of the Franka (box/hull/mesh proxies)",
+    )
+    parser.add_argument("--n_envs", type=int, default=1, help="Number of parallel envs (batched roll-outs only)")
+    parser.add_argument(
+        "--adaptive_dt", action="store_true",
+        help="Coarse physics steps in free space, fine steps near contact, see src/sims/adaptive_timestep.py",
+    )
+    parser.add_argument("--profile", action="store_true", help="Per-phase timing, see src/utils/profiler.py")
+    parser.add_argument("--trace", default=None, help="With --profile, also write a Chrome trace to this file")
+    add_policy_client_args(parser)
     args = parser.parse_args()
+    if args.prefetch_at is not None and chunking_kwargs(args) is not None:
+        parser.error("--prefetch_at (pipelined) and --chunked/--replan_every (chunked) roll-outs are exclusive")
+    # Shorthands for config overrides, explicit --set values win
+    overrides = [f"cameras.obs_res={args.obs_res}"] if args.obs_res else []
+    overrides += ["scene.merge_static_visuals=true"] if args.merge_static_visuals else []
+    overrides += ["scene.auto_collision_lod=true"] if args.auto_collision_lod else []
     return {
         "sim_run": args.sim_run,
         "task_prompt": args.prompt,
+        "prefetch_at": args.prefetch_at,
+        "blend_steps": args.blend_steps,
+        "chunking": chunking_kwargs(args),
+        "n_envs": args.n_envs,
+        "sim_config": sim_config_kwargs(args, overrides),
+        "adaptive_dt": args.adaptive_dt,
+        "profile": args.profile,
+        "trace": args.trace,
+        "policy_client": policy_client_kwargs(args),
+    }
+
+
+def add_chunking_args(parser: argparse.ArgumentParser):
+    """
+    Action-chunk caching and temporal ensembling, see src/inference/chunked_rollout.py.
+    """
+    parser.add_argument(
+        "--chunked", action="store_true",
+        help="Chunked roll-out: execute whole action chunks, 20%% fewer inference calls than the serial loop "
+             "(8 actions per chunk)",
+    )
+    parser.add_argument(
+        "--replan_every", type=int, default=None,
+        help="Chunked roll-out (implies --chunked): query the policy every this many actions, keeping the rest of "
+             "each chunk cached. Defaults to the chunk length.",
+    )
+    parser.add_argument(
+        "--ensemble_decay", type=float, default=None,
+        help="Chunked roll-out: temporal ensembling of overlapping chunks, weight exp(-decay * i), i=0 oldest chunk",
+    )
+    parser.add_argument(
+        "--replan_tolerance", type=float, default=None,
+        help="Chunked roll-out: re-plan less often while new chunks agree with the cached plan (radians)",
+    )
+
+
+def chunking_kwargs(args: argparse.Namespace) -> dict | None:
+    """
+    ChunkedRollout(..) kwargs of the args added by add_chunking_args(..), None without --chunked/--replan_every.
+    """
+    if not args.chunked and args.replan_every is None:
+        return None
+    return {
+        "replan_every": args.replan_every, "ensemble_decay": args.ensemble_decay,
+        "replan_tolerance": args.replan_tolerance,
+    }
+
+
+def add_sim_config_args(parser: argparse.ArgumentParser):
+    """
+    Sim config layers on top of the scene config, see src/sims/sim_config.py.
+    """
+    parser.add_argument("--preset", default=DEFAULT_PRESET, help="Sim preset, see configs/presets/")
+    parser.add_argument("--config", default=None, help="TOML/YAML file overriding preset and scene settings")
+    parser.add_argument(
+        "--set", dest="overrides", action="append", default=[], metavar="TABLE.KEY=VALUE",
+        help="Override a single setting, e.g. --set sim.dt=0.01 --set solver.iterations=100",
+    )
+
+
+def sim_config_kwargs(args: argparse.Namespace, overrides: list[str] = ()) -> dict:
+    """
+    get_sim_settings(..) kwargs of the args added by add_sim_config_args(..).
+    """
+    return {"preset": args.preset, "config_file": args.config, "overrides": [*overrides, *args.overrides]}
+
+
+def add_policy_client_args(parser: argparse.ArgumentParser):
+    """
+    Policy server connections, see src/inference/client_pool.py.
+    """
+    parser.add_argument(
+        "--endpoints", nargs="+", default=None, metavar="HOST:PORT",
+        help="Policy servers (replicas of the same model) to load balance over, default localhost:8000",
+    )
+    parser.add_argument("--connections_per_endpoint", type=int, default=1, help="Concurrent requests per server")
+    parser.add_argument("--infer_timeout_s", type=float, default=None, help="Deadline per inference request")
+    parser.add_argument("--infer_retries", type=int, default=2, help="Retries of a failed request on another server")
+
+
+def policy_client_kwargs(args: argparse.Namespace) -> dict:
+    """
+    Pi0Inference(..) kwargs of the args added by add_policy_client_args(..).
+    """
+    return {
+        "endpoints": args.endpoints, "connections_per_endpoint": args.connections_per_endpoint,
+        "timeout_s": args.infer_timeout_s, "max_retries": args.infer_retries,
     }
 
 
@@ -0,0 +1,76 @@
+import time
+import threading
+from concurrent.futures import Future
+
+
+"""
+Overlapped startup: connecting to the policy server plus a warm-up inference (the server compiles/JITs the model on
+its first request) runs on a background thread, while Genesis is imported/initialized and the scene is built and
+compiled on the calling thread (Genesis stays on the main thread). Both phases take seconds, serially they add up.
+
+    startup = Startup()
+    pi0, sim = startup.run(connect_policy=Pi0Inference, build_sim=build_sim, warmup=lambda pi0: pi0.warmup(..))
+    ...
+    apply the first action
+    startup.first_action()  # Prints the startup timings once, incl. time-to-first-action
+"""
+
+
+class Startup:
+
+    def __init__(self):
+        self._start = time.perf_counter()  # Time-to-first-action counts from here
+        self.timings = {}  # Seconds: policy_connect_s, policy_warmup_s, sim_build_s, startup_s, time_to_first_action_s
+
+    def _timed(self, name: str, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.timings[name] = time.perf_counter() - start
+        return result
+
+    def _start_policy(self, connect_policy, warmup, future: Future):
+        try:
+            policy = self._timed("policy_connect_s", connect_policy)
+            if warmup is not None:
+                self._timed("policy_warmup_s", warmup, policy)
+            future.set_result(policy)
+        except BaseException as e:
+            future.set_exception(e)
+
+    def run(self, connect_policy, build_sim, warmup=None):
+        """
+        connect_policy(): returns the connected policy client, blocks until the server is up
+        build_sim(): builds the sim, on the calling thread, its return value is returned
+        warmup(policy): optional first (dummy) inference
+        Returns (policy, build_sim() result). Raises what either phase raised, the sim's error first.
+        """
+        policy_future = Future()
+        # Daemon thread: a client still retrying to connect (server down) mustn't keep the process alive at exit once
+        # the sim build failed, ThreadPoolExecutor threads are joined at interpreter exit
+        threading.Thread(
+            target=self._start_policy, args=(connect_policy, warmup, policy_future), name="policy_startup", daemon=True,
+        ).start()
+        sim = self._timed("sim_build_s", build_sim)
+        policy = policy_future.result()
+        self.timings["startup_s"] = time.perf_counter() - self._start
+        return policy, sim
+
+    def first_action(self):
+        """
+        Call after the first action was applied, reports the startup timings (only the first call does anything).
+        """
+        if "time_to_first_action_s" in self.timings:
+            return
+        self.timings["time_to_first_action_s"] = time.perf_counter() - self._start
+        print(self.summary())
+
+    def summary(self) -> str:
+        t = self.timings
+        serial = t.get("policy_connect_s", 0.0) + t.get("policy_warmup_s", 0.0) + t.get("sim_build_s", 0.0)
+        summary = (
+            f"Startup: policy connect {t.get('policy_connect_s', 0.0):.1f}s + warm-up {t.get('policy_warmup_s', 0.0):.1f}s"
+            f" | sim build {t.get('sim_build_s', 0.0):.1f}s -> {t.get('startup_s', 0.0):.1f}s (serial {serial:.1f}s)"
+        )
+        if "time_to_first_action_s" in t:
+            summary += f", time-to-first-action {t['time_to_first_action_s']:.1f}s"
+        return summary
@@ -0,0 +1,184 @@
+import queue
+import shutil
+import threading
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+
+"""
+Streaming video recording.
+
+Genesis camera recording keeps every frame in memory until `stop_recording(..)`, so long recordings grow CPU memory
+without bound. Here each stream (one per camera) has a background thread that pipes frames to an ffmpeg encoder
+subprocess as they are rendered. Frames go through a bounded queue: if the encoder falls behind, `add_frame(..)`
+blocks (backpressure) instead of buffering, so memory stays flat regardless of episode length.
+
+Recordings are split into segments (e.g. one per episode): `start_segment(..)`/`end_segment()` open/close one file
+per stream, while the writer threads live for the whole run.
+"""
+
+_END_SEGMENT = object()
+_STOP = object()
+
+
+def get_ffmpeg_exe() -> str:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is not None:
+        return ffmpeg
+    import imageio_ffmpeg  # Ships a static ffmpeg binary, installed with Genesis' video dependencies
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+class _VideoStream:
+    """
+    One camera: bounded frame queue + writer thread feeding an ffmpeg subprocess (one per segment).
+    """
+
+    def __init__(self, name: str, fps: float, max_queued_frames: int, crf: int):
+        self.name = name
+        self._fps = fps
+        self._crf = crf
+        self._queue = queue.Queue(maxsize=max_queued_frames)
+        self._encoder = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"video_{name}", daemon=True)
+        self._thread.start()
+
+    def _open_encoder(self, file: Path, height: int, width: int) -> subprocess.Popen:
+        return subprocess.Popen(
+            [
+                get_ffmpeg_exe(), "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", f"{self._fps}", "-i", "-",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", f"{self._crf}", "-pix_fmt", "yuv420p",
+                # yuv420p needs even dims
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                str(file),
+            ],
+            stdin=subprocess.PIPE,
+        )
+
+    def _close_encoder(self):
+        if self._encoder is None:
+            return
+        self._encoder.stdin.close()
+        self._encoder.wait()
+        self._encoder = None
+
+    def _kill_encoder(self):
+        if self._encoder is None:
+            return
+        self._encoder.kill()  # Don't leave a (possibly blocked) ffmpeg process or a zombie behind
+        self._encoder.wait()
+        self._encoder = None
+
+    def _run(self):
+        file = None
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    self._close_encoder()
+                    return
+                if item is _END_SEGMENT:
+                    self._close_encoder()
+                elif isinstance(item, Path):
+                    self._close_encoder()
+                    file = item  # Encoder opened lazily, on first frame, when the frame size is known
+                elif self._error is None:
+                    if self._encoder is None:
+                        self._encoder = self._open_encoder(file, *item.shape[:2])
+                    self._encoder.stdin.write(item.tobytes())
+            except Exception as e:  # Keep draining the queue so producers never block on a dead stream
+                self._error = e
+                self._kill_encoder()
+            finally:
+                self._queue.task_done()
+
+    def put(self, item):
+        if self._error is not None:
+            raise RuntimeError(f"Video stream {self.name} failed") from self._error
+        self._queue.put(item)  # Blocks when the encoder is behind
+
+    def start(self, file: Path):
+        # Only called between segments, the writer thread is idle: a failed segment doesn't fail the next ones
+        self._error = None
+        self._queue.put(file)
+
+    def end(self):
+        self._queue.put(_END_SEGMENT)  # Even if the stream failed, so its encoder is closed/killed
+
+    def flush(self) -> Exception | None:
+        """
+        Wait for the queued frames, returns (and clears) the error of the current segment if any.
+        """
+        self._queue.join()
+        error, self._error = self._error, None
+        return error
+
+    def stop(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+
+class StreamingVideoRecorder:
+
+    def __init__(self, fps: float, max_queued_frames: int = 32, crf: int = 23):
+        """
+        fps: playback rate of the written videos, should match the rate frames are added at (in sim time)
+        max_queued_frames: per stream, frames waiting for the encoder before add_frame(..) blocks
+        """
+        self._fps = fps
+        self._max_queued_frames = max_queued_frames
+        self._crf = crf
+        self._streams = {}  # name -> _VideoStream
+        self._segment_files = []
+
+    @property
+    def recording(self) -> bool:
+        return bool(self._segment_files)
+
+    def start_segment(self, path: str | Path, segment_name: str, stream_names: list[str]):
+        """
+        Start writing `{path}/{stream_name}_{segment_name}.mp4` for every stream, ends the current segment if any.
+        """
+        self.end_segment()
+        Path(path).mkdir(parents=True, exist_ok=True)
+        for name in stream_names:
+            if name not in self._streams:
+                self._streams[name] = _VideoStream(name, self._fps, self._max_queued_frames, self._crf)
+            file = Path(path) / f"{name}_{segment_name}.mp4"
+            self._streams[name].start(file)
+            self._segment_files.append(file)
+
+    def add_frame(self, stream_name: str, frame: np.ndarray):
+        """
+        frame: uint8 RGB, (H, W, 3). Copied, renderers may reuse their output buffer.
+        """
+        self._streams[stream_name].put(np.ascontiguousarray(frame).copy())
+
+    def end_segment(self) -> list[Path]:
+        """
+        Finish the current segment, blocks until every queued frame is encoded. Returns the written files.
+        Every stream is closed before raising, the error names all the streams that failed during the segment.
+        """
+        if not self._segment_files:
+            return []
+        for stream in self._streams.values():
+            stream.end()
+        errors = {name: stream.flush() for name, stream in self._streams.items()}
+        errors = {name: error for name, error in errors.items() if error is not None}
+        files, self._segment_files = self._segment_files, []
+        if errors:
+            failed = ", ".join(f"{name} ({error!r})" for name, error in errors.items())
+            raise RuntimeError(f"Video streams failed: {failed}") from next(iter(errors.values()))
+        return files
+
+    def close(self):
+        try:
+            self.end_segment()
+        finally:
+            for stream in self._streams.values():
+                stream.stop()
+            self._streams = {}
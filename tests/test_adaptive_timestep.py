@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+gs = pytest.importorskip("genesis")
+
+from src.sims.adaptive_timestep import AdaptiveTimestep, SUPPORTED_GENESIS_VERSION, _set_sim_dt
+
+
+"""
+Runtime dt switching (AdaptiveTimestep) against scenes built with the target dt, needs Genesis (CPU backend):
+    python -m pytest tests/test_adaptive_timestep.py
+"""
+
+pytestmark = pytest.mark.skipif(
+    gs.__version__ != SUPPORTED_GENESIS_VERSION, reason=f"dt switching is pinned to Genesis {SUPPORTED_GENESIS_VERSION}",
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def genesis_cpu():
+    gs.init(backend=gs.cpu, logging_level="warning")
+    yield
+    gs.destroy()
+
+
+def fall_distance(build_dt: float, run_dt: float, n_steps: int) -> float:
+    """
+    How far a free sphere falls in n_steps of run_dt, in a scene built with build_dt.
+    """
+    scene = gs.Scene(sim_options=gs.options.SimOptions(dt=build_dt), show_viewer=False)
+    ball = scene.add_entity(gs.morphs.Sphere(pos=(0.0, 0.0, 1.0), radius=0.05))
+    scene.build()
+    if run_dt != build_dt:
+        _set_sim_dt(scene, run_dt)
+    z0 = float(ball.get_pos().cpu().numpy()[2])
+    for _ in range(n_steps):
+        scene.step()
+    return z0 - float(ball.get_pos().cpu().numpy()[2])
+
+
+def test_free_fall_after_switch_matches_scene_built_with_dt():
+    adaptive = AdaptiveTimestep()
+    n = adaptive.coarse_steps
+    switched = fall_distance(build_dt=adaptive.dt_fine, run_dt=adaptive.dt_coarse, n_steps=n)
+    built = fall_distance(build_dt=adaptive.dt_coarse, run_dt=adaptive.dt_coarse, n_steps=n)
+    np.testing.assert_allclose(switched, built, rtol=1e-5)
+    # One action period of free fall, ~ g t^2 / 2 at t = 1/15 s (the integrator's error is O(dt))
+    assert switched == pytest.approx(0.5 * 9.81 * (n * adaptive.dt_coarse) ** 2, rel=0.2)
+
+
+def test_switch_back_to_fine_dt():
+    adaptive = AdaptiveTimestep()
+    switched = fall_distance(build_dt=adaptive.dt_coarse, run_dt=adaptive.dt_fine, n_steps=adaptive.fine_steps)
+    built = fall_distance(build_dt=adaptive.dt_fine, run_dt=adaptive.dt_fine, n_steps=adaptive.fine_steps)
+    np.testing.assert_allclose(switched, built, rtol=1e-5)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from src.inference.chunked_rollout import ChunkedRollout, ensemble_action_chunks
+
+
+"""
+ensemble_action_chunks and ChunkedRollout with a fake robot and policy, no sim or model server needed:
+    python -m pytest tests/test_chunked_rollout.py
+"""
+
+
+class FakeDroid:
+    """
+    Counts executed actions, the observation is the index of the next action.
+    """
+
+    def __init__(self):
+        self.executed = []
+
+    def get_scene_observation(self) -> dict:
+        return {"t": len(self.executed)}
+
+    def apply_abs_joint_actions(self, actions, steps_per_action: int):
+        self.executed.extend(np.asarray(actions))
+
+
+class FakePi0:
+    """
+    Returns (chunk_len, 8) chunks, the arm joint targets of action i are `value(t + i, call index)` for an
+    observation at action t, the gripper command is the call index.
+    """
+
+    def __init__(self, value, chunk_len: int = 10):
+        self.value = value
+        self.chunk_len = chunk_len
+        self.requests = []  # Observed action index of every call
+
+    def forward(self, droid_observation: dict, prompt: str, actions: int | None = None) -> np.ndarray:
+        t = droid_observation["t"]
+        chunk = np.full((self.chunk_len, 8), float(len(self.requests)))
+        chunk[:, :7] = [[self.value(t + i, len(self.requests))] for i in range(self.chunk_len)]
+        self.requests.append(t)
+        return chunk
+
+
+def chunk(value: float, length: int = 4) -> np.ndarray:
+    return np.full((length, 8), value)
+
+
+def test_ensemble_without_decay_takes_newest_chunk():
+    chunks = [(0, chunk(1.0)), (2, chunk(2.0))]
+    np.testing.assert_array_equal(ensemble_action_chunks(chunks, t=2, n=2, decay=None), chunk(2.0, 2))
+
+
+def test_ensemble_weights_by_chunk_age():
+    chunks = [(0, chunk(0.0)), (2, chunk(1.0))]
+    decay = 0.5
+    out = ensemble_action_chunks(chunks, t=2, n=4, decay=decay)
+    # Steps 2, 3 covered by both chunks, weights 1 (oldest) and exp(-decay), steps 4, 5 by the newest only
+    both = np.exp(-decay) / (1 + np.exp(-decay))
+    np.testing.assert_allclose(out[:, 0], [both, both, 1.0, 1.0])
+    np.testing.assert_array_equal(out[:, 7], 1.0)  # Gripper from the newest chunk
+
+
+def test_ensemble_zero_decay_is_the_mean():
+    chunks = [(0, chunk(0.0, 6)), (1, chunk(3.0, 6)), (2, chunk(6.0, 6))]
+    out = ensemble_action_chunks(chunks, t=2, n=2, decay=0.0)
+    np.testing.assert_allclose(out[:, :7], 3.0)
+
+
+def test_default_executes_whole_chunks():
+    pi0 = FakePi0(value=lambda t, call: t)
+    droid = FakeDroid()
+    rollout = ChunkedRollout(droid, pi0, steps_per_action=1)
+    assert [rollout.step(prompt="") for _ in range(3)] == [10, 10, 10]
+    assert pi0.requests == [0, 10, 20]
+    np.testing.assert_allclose(np.array(droid.executed)[:, 0], np.arange(30))
+
+
+def test_replan_every_keeps_actions_time_aligned():
+    pi0 = FakePi0(value=lambda t, call: t)
+    droid = FakeDroid()
+    rollout = ChunkedRollout(droid, pi0, steps_per_action=1, replan_every=4, ensemble_decay=0.1)
+    assert [rollout.step(prompt="") for _ in range(4)] == [4, 4, 4, 4]
+    # Every chunk predicts the action index itself, so ensembling can't hide a misaligned chunk
+    np.testing.assert_allclose(np.array(droid.executed)[:, :7], np.arange(16)[:, None] * np.ones(7))
+
+
+def test_adaptive_interval_grows_while_chunks_agree():
+    pi0 = FakePi0(value=lambda t, call: 0.0)  # Static scene, every chunk agrees with the cached plan
+    droid = FakeDroid()
+    rollout = ChunkedRollout(droid, pi0, steps_per_action=1, replan_every=2, replan_tolerance=0.01)
+    assert [rollout.step(prompt="") for _ in range(4)] == [2, 4, 8, 9]
+
+
+def test_invalid_replan_every():
+    with pytest.raises(ValueError):
+        ChunkedRollout(FakeDroid(), FakePi0(value=lambda t, call: t), steps_per_action=1, replan_every=0)
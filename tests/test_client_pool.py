@@ -0,0 +1,105 @@
+import time
+import threading
+
+from src.inference.client_pool import PolicyClientPool
+
+
+"""
+PolicyClientPool deadlines with a fake websocket client, no policy server needed:
+    python -m pytest tests/test_client_pool.py
+"""
+
+
+class FakeWebsocket:
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeClient:
+    """
+    Answers after observation["delay_s"], raises like a websocket client when its connection is closed meanwhile.
+    """
+
+    def __init__(self):
+        self._ws = FakeWebsocket()
+        self.n_infer = 0
+
+    def get_server_metadata(self) -> dict:
+        return {}
+
+    def infer(self, observation: dict) -> dict:
+        self.n_infer += 1
+        if self._ws.closed.wait(observation["delay_s"]):
+            raise ConnectionError("connection closed")
+        return {"actions": observation["delay_s"]}
+
+
+class FakePool(PolicyClientPool):
+
+    def __init__(self, *args, **kwargs):
+        self.clients = []
+        super().__init__(*args, **kwargs)
+
+    def _connect(self, replica):
+        replica.client = FakeClient()
+        self.clients.append(replica.client)
+
+
+def _in_background(fn) -> threading.Thread:
+    thread = threading.Thread(target=fn)
+    thread.start()
+    time.sleep(0.05)  # Let it take the connection first
+    return thread
+
+
+def _timed_out(pool: PolicyClientPool, observation: dict, timeout_s: float) -> bool:
+    try:
+        pool.infer(observation, timeout_s=timeout_s)
+    except RuntimeError as e:
+        return isinstance(e.__cause__, TimeoutError)
+    return False
+
+
+def test_timeout_in_flight_closes_connection_and_fails_replica():
+    pool = FakePool(["a:1"], max_retries=0, backoff_s=0.01)
+    assert _timed_out(pool, {"delay_s": 1.0}, timeout_s=0.1)
+    time.sleep(0.05)
+    assert pool.clients[0]._ws.closed.is_set()
+    stats = pool.stats()[0]
+    assert stats["failures"] == 1 and stats["outstanding"] == 0
+    pool.close()
+
+
+def test_timeout_queued_on_connection_is_abandoned():
+    pool = FakePool(["a:1"], max_retries=0)
+    results = []
+    busy = _in_background(lambda: results.append(pool.infer({"delay_s": 0.4}, timeout_s=5.0)))
+    assert _timed_out(pool, {"delay_s": 0.0}, timeout_s=0.1)
+    busy.join()
+    time.sleep(0.05)
+    client = pool.clients[0]
+    assert results == [{"actions": 0.4}]  # The request holding the connection isn't affected
+    assert not client._ws.closed.is_set()
+    assert client.n_infer == 1  # The abandoned request was never sent
+    stats = pool.stats()[0]
+    assert stats["failures"] == 0 and stats["healthy"] and stats["outstanding"] == 0
+    pool.close()
+
+
+def test_timeout_queued_in_executor_releases_replica():
+    # One connection, two executor threads: the third concurrent request waits in the executor queue
+    pool = FakePool(["a:1"], max_retries=0)
+    first = _in_background(lambda: pool.infer({"delay_s": 0.4}, timeout_s=5.0))
+    second = _in_background(lambda: pool.infer({"delay_s": 0.0}, timeout_s=5.0))
+    assert _timed_out(pool, {"delay_s": 0.0}, timeout_s=0.1)
+    first.join()
+    second.join()
+    stats = pool.stats()[0]
+    assert stats["outstanding"] == 0  # Cancelled before _call(..), released by the caller
+    assert stats["failures"] == 0 and stats["healthy"]
+    assert pool.clients[0].n_infer == 2
+    pool.close()
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from src.dataset.episode_writer import EpisodeWriter
+from src.dataset.episode_reader import EpisodeReader, DatasetReader, list_episodes
+from src.inference.gripper import normalize_gripper
+
+
+"""
+EpisodeWriter -> EpisodeReader/DatasetReader round trip on fake observations, no sim or model server needed:
+    python -m pytest tests/test_episode_reader.py
+"""
+
+CHUNK_SIZE = 3
+
+
+def fake_observation(t: int) -> dict:
+    """
+    Observation at step t as returned by DroidManager.get_scene_observation(..), every value derived from t.
+    """
+    return {
+        "joint_positions": np.linspace(0, 1, 7) + t,
+        "gripper_position": np.full(2, 0.05 * t),
+        "ext_camera_img": np.full((4, 6, 3), t, dtype=np.uint8),
+        "wrist_cam_img": np.full((4, 6, 3), 100 + t, dtype=np.uint8),
+    }
+
+
+def fake_chunk(t: int) -> np.ndarray:
+    return t + np.arange(10 * 8, dtype=np.float64).reshape(10, 8) / 100
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """
+    ep0: 7 steps (image chunks of 3, 3, 1), prompt changes at step 4. ep1: 2 steps. ep2: never ended.
+    """
+    writer = EpisodeWriter(tmp_path, chunk_size=CHUNK_SIZE)
+    for name, n_steps in (("ep0", 7), ("ep1", 2)):
+        writer.start_episode(name, sim_run="fake", seed=int(name[-1]))
+        for t in range(n_steps):
+            writer.add_step(fake_observation(t), "pick" if t < 4 else "place", fake_chunk(t))
+        writer.end_episode(success=True)
+    writer.start_episode("ep2", sim_run="fake")
+    writer.add_step(fake_observation(0), "pick", fake_chunk(0))
+    writer.flush()  # ep2 stays open, like a crashed run
+    return tmp_path
+
+
+def test_round_trip(dataset):
+    assert list_episodes(dataset) == [dataset / "ep0", dataset / "ep1"]
+    reader = EpisodeReader(dataset / "ep0")
+    assert len(reader) == 7
+    assert reader.meta["seed"] == 0 and reader.meta["success"] is True
+    assert isinstance(reader.column("action_chunk"), np.memmap)
+    for t, step in enumerate(reader):
+        obs = fake_observation(t)
+        np.testing.assert_array_equal(step["observation/joint_position"], obs["joint_positions"])
+        np.testing.assert_allclose(step["observation/gripper_position"], normalize_gripper(obs["gripper_position"]))
+        np.testing.assert_array_equal(step["action_chunk"], fake_chunk(t))
+        np.testing.assert_array_equal(step["action"], fake_chunk(t)[0])
+        np.testing.assert_array_equal(step["observation/exterior_image_1_left"], obs["ext_camera_img"])
+        np.testing.assert_array_equal(step["observation/wrist_image_left"], obs["wrist_cam_img"])
+        assert step["prompt"] == ("pick" if t < 4 else "place")
+    np.testing.assert_array_equal(reader[-1]["action_chunk"], fake_chunk(6))
+    with pytest.raises(IndexError):
+        reader[7]
+
+
+def test_droid_observation_normalizes_to_the_recorded_gripper(dataset):
+    reader = EpisodeReader(dataset / "ep0")
+    for t in range(len(reader)):
+        np.testing.assert_allclose(
+            normalize_gripper(reader.droid_observation(t)["gripper_position"]),
+            reader.column("observation/gripper_position")[t], rtol=1e-6,
+        )
+
+
+def test_image_chunks_are_lru_cached(dataset):
+    reader = EpisodeReader(dataset / "ep0", cached_chunks=2)
+    key = "observation/wrist_image_left"
+    cached = reader._chunks[key]
+    for step in (0, 3, 6):  # Chunks 0, 1, 2: chunk 0 evicted
+        reader.image(key, step)
+    assert list(cached) == [1, 2]
+    reader.image(key, 4)  # Chunk 1 used again, chunk 2 is now the least recently used
+    assert list(cached) == [2, 1]
+    np.testing.assert_array_equal(reader.image(key, 1), fake_observation(1)["wrist_cam_img"])
+    assert list(cached) == [1, 0]
+
+
+def test_dataset_reader_spans_episodes(dataset):
+    data = DatasetReader(dataset)
+    assert len(data) == 7 + 2
+    assert data.locate(6) == (0, 6) and data.locate(7) == (1, 0)
+    np.testing.assert_array_equal(data[8]["action_chunk"], fake_chunk(1))
+    assert sum(1 for _ in data) == len(data)
+    with pytest.raises(IndexError):
+        data[len(data)]
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.dataset.episode_writer import EpisodeWriter
+from src.dataset.episode_reader import EpisodeReader, list_episodes
+
+
+"""
+EpisodeWriter with fake observations, no sim or model server needed:
+    python -m pytest tests/test_episode_writer.py
+"""
+
+
+def fake_observation(t: int) -> dict:
+    """
+    Observation at step t as returned by DroidManager.get_scene_observation(..), every value derived from t.
+    """
+    return {
+        "joint_positions": np.full(7, 0.01 * t),
+        "gripper_position": np.full(2, np.pi / 8),
+        "ext_camera_img": np.full((4, 6, 3), t % 256, dtype=np.uint8),
+        "wrist_cam_img": np.full((4, 6, 3), (t + 1) % 256, dtype=np.uint8),
+    }
+
+
+def write_steps(writer: EpisodeWriter, n_steps: int, prompt: str = "pick"):
+    for t in range(n_steps):
+        writer.add_step(fake_observation(t), prompt, np.full((10, 8), float(t)))
+
+
+def test_discarded_episode_leaves_nothing_on_disk(tmp_path):
+    writer = EpisodeWriter(tmp_path, chunk_size=2)
+    writer.start_episode("ep0", sim_run="fake")
+    write_steps(writer, 5)  # Two image chunks flushed before the discard
+    writer.discard_episode()
+    writer.flush()
+    assert not (tmp_path / "ep0").exists()
+
+    # Same name again, e.g. a retried episode: the removal of the discarded one doesn't race its steps
+    writer.start_episode("ep0", sim_run="fake")
+    write_steps(writer, 3)
+    writer.discard_episode()
+    writer.start_episode("ep0", sim_run="fake", seed=1)
+    write_steps(writer, 3)
+    writer.end_episode()
+    writer.close()
+
+    assert list_episodes(tmp_path) == [tmp_path / "ep0"]
+    reader = EpisodeReader(tmp_path / "ep0")
+    assert len(reader) == 3
+    assert reader.meta["seed"] == 1
+    assert sorted(p.name for p in (tmp_path / "ep0" / "observation" / "wrist_image_left").iterdir()) == [
+        "chunk_000000.npz", "chunk_000001.npz",
+    ]
+
+
+def test_gripper_is_recorded_as_sent_to_pi0(tmp_path):
+    writer = EpisodeWriter(tmp_path)
+    writer.start_episode("ep0", sim_run="fake")
+    write_steps(writer, 2)
+    writer.end_episode()
+    writer.close()
+    # pi/8 finger angle is half closed
+    np.testing.assert_allclose(EpisodeReader(tmp_path / "ep0").column("observation/gripper_position"), 0.5)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.robots.droid_const import GRIPPER_CLOSED
+from src.robots.joint_actions import joint_targets, interpolate_joint_targets, TrackingError
+
+
+"""
+Joint-action interpolation and tracking error on CPU tensors, no sim needed (torch only):
+    python -m pytest tests/test_joint_actions.py
+"""
+
+STEPS = 4
+
+
+def ramp_actions(n_actions: int, gripper: float = 0.0) -> np.ndarray:
+    """
+    (A, 8) actions, arm joint j of action a at a + j / 10.
+    """
+    actions = np.zeros((n_actions, 8))
+    actions[:, :7] = np.arange(n_actions)[:, None] + np.arange(7) / 10
+    actions[:, 7] = gripper
+    return actions
+
+
+def test_joint_targets_threshold_gripper_and_move_action_axis_first():
+    actions = ramp_actions(3)
+    actions[:, 7] = [0.0, 0.9, 0.1]
+    targets = joint_targets(actions, torch.float64, "cpu")
+    assert targets.shape == (3, 9)
+    torch.testing.assert_close(targets[:, :7], torch.as_tensor(actions[:, :7]))
+    torch.testing.assert_close(targets[:, 7], torch.tensor([0.0, GRIPPER_CLOSED, 0.0], dtype=torch.float64))
+    torch.testing.assert_close(targets[:, 7], targets[:, 8])
+
+    batched = joint_targets(np.stack([actions, actions + 1]), torch.float64, "cpu")  # (N, A, 8)
+    assert batched.shape == (3, 2, 9)
+    torch.testing.assert_close(batched[:, 0], targets)
+
+
+@pytest.mark.parametrize("mode", ["linear", "cubic"])
+def test_every_action_ends_at_its_target(mode):
+    targets = joint_targets(ramp_actions(3, gripper=1.0), torch.float64, "cpu")
+    prev = torch.zeros(9, dtype=torch.float64)
+    steps = interpolate_joint_targets(prev, targets, STEPS, mode)
+    assert steps.shape == (3 * STEPS, 9)
+    torch.testing.assert_close(steps[STEPS - 1::STEPS], targets)
+    torch.testing.assert_close(steps[:, 7:], targets[:, 7:].repeat_interleave(STEPS, dim=0))  # Gripper not interpolated
+
+
+def test_linear_steps_evenly():
+    targets = joint_targets(ramp_actions(2), torch.float64, "cpu")
+    prev = targets[0] - 1.0
+    steps = interpolate_joint_targets(prev, targets, STEPS, "linear")
+    increments = torch.diff(torch.cat([prev[None], steps])[:, :7], dim=0)
+    torch.testing.assert_close(increments, torch.full_like(increments, 1.0 / STEPS))
+
+
+def test_cubic_is_exact_on_constant_velocity():
+    # Catmull-Rom tangents of evenly spaced waypoints are the spacing itself, the Hermite spline is the straight line
+    targets = joint_targets(ramp_actions(4), torch.float64, "cpu")
+    prev = targets[0] - 1.0
+    cubic = interpolate_joint_targets(prev, targets, STEPS, "cubic")
+    torch.testing.assert_close(cubic, interpolate_joint_targets(prev, targets, STEPS, "linear"))
+
+
+def test_batched_interpolation_matches_per_env():
+    actions = np.stack([ramp_actions(3), -ramp_actions(3)])
+    targets = joint_targets(actions, torch.float64, "cpu")  # (A, N, 9)
+    prev = torch.zeros(2, 9, dtype=torch.float64)
+    steps = interpolate_joint_targets(prev, targets, STEPS, "cubic")
+    assert steps.shape == (3 * STEPS, 2, 9)
+    for env in range(2):
+        torch.testing.assert_close(steps[:, env], interpolate_joint_targets(prev[env], targets[:, env], STEPS, "cubic"))
+
+
+def test_hold_is_not_interpolated():
+    targets = joint_targets(ramp_actions(2), torch.float64, "cpu")
+    with pytest.raises(ValueError):
+        interpolate_joint_targets(targets[0], targets, STEPS, "hold")
+
+
+def test_tracking_error_rms_and_max():
+    tracking = TrackingError()
+    assert tracking.result() is None
+    q_desired = torch.zeros(2, 9, dtype=torch.float64)  # 2 envs
+    tracking.add(q_desired, torch.full((2, 9), 0.1, dtype=torch.float64))
+    tracking.add(q_desired, torch.full((2, 9), -0.3, dtype=torch.float64))
+    result = tracking.result()
+    assert result["samples"] == 4
+    np.testing.assert_allclose(result["rms"], np.sqrt((0.1 ** 2 + 0.3 ** 2) / 2))
+    np.testing.assert_allclose(result["max"], 0.3)
+    assert "samples" in tracking.summary()
+    tracking.reset()
+    assert tracking.result() is None
@@ -0,0 +1,87 @@
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.inference.pipelined_rollout import PipelinedRollout
+
+
+"""
+PipelinedRollout with a fake robot and policy, no sim or model server needed:
+    python -m pytest tests/test_pipelined_rollout.py
+"""
+
+
+class FakeDroid:
+    """
+    Counts executed actions, the observation is the index of the next action.
+    """
+
+    def __init__(self):
+        self.executed = []
+
+    def get_scene_observation(self) -> dict:
+        return {"t": len(self.executed)}
+
+    def apply_abs_joint_actions(self, actions, steps_per_action: int):
+        self.executed.extend(np.asarray(actions))
+
+
+class FakePi0:
+    """
+    Returns (chunk_len, 8) chunks, the arm joint targets of action i are `value(t + i, call index)` for an
+    observation at action t.
+    """
+
+    def __init__(self, value, chunk_len: int = 10):
+        self.value = value
+        self.chunk_len = chunk_len
+        self.requests = []  # Observed action index of every call
+
+    def forward(self, droid_observation: dict, prompt: str, actions: int | None = None) -> np.ndarray:
+        t = droid_observation["t"]
+        chunk = np.zeros((self.chunk_len, 8))
+        chunk[:, :7] = [[self.value(t + i, len(self.requests))] for i in range(self.chunk_len)]
+        self.requests.append(t)
+        return chunk
+
+    def forward_async(self, droid_observation: dict, prompt: str, actions: int | None = None) -> Future:
+        future = Future()
+        future.set_result(self.forward(droid_observation, prompt, actions))
+        return future
+
+
+def run_steps(pi0: FakePi0, n_steps: int, **kwargs) -> tuple[FakeDroid, list[int]]:
+    droid = FakeDroid()
+    rollout = PipelinedRollout(droid, pi0, steps_per_action=1, **kwargs)
+    return droid, [rollout.step(prompt="") for _ in range(n_steps)]
+
+
+def test_actions_stay_time_aligned():
+    # Every chunk predicts the action index itself, so blending can't hide a misaligned chunk
+    pi0 = FakePi0(value=lambda t, call: t)
+    droid, n_executed = run_steps(pi0, 6, actions_per_chunk=8, prefetch_at=4, blend_steps=2)
+    executed = np.array(droid.executed)
+    assert sum(n_executed) == len(executed)
+    assert n_executed == [8, 4, 8, 4, 8, 4]
+    np.testing.assert_allclose(executed[:, :7], np.arange(len(executed))[:, None] * np.ones(7))
+
+
+def test_chunks_are_blended_at_every_switch():
+    # Every chunk predicts its call index, blended actions lie strictly between two consecutive chunks
+    pi0 = FakePi0(value=lambda t, call: float(call))
+    droid, n_executed = run_steps(pi0, 5, actions_per_chunk=8, prefetch_at=4, blend_steps=2)
+    executed = np.array(droid.executed)[:, 0]
+    switches = np.cumsum(n_executed)[:-1]
+    for chunk, switch in enumerate(switches, start=1):
+        blended = executed[switch:switch + 2]
+        assert np.all((blended > chunk - 1) & (blended < chunk)), f"switch to chunk {chunk} not blended"
+        assert blended[0] < blended[1]  # Ramps towards the new chunk
+        assert executed[switch + 2] == chunk
+
+
+def test_requests_at_prefetch_point():
+    pi0 = FakePi0(value=lambda t, call: t)
+    _, n_executed = run_steps(pi0, 4, actions_per_chunk=6, prefetch_at=2, blend_steps=1)
+    starts = np.concatenate([[0], np.cumsum(n_executed)[:-1]])
+    # Initial blocking request, then one request prefetch_at actions into every step
+    assert pi0.requests == [0] + [int(start) + 2 for start in starts]
@@ -0,0 +1,43 @@
+import pytest
+
+from src.utils.recording_clock import RecordingClock
+
+
+"""
+RecordingClock frame decimation by sim time, no sim needed:
+    python -m pytest tests/test_recording_clock.py
+"""
+
+
+def frames_per_step(clock: RecordingClock, dts: list[float]) -> list[int]:
+    return [clock.tick(dt) for dt in dts]
+
+
+@pytest.mark.parametrize("dt", [0.002, 0.01, 1 / 60])
+def test_frame_count_matches_sim_time(dt):
+    clock = RecordingClock(fps=30)
+    n_steps = round(10.0 / dt)  # 10 s of sim time
+    frames = frames_per_step(clock, [dt] * n_steps)
+    assert frames[0] == 1  # First step after a reset produces the first frame
+    assert sum(frames) == 1 + 10 * 30
+    assert clock.sim_time == pytest.approx(10.0)
+
+
+def test_no_drift_with_mixed_dt():
+    # E.g. adaptive time stepping, see src/sims/adaptive_timestep.py
+    clock = RecordingClock(fps=30)
+    dts = [0.002] * 500 + [0.01] * 100 + [0.005] * 200  # 1 s + 1 s + 1 s
+    assert sum(frames_per_step(clock, dts)) == 1 + 3 * 30
+
+
+def test_long_steps_repeat_frames():
+    clock = RecordingClock(fps=30)
+    assert frames_per_step(clock, [0.1, 0.1]) == [4, 3]  # Frames at 0, 1/30, 2/30, 3/30, then up to 6/30
+
+
+def test_reset_restarts_the_recording():
+    clock = RecordingClock(fps=30)
+    frames_per_step(clock, [0.002] * 100)
+    clock.reset()
+    assert clock.sim_time == 0.0
+    assert clock.tick(0.002) == 1
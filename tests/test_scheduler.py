@@ -0,0 +1,89 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src.evaluation import scheduler
+from src.evaluation.scheduler import EpisodeScheduler
+from src.evaluation.results import EvalJob
+
+
+"""
+EpisodeScheduler with fake worker processes (no Genesis or model client): retries, worker respawns and episodes lost
+by crashed workers:
+    python -m pytest tests/test_scheduler.py
+"""
+
+
+def _claim(marker_dir: str, name: str) -> bool:
+    """
+    True for the first process (across workers) that claims `name`.
+    """
+    try:
+        open(Path(marker_dir) / name, "x").close()
+        return True
+    except FileExistsError:
+        return False
+
+
+def fake_worker(worker_id, backend, runner_kwargs, pi0_kwargs, warmup_kwargs, task_q, result_q):
+    """
+    Stands in for _worker_main, runner_kwargs["behavior"] selects how it fails.
+    """
+    behavior, marker_dir = runner_kwargs["behavior"], runner_kwargs["marker_dir"]
+    if behavior == "dies_at_startup":
+        raise RuntimeError("policy server down")
+    result_q.put(("ready", worker_id, None, ""))
+    while (task := task_q.get()) is not None:
+        if behavior == "crashes_before_started" and _claim(marker_dir, f"crash_{task.task_id}"):
+            os._exit(3)  # Task taken off the queue, but nobody hears about it
+        result_q.put(("started", worker_id, task.task_id, None))
+        if behavior == "always_fails" or (behavior == "fails_once" and _claim(marker_dir, f"fail_{task.task_id}")):
+            result_q.put(("error", worker_id, task.task_id, "episode raised"))
+            continue
+        result = {
+            "sim_run": task.sim_run, "prompt": task.prompt, "seed": task.seed, "episode": task.episode,
+            "success": True, "termination": "success", "steps": 1, "sim_time_s": 0.1, "wall_time_s": 0.1,
+        }
+        result_q.put(("done", worker_id, task.task_id, result))
+
+
+@pytest.fixture(autouse=True)
+def fake_workers(monkeypatch):
+    monkeypatch.setattr(scheduler, "_worker_main", fake_worker)
+    monkeypatch.setattr(scheduler, "LOST_TASK_TIMEOUT_S", 0.5)
+
+
+def run(behavior: str, tmp_path, n_workers: int = 2, **kwargs) -> tuple[EpisodeScheduler, list, list]:
+    sched = EpisodeScheduler(
+        n_workers, runner_kwargs={"behavior": behavior, "marker_dir": str(tmp_path)}, **kwargs,
+    )
+    results, failures = sched.run([EvalJob("scene", "pick", seeds=[0, 1], episodes=2)])
+    return sched, results, failures
+
+
+def test_failed_episodes_are_retried(tmp_path):
+    _, results, failures = run("fails_once", tmp_path, max_retries=1)
+    assert failures == []
+    assert sorted((r.seed, r.episode) for r in results) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+
+def test_episodes_fail_after_max_retries(tmp_path):
+    sched, results, failures = run("always_fails", tmp_path, max_retries=2)
+    assert results == []
+    assert len(failures) == 4 and all(f["error"] == "episode raised" for f in failures)
+    assert sum(stats.failures for stats in sched._stats.values()) == 4 * 3
+
+
+def test_workers_dying_at_startup_are_respawned_up_to_max_respawns(tmp_path):
+    sched, results, failures = run("dies_at_startup", tmp_path, max_respawns=2)
+    assert results == []
+    assert len(failures) == 4 and all(f["error"] == "no workers left" for f in failures)
+    assert len(sched._stats) == 2 * (1 + 2)  # Every slot: first worker + 2 replacements
+
+
+def test_lost_episodes_are_requeued(tmp_path):
+    # Every episode's first worker dies right after taking it, before its "started" message
+    _, results, failures = run("crashes_before_started", tmp_path, n_workers=1, max_retries=4, max_respawns=4)
+    assert failures == []
+    assert len(results) == 4
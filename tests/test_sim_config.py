@@ -0,0 +1,87 @@
+import pytest
+
+from src.sims import sim_config
+from src.sims.sim_config import SimConfig, load_sim_config, merge_config, parse_override
+from src.sims.registry import validate_sim_config
+
+
+"""
+Sim config layering (preset, scene, config file, --set overrides) and validation, no Genesis needed:
+    python -m pytest tests/test_sim_config.py
+"""
+
+SCENE = "replicad_apt0_partnet_objs"
+
+
+def test_merge_config_recurses_and_merges_objects_by_name():
+    base = {"sim": {"dt": 0.002, "substeps": 20}, "objects": [{"name": "a", "pos": [0, 0, 0], "scale": 2.0}]}
+    update = {"sim": {"dt": 0.01}, "objects": [{"name": "a", "pos": [1, 1, 1]}, {"name": "b", "type": "box"}]}
+    merged = merge_config(base, update)
+    assert merged["sim"] == {"dt": 0.01, "substeps": 20}
+    assert merged["objects"] == [{"name": "a", "pos": [1, 1, 1], "scale": 2.0}, {"name": "b", "type": "box"}]
+    assert base["sim"]["dt"] == 0.002  # Inputs untouched
+
+
+def test_parse_override_values():
+    assert parse_override("solver.iterations=100") == {"solver": {"iterations": 100}}
+    assert parse_override("sim.dt = 0.01") == {"sim": {"dt": 0.01}}
+    assert parse_override("scene.load_articulated=true") == {"scene": {"load_articulated": True}}
+    assert parse_override("task.prompt=Open the fridge.") == {"task": {"prompt": "Open the fridge."}}  # Not TOML
+    assert parse_override("objects.pn_bottle.pos=[0.9,-2.5,1.0]") == {
+        "objects": [{"name": "pn_bottle", "pos": [0.9, -2.5, 1.0]}],
+    }
+
+
+@pytest.mark.parametrize("override", ["sim.dt", "sim..dt=1", "=1", "objects.pn_bottle=1"])
+def test_parse_override_rejects_malformed(override):
+    with pytest.raises(ValueError):
+        parse_override(override)
+
+
+def test_preset_scene_file_and_overrides_are_layered(tmp_path):
+    accurate = load_sim_config(SCENE)
+    assert (accurate.preset, accurate.sim.dt, accurate.solver.iterations) == ("accurate", 0.002, 200)
+
+    config_file = tmp_path / "sweep.toml"
+    config_file.write_text(
+        "[sim]\ndt = 0.005\nsteps_per_action = 13\n\n[[objects]]\nname = \"pn_bottle\"\nscale = 0.1\n"
+    )
+    config = load_sim_config(SCENE, preset="fast", config_file=config_file, overrides=["sim.dt=0.004"])
+    assert config.sim.dt == 0.004  # --set wins over the config file
+    assert config.sim.steps_per_action == 13  # Config file wins over the preset
+    assert config.sim.substeps == 1  # Preset
+    assert config.solver.rigid_options() == {}  # Fast preset keeps the Genesis defaults
+    assert config.robot.pos == [0.7, -2.9, 0.9]  # Scene
+    bottle = next(obj for obj in config.objects if obj.name == "pn_bottle")
+    assert (bottle.scale, bottle.rho) == (0.1, 300)  # Object merged by name, other fields from the scene
+
+
+def test_registered_scene(tmp_path, monkeypatch):
+    monkeypatch.setattr(sim_config, "_registered_scenes", {})
+    scene_file = tmp_path / "my_scene.toml"
+    scene_file.write_text("[scene]\nreplicad = \"apt_3\"\n")
+    sim_config.register_scene("my_scene", scene_file)
+    assert "my_scene" in sim_config.list_scenes()
+    assert load_sim_config("my_scene").scene.replicad == "apt_3"
+
+
+def test_unknown_names_are_rejected():
+    with pytest.raises(ValueError, match="Unknown preset"):
+        load_sim_config(SCENE, preset="no_such_preset")
+    with pytest.raises(ValueError, match="Unknown scene"):
+        load_sim_config("no_such_scene")
+    with pytest.raises(ValueError, match=r"Unknown setting\(s\) \['dtt'\] in \[sim\]"):
+        load_sim_config(SCENE, overrides=["sim.dtt=0.01"])
+    with pytest.raises(ValueError, match="Unknown config table"):
+        SimConfig.from_dict({"simulation": {}})
+    with pytest.raises(ValueError, match="unique"):
+        SimConfig.from_dict({"objects": [{"name": "a", "type": "box"}, {"name": "a", "type": "box"}]})
+
+
+def test_validation_reports_every_problem():
+    config = load_sim_config(SCENE, overrides=[
+        "sim.dt=0", "cameras.obs_res=huge", "robot.action_interpolation=spline", "task.container=no_such_object",
+    ])
+    problems = validate_sim_config(config, check_files=False)
+    assert len(problems) == 4, problems
+    assert validate_sim_config(load_sim_config(SCENE), check_files=False) == []
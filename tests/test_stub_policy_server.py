@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.inference.stub_policy_server import StubPolicy, ACTION_HORIZON
+
+
+"""
+StubPolicy (the stand-in policy server's responses), no server or model needed:
+    python -m pytest tests/test_stub_policy_server.py
+"""
+
+
+def observation(batch: tuple = ()) -> dict:
+    joints = np.arange(np.prod(batch, dtype=int) * 7, dtype=np.float64).reshape(*batch, 7)
+    return {
+        "observation/joint_position": joints,
+        "observation/gripper_position": np.full((*batch, 1), 0.5),
+        "prompt": "pick",
+    }
+
+
+def test_single_observation_is_echoed_as_a_chunk():
+    actions = StubPolicy().infer(observation())["actions"]
+    assert actions.shape == (ACTION_HORIZON, 8)
+    np.testing.assert_array_equal(actions, np.tile([*range(7), 0.5], (ACTION_HORIZON, 1)))
+
+
+def test_batched_observations_get_one_chunk_each():
+    obs = observation(batch=(3,))
+    actions = StubPolicy().infer(obs)["actions"]
+    assert actions.shape == (3, ACTION_HORIZON, 8)
+    for b in range(3):
+        single = {key: value[b] if isinstance(value, np.ndarray) else value for key, value in obs.items()}
+        np.testing.assert_array_equal(actions[b], StubPolicy().infer(single)["actions"])
+
+
+def test_noise_only_perturbs_arm_joints():
+    obs = observation(batch=(2,))
+    actions = StubPolicy(noise_std=0.1, seed=1).infer(obs)["actions"]
+    exact = StubPolicy().infer(obs)["actions"]
+    assert not np.allclose(actions[..., :7], exact[..., :7])
+    np.testing.assert_array_equal(actions[..., 7], exact[..., 7])
+    np.testing.assert_array_equal(StubPolicy(noise_std=0.1, seed=1).infer(obs)["actions"], actions)  # Seeded
@@ -0,0 +1,96 @@
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.utils import video_recorder
+from src.utils.video_recorder import StreamingVideoRecorder
+
+
+"""
+StreamingVideoRecorder with a fake encoder, no ffmpeg needed:
+    python -m pytest tests/test_video_recorder.py
+"""
+
+
+class FakeEncoder:
+    """
+    Stands in for the ffmpeg subprocess, keeps the written bytes. Fails on writes when `fail` is set.
+    """
+
+    def __init__(self, file, fail: bool):
+        self.file = file
+        self.fail = fail
+        self.stdin = self
+        self.buffer = io.BytesIO()
+        self.closed = False
+
+    def write(self, data: bytes):
+        if self.fail:
+            raise BrokenPipeError(f"encoder for {self.file.name} died")
+        self.buffer.write(data)
+
+    def close(self):
+        self.closed = True
+
+    def kill(self):
+        self.closed = True
+
+    def wait(self):
+        return 0
+
+
+@pytest.fixture
+def encoders(monkeypatch):
+    """
+    All opened encoders, streams whose name is in `encoders.failing` get failing ones.
+    """
+    opened = []
+    failing = set()
+
+    def open_encoder(stream, file, height, width):
+        opened.append(FakeEncoder(file, fail=stream.name in failing))
+        return opened[-1]
+
+    monkeypatch.setattr(video_recorder._VideoStream, "_open_encoder", open_encoder)
+    return SimpleNamespace(opened=opened, failing=failing)
+
+
+def add_frames(recorder: StreamingVideoRecorder, names: list[str], n: int):
+    for _ in range(n):
+        for name in names:
+            try:
+                recorder.add_frame(name, np.zeros((4, 6, 3), dtype=np.uint8))
+            except RuntimeError:
+                pass  # A failed stream refuses frames, the other streams go on
+
+
+def test_end_segment_closes_every_stream_then_raises_once(tmp_path, encoders):
+    recorder = StreamingVideoRecorder(fps=10)
+    encoders.failing.update({"wrist", "scene_1"})
+    recorder.start_segment(tmp_path, "ep0", ["wrist", "scene_1", "scene_2"])
+    add_frames(recorder, ["wrist", "scene_1", "scene_2"], 3)
+    with pytest.raises(RuntimeError, match="wrist.*scene_1") as error:
+        recorder.end_segment()
+    assert "scene_2" not in str(error.value)
+    assert isinstance(error.value.__cause__, BrokenPipeError)
+    assert all(encoder.closed for encoder in encoders.opened)
+    assert not recorder.recording
+    recorder.close()
+
+
+def test_failed_segment_doesnt_fail_the_next(tmp_path, encoders):
+    recorder = StreamingVideoRecorder(fps=10)
+    encoders.failing.add("wrist")
+    recorder.start_segment(tmp_path, "ep0", ["wrist"])
+    add_frames(recorder, ["wrist"], 2)
+    with pytest.raises(RuntimeError):
+        recorder.end_segment()
+
+    encoders.failing.clear()
+    recorder.start_segment(tmp_path, "ep1", ["wrist"])
+    add_frames(recorder, ["wrist"], 2)
+    assert recorder.end_segment() == [tmp_path / "wrist_ep1.mp4"]
+    assert encoders.opened[-1].buffer.getbuffer().nbytes == 2 * 4 * 6 * 3
+    recorder.close()